@@ -0,0 +1,71 @@
+"""
+Benchmark: batched feature-matrix builders vs. per-pair feature extraction.
+
+Run from the project root:
+    python -m benchmarks.bench_feature_matrix
+"""
+import os
+import random
+import time
+from types import SimpleNamespace
+
+import django
+import numpy as np
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "job_portal_backend.settings")
+django.setup()
+
+from ml_training.enhanced_matching import SKILL_MAPPING
+from core.ai.job_recommendation import extract_job_features, extract_job_feature_matrix
+from core.ai.candidate_recommendation import extract_candidate_features, extract_candidate_feature_matrix
+
+LOCATIONS = ["Dar es Salaam", "Arusha", "Mwanza", "Dodoma", "Kibaha", "Morogoro"]
+JOB_TYPES = ["FULL_TIME", "PART_TIME", "CONTRACT", "INTERNSHIP", "TEMPORARY"]
+LEVELS = ["Diploma", "Bachelor", "Masters", "Certificate"]
+FIELDS = ["Computer Science", "Business", "Accounting", "Engineering"]
+VARIATIONS = [v for vs in SKILL_MAPPING.values() for v in vs]
+
+def make_seeker(rnd):
+    return SimpleNamespace(
+        skills=rnd.sample(VARIATIONS, rnd.randint(1, 8)),
+        education=[{"level": rnd.choice(LEVELS), "field": rnd.choice(FIELDS)}],
+        experience=[{"duration": "2018-present"}, {"duration": "2 years"}],
+        preferred_job_types=rnd.sample(JOB_TYPES, rnd.randint(0, 2)),
+        location=rnd.choice(LOCATIONS),
+        willing_to_relocate=rnd.random() < 0.3,
+        is_available=True,
+    )
+
+def make_job(rnd):
+    return SimpleNamespace(
+        skills=rnd.sample(VARIATIONS, rnd.randint(1, 8)),
+        requirements=[{"type": "education", "level": rnd.choice(LEVELS), "field": rnd.choice(FIELDS)}],
+        job_type=rnd.choice(JOB_TYPES),
+        location=rnd.choice(LOCATIONS),
+    )
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    rnd = random.Random(42)
+    for n in (1_000, 10_000, 100_000):
+        seeker, jobs = make_seeker(rnd), [make_job(rnd) for _ in range(n)]
+        job, seekers = make_job(rnd), [make_seeker(rnd) for _ in range(n)]
+
+        ref, pair_time = timed(lambda: np.array([extract_job_features(seeker, j) for j in jobs], dtype=np.float32))
+        X, batch_time = timed(lambda: extract_job_feature_matrix(seeker, jobs))
+        assert np.array_equal(ref, X)
+        print(f"{n:>7} pairs, 1 seeker x N jobs: per-pair {pair_time * 1e3:9.1f} ms | "
+              f"batched {batch_time * 1e3:8.1f} ms | {pair_time / batch_time:5.1f}x")
+
+        ref, pair_time = timed(lambda: np.array([extract_candidate_features(s, job) for s in seekers], dtype=np.float32))
+        X, batch_time = timed(lambda: extract_candidate_feature_matrix(job, seekers))
+        assert np.array_equal(ref, X)
+        print(f"{n:>7} pairs, 1 job x N seekers: per-pair {pair_time * 1e3:9.1f} ms | "
+              f"batched {batch_time * 1e3:8.1f} ms | {pair_time / batch_time:5.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: MinHash/LSH candidate retrieval vs. skill posting unions, with
+recall@k of the LSH short list against the exact top-k by Jaccard.
+
+Catalog skills are skewed like real postings: a few soft skills appear on
+most jobs, so posting unions return most of the table. Buckets are held in
+memory here; the database index (JobLSHBucket) answers the same lookups.
+
+Run from the project root:
+    python -m benchmarks.bench_lsh_recall
+"""
+import os
+import random
+import time
+from collections import defaultdict
+
+import django
+import numpy as np
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "job_portal_backend.settings")
+django.setup()
+
+from ml_training.enhanced_matching import SKILL_MAPPING, canonical_skills, skill_ids
+from core.ai.lsh_index import band_keys, minhash_signature
+from core.ai.skill_matrix import SkillMatrix
+
+COMMON = ["communication skills", "customer service", "microsoft office", "teamwork"]
+TOP_K = 10
+N_QUERIES = 200
+BANDINGS = [(16, 4), (32, 4), (24, 3), (32, 2)]
+
+def make_profiles(n, seed):
+    rnd = random.Random(seed)
+    variations = [v for vs in SKILL_MAPPING.values() for v in vs] + [f"custom skill {i}" for i in range(500)]
+    weights = [1.0 / (rank + 1) for rank in range(len(variations))]
+    profiles = []
+    for _ in range(n):
+        skills = [skill for skill in COMMON if rnd.random() < 0.5]
+        skills += rnd.choices(variations, weights, k=rnd.randint(1, 6))
+        profiles.append(skills)
+    return profiles
+
+def main():
+    for n in (10_000, 100_000):
+        jobs = make_profiles(n, seed=1)
+        queries = make_profiles(N_QUERIES, seed=2)
+        matrix = SkillMatrix.from_skill_ids([skill_ids(skills) for skills in jobs])
+        postings = defaultdict(set)
+        for row, skills in enumerate(jobs):
+            for skill in canonical_skills(skills):
+                postings[skill].add(row)
+        union = np.mean([len(set().union(*(postings[s] for s in canonical_skills(q)))) for q in queries]) / n
+        print(f"{n:>7} jobs: posting unions return {union:6.1%} of the catalog")
+
+        exact = [matrix.match_scores(skill_ids(q)).jaccard for q in queries]
+
+        for bands, rows in BANDINGS:
+            buckets = defaultdict(list)
+            start = time.perf_counter()
+            for row, skills in enumerate(jobs):
+                for key in band_keys(minhash_signature(skills, bands * rows), bands, rows):
+                    buckets[key].append(row)
+            index_time = time.perf_counter() - start
+
+            recalls, sizes = [], []
+            start = time.perf_counter()
+            for q, jaccard in zip(queries, exact):
+                keys = band_keys(minhash_signature(q, bands * rows), bands, rows)
+                shortlist = np.fromiter({row for key in keys for row in buckets.get(key, ())}, dtype=np.int64)
+                sizes.append(shortlist.size)
+                # Ties at the k-th exact Jaccard count as hits
+                kth = np.sort(jaccard)[-TOP_K]
+                relevant = min(TOP_K, int(np.count_nonzero(jaccard >= kth)))
+                found = np.sort(jaccard[shortlist])[-TOP_K:] if shortlist.size else np.array([])
+                recalls.append(min(relevant, int(np.count_nonzero(found >= kth))) / relevant)
+            query_time = (time.perf_counter() - start) / N_QUERIES
+            print(f"    {bands:>2} bands x {rows} rows: recall@{TOP_K} {np.mean(recalls):6.1%} | "
+                  f"short list {np.mean(sizes) / n:6.2%} of the catalog | "
+                  f"lookup {query_time * 1e3:6.2f} ms | "
+                  f"index build {index_time:5.1f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Benchmark: scoring a chunk of stored skill bitsets vs. building its CSR matrix.
+Jobs listing a skill outside SKILL_MAPPING have no bitset and are scored
+through a SkillMatrix of their raw skills, as in the engines.
+
+Run from the project root:
+    python -m benchmarks.bench_skill_bitsets
+"""
+import time
+
+import numpy as np
+
+from ml_training.enhanced_matching import skill_ids
+from core.ai.skill_bitset import SkillBitsets, skill_bitset
+from core.ai.skill_matrix import SkillMatrix
+from benchmarks.bench_skill_matrix import make_jobs
+
+def main():
+    seeker_skills = ["Python", "django", "SQL", "docker", "communication skills", "custom skill 7"]
+    query_ids = skill_ids(seeker_skills)
+    for n in (1_000, 10_000, 100_000):
+        jobs = make_jobs(n)
+        stored = [skill_bitset(job.skills) for job in jobs]
+
+        start = time.perf_counter()
+        matrix_scores = SkillMatrix(jobs).match_scores(query_ids)
+        matrix_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        bitsets = SkillBitsets(jobs, stored)
+        bitset_scores = bitsets.match_scores(query_ids)
+        bitset_time = time.perf_counter() - start
+
+        assert all(np.array_equal(a, b) for a, b in zip(matrix_scores, bitset_scores)), "bitset scores differ from SkillMatrix"
+        print(f"{n:>7} jobs: CSR build + mat-vec {matrix_time * 1e3:9.2f} ms | "
+              f"bitsets + AND/popcount {bitset_time * 1e3:9.2f} ms "
+              f"({bitsets.words.shape[1]} words per row, {bitsets.fallback_rows.size} rows through CSR)")
+
+if __name__ == "__main__":
+    main()
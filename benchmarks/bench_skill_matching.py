@@ -0,0 +1,97 @@
+"""
+Micro-benchmark: skill canonicalization engine vs. the per-call mapping.
+
+Run from the project root:
+    python -m benchmarks.bench_skill_matching
+"""
+import random
+import timeit
+
+from ml_training.enhanced_matching import (
+    SKILL_MAPPING,
+    normalize_skills,
+    get_matching_skills,
+    get_matching_skill_ids,
+    skill_ids,
+)
+from ml_training.feature_extraction import (
+    jaccard_similarity,
+    skills_overlap,
+    jaccard_similarity_ids,
+    skills_overlap_ids,
+)
+
+def legacy_normalize_skills(skills_list):
+    """normalize_skills as it was before the engine: tables rebuilt per call."""
+    if not skills_list:
+        return []
+    skill_mapping = {canonical: list(variations) for canonical, variations in SKILL_MAPPING.items()}
+    reverse_mapping = {}
+    for canonical, variations in skill_mapping.items():
+        for var in variations:
+            reverse_mapping[var] = canonical
+    normalized = []
+    for skill in skills_list:
+        if not skill:
+            continue
+        skill_lower = skill.lower().strip()
+        normalized.append(reverse_mapping.get(skill_lower, skill_lower))
+    seen = set()
+    return [x for x in normalized if not (x in seen or seen.add(x))]
+
+def legacy_get_matching_skills(seeker_skills, job_skills):
+    if not seeker_skills or not job_skills:
+        return set(), 0.0
+    norm_seeker_skills = legacy_normalize_skills(seeker_skills)
+    norm_job_skills = legacy_normalize_skills(job_skills)
+    matching_skills = set(norm_seeker_skills) & set(norm_job_skills)
+    if not matching_skills:
+        return set(), 0.0
+    union_size = len(set(norm_seeker_skills) | set(norm_job_skills))
+    jaccard = len(matching_skills) / union_size if union_size > 0 else 0
+    job_skills_matched = len(matching_skills) / len(norm_job_skills) if norm_job_skills else 0
+    return matching_skills, jaccard * 0.4 + job_skills_matched * 0.6
+
+def make_profiles(n, seed=42):
+    rnd = random.Random(seed)
+    variations = [v for vs in SKILL_MAPPING.values() for v in vs] + ["excel", "nursing", "customer service"]
+    return [[rnd.choice(variations).title() for _ in range(rnd.randint(1, 8))] for _ in range(n)]
+
+def bench(label, fn, number):
+    seconds = min(timeit.repeat(fn, number=number, repeat=3))
+    print(f"  {label:<44} {seconds / number * 1e6:10.2f} us/call")
+    return seconds / number
+
+def main():
+    seeker = make_profiles(1, seed=1)[0]
+    jobs = make_profiles(500)
+    seeker_ids = skill_ids(seeker)
+    job_ids = [skill_ids(job) for job in jobs]
+    norm_seeker = normalize_skills(seeker)
+    norm_jobs = [normalize_skills(job) for job in jobs]
+
+    # Sanity check: identical results to the legacy implementation
+    for job in jobs:
+        assert legacy_get_matching_skills(seeker, job) == get_matching_skills(seeker, job)
+        assert legacy_normalize_skills(job) == normalize_skills(job)
+
+    print(f"Scoring 1 seeker against {len(jobs)} jobs")
+    legacy = bench("legacy get_matching_skills",
+                   lambda: [legacy_get_matching_skills(seeker, job) for job in jobs], 20)
+    new = bench("get_matching_skills (memoized)",
+                lambda: [get_matching_skills(seeker, job) for job in jobs], 20)
+    ids = bench("get_matching_skill_ids",
+                lambda: [get_matching_skill_ids(seeker_ids, ids) for ids in job_ids], 20)
+    print(f"  speedup: {legacy / new:.1f}x (strings), {legacy / ids:.1f}x (integer IDs)")
+
+    print("Feature helpers over normalized skills")
+    legacy = bench("jaccard_similarity + skills_overlap",
+                   lambda: [(jaccard_similarity(norm_seeker, job), skills_overlap(norm_seeker, job))
+                            for job in norm_jobs], 20)
+    ids = bench("jaccard_similarity_ids + skills_overlap_ids",
+                lambda: [(jaccard_similarity_ids(seeker_ids, job), skills_overlap_ids(seeker_ids, job))
+                         for job in job_ids], 20)
+    print(f"  speedup: {legacy / ids:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: description search over the memory-mapped text index (reading the
+columns of the query's terms) vs. a sparse mat-vec over every stored row,
+with a check that both give the same similarities.
+
+Descriptions draw their words from a Zipf-like vocabulary, so common words
+("experience", "team") occur in most of them as in real postings. The index
+is written to a temporary directory; nothing touches the database.
+
+Run from the project root:
+    python -m benchmarks.bench_text_index
+"""
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import django
+import numpy as np
+import scipy.sparse as sp
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "job_portal_backend.settings")
+django.setup()
+
+from core.ai.text_index import TextIndex, append_text_index, build_text_index, current_name
+from core.ai.topk import top_k_indices
+
+VOCABULARY = [f"term{i}" for i in range(20_000)]
+WEIGHTS = [1.0 / (rank + 1) for rank in range(len(VOCABULARY))]
+N_QUERIES = 200
+APPENDED = 1_000
+
+def make_documents(n, seed, first_id=1):
+    rnd = random.Random(seed)
+    return [(first_id + i, " ".join(rnd.choices(VOCABULARY, WEIGHTS, k=rnd.randint(40, 200)))) for i in range(n)]
+
+def _full_width(segment, n_features):
+    """A segment's rows as a CSC matrix over the whole hashed term space."""
+    indptr = np.zeros(n_features + 1, dtype=np.int64)
+    indptr[np.asarray(segment.terms) + 1] = np.diff(segment.indptr)
+    return sp.csc_matrix((segment.data, segment.indices, np.cumsum(indptr)), shape=(len(segment), n_features))
+
+def main():
+    queries = [" ".join(words) for words in (random.Random(2).choices(VOCABULARY, WEIGHTS, k=4) for _ in range(N_QUERIES))]
+    for n in (10_000, 100_000):
+        documents = make_documents(n, seed=1)
+        root = tempfile.mkdtemp()
+        try:
+            start = time.perf_counter()
+            build_text_index(root, lambda: iter(documents))
+            build_time = time.perf_counter() - start
+            appended = make_documents(APPENDED, seed=3, first_id=n + 1)
+            start = time.perf_counter()
+            append_text_index(root, lambda min_id: (doc for doc in appended if min_id is None or doc[0] > min_id))
+            append_time = time.perf_counter() - start
+            index = TextIndex(os.path.join(root, current_name(root)))
+
+            # Baseline: the same rows as one row-major matrix, multiplied in full
+            full = sp.vstack([_full_width(segment, len(index.idf)) for segment in index.segments], format="csr")
+
+            start = time.perf_counter()
+            indexed = [top_k_indices(index.similarities(q), 10) for q in queries]
+            index_time = (time.perf_counter() - start) / N_QUERIES
+
+            start = time.perf_counter()
+            brute = []
+            for q in queries:
+                terms, weights = index.query_vector(q)
+                vector = sp.csc_matrix((weights, terms, [0, len(terms)]), shape=(len(index.idf), 1))
+                brute.append(top_k_indices((full @ vector).toarray().ravel(), 10))
+            brute_time = (time.perf_counter() - start) / N_QUERIES
+
+            agree = np.mean([np.array_equal(a, b) for a, b in zip(indexed, brute)])
+            print(f"{n + APPENDED:>7} jobs ({len(index.segments)} segments, {full.nnz / len(index):.0f} terms/job): "
+                  f"query {index_time * 1e3:6.2f} ms vs full mat-vec {brute_time * 1e3:6.2f} ms | "
+                  f"same top-10 {agree:6.1%} | build {build_time:5.1f} s, append of {APPENDED} {append_time:4.2f} s")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
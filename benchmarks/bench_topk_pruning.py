@@ -0,0 +1,97 @@
+"""
+Benchmark: bounded-heap top-k with score upper-bound pruning vs. scoring,
+sorting and slicing every candidate in the rule-based scorers, plus
+top_k_indices vs. a full stable argsort for the ML stage.
+
+Run from the project root:
+    python -m benchmarks.bench_topk_pruning
+"""
+import contextlib
+import datetime
+import io
+import os
+import random
+import time
+from types import SimpleNamespace
+
+import django
+import numpy as np
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "job_portal_backend.settings")
+django.setup()
+
+from ml_training.enhanced_matching import SKILL_MAPPING
+from core.ai.job_recommendation import rule_based_job_recommendation
+from core.ai.candidate_recommendation import rule_based_candidate_recommendation
+from core.ai.topk import top_k_indices
+
+LOCATIONS = ["Dar es Salaam", "Arusha", "Mwanza", "Dodoma", "Kibaha", "Morogoro"]
+JOB_TYPES = ["FULL_TIME", "PART_TIME", "CONTRACT", "INTERNSHIP", "TEMPORARY"]
+LEVELS = ["Diploma", "Bachelor", "Masters", "Certificate"]
+FIELDS = ["Computer Science", "Business", "Accounting", "Engineering"]
+VARIATIONS = [v for vs in SKILL_MAPPING.values() for v in vs]
+DEADLINE = datetime.date.today() + datetime.timedelta(days=30)
+TOP_N = 10
+
+def make_seeker(rnd, pk):
+    return SimpleNamespace(
+        pk=pk, id=pk,
+        skills=rnd.sample(VARIATIONS, rnd.randint(1, 8)),
+        education=[{"level": rnd.choice(LEVELS), "field": rnd.choice(FIELDS)}],
+        experience=[{"duration": "2018-present"}, {"duration": "2 years"}],
+        preferred_job_types=rnd.sample(JOB_TYPES, rnd.randint(0, 2)),
+        location=rnd.choice(LOCATIONS),
+        willing_to_relocate=rnd.random() < 0.3,
+        is_available=True,
+    )
+
+def make_job(rnd, pk):
+    return SimpleNamespace(
+        pk=pk, id=pk,
+        skills=rnd.sample(VARIATIONS, rnd.randint(1, 8)),
+        requirements=[{"type": "education", "level": rnd.choice(LEVELS), "field": rnd.choice(FIELDS)}],
+        job_type=rnd.choice(JOB_TYPES),
+        location=rnd.choice(LOCATIONS),
+        application_deadline=DEADLINE,
+    )
+
+def timed(fn):
+    # The scorers print per-candidate debug lines; keep them out of the timings
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+    return result, elapsed
+
+def ranking(recommendations):
+    return [(r.id, r.score) for r in recommendations]
+
+def main():
+    rnd = random.Random(42)
+    for n in (1_000, 10_000, 100_000):
+        seeker, jobs = make_seeker(rnd, 0), [make_job(rnd, i) for i in range(n)]
+        job, seekers = make_job(rnd, 0), [make_seeker(rnd, i) for i in range(n)]
+
+        # top_n=n keeps every candidate, so nothing can be pruned: score all, sort, slice
+        full, full_time = timed(lambda: rule_based_job_recommendation(seeker, jobs, n)[:TOP_N])
+        top, top_time = timed(lambda: rule_based_job_recommendation(seeker, jobs, TOP_N))
+        assert ranking(full) == ranking(top)
+        print(f"{n:>7} jobs, rule-based top {TOP_N}: full sort {full_time * 1e3:9.1f} ms | "
+              f"heap + pruning {top_time * 1e3:8.1f} ms | {full_time / top_time:5.1f}x")
+
+        full, full_time = timed(lambda: rule_based_candidate_recommendation(job, seekers, n)[:TOP_N])
+        top, top_time = timed(lambda: rule_based_candidate_recommendation(job, seekers, TOP_N))
+        assert ranking(full) == ranking(top)
+        print(f"{n:>7} seekers, rule-based top {TOP_N}: full sort {full_time * 1e3:9.1f} ms | "
+              f"heap + pruning {top_time * 1e3:8.1f} ms | {full_time / top_time:5.1f}x")
+
+        # Model scores are coarse (few distinct leaf sums), so ties are common
+        scores = np.round(np.random.default_rng(n).random(n), 3)
+        order, sort_time = timed(lambda: np.argsort(-scores, kind="stable")[:TOP_N])
+        selected, select_time = timed(lambda: top_k_indices(scores, TOP_N))
+        assert np.array_equal(order, selected)
+        print(f"{n:>7} model scores, top {TOP_N}: stable argsort {sort_time * 1e3:7.2f} ms | "
+              f"top_k_indices {select_time * 1e3:6.2f} ms | {sort_time / select_time:5.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark: CatBoost predict_proba vs. the NumPy oblivious-tree evaluator, by batch size.
+
+Run from the project root (after `python manage.py export_tree_models`):
+    python -m benchmarks.bench_tree_evaluator
+"""
+import os
+import timeit
+
+import numpy as np
+import pandas as pd
+from catboost import CatBoostClassifier
+
+from core.ai.oblivious_trees import ObliviousTrees
+
+MODELS_DIR = os.path.join("core", "ai", "models")
+DATA_DIR = os.path.join("ml_training", "data")
+MODELS = {
+    "job_recommendation_model": "job_recommendation_training.csv",
+    "candidate_recommendation_model": "candidate_recommendation_training.csv",
+}
+
+def per_call(fn):
+    number = 200
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+def main():
+    for stem, csv in MODELS.items():
+        catboost_model = CatBoostClassifier()
+        catboost_model.load_model(os.path.join(MODELS_DIR, stem + ".cbm"))
+        trees = ObliviousTrees.load(os.path.join(MODELS_DIR, stem + ".npz"))
+        X = pd.read_csv(os.path.join(DATA_DIR, csv))[trees.feature_names].to_numpy(dtype=np.float32)
+        assert np.allclose(catboost_model.predict_proba(X), trees.predict_proba(X), rtol=0, atol=1e-9)
+
+        print(f"{stem} ({trees.tree_count} trees)")
+        for batch in (1, 10, 50, 100, 500, 1000, 5000):
+            rows = X[:batch]
+            cat_time = per_call(lambda: catboost_model.predict_proba(rows))
+            np_time = per_call(lambda: trees.predict_proba(rows))
+            print(f"  {batch:>5} rows: catboost {cat_time * 1e6:9.1f} us | numpy {np_time * 1e6:8.1f} us | "
+                  f"{cat_time / np_time:5.1f}x")
+
+if __name__ == "__main__":
+    main()
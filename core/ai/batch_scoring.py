@@ -0,0 +1,181 @@
+"""
+Offline batch scoring of every job seeker against every open job.
+precompute_recommendations shards the seekers into ID ranges of
+`chunk_size` seekers and hands them to a ProcessPoolExecutor. Each worker
+process loads the open jobs once as slim rows, with their skill matrix, then
+for each shard:
+- builds the feature rows of all the shard's seekers;
+- scores them with one model call (recommend_jobs_for_seekers);
+- upserts the shard's SeekerRecommendation rows in bulk.
+A PrecomputeRun row records when the run started, so --resume picks an
+interrupted run up where it stopped.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.db import connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.ai.job_recommendation import recommend_jobs_for_seekers
+from core.ai.ml_stage import ML_SCORE_THRESHOLD
+from core.ai.model_registry import registry
+from core.ai.recommendation_store import TOP_N, save_records, stale_seekers
+from core.ai.skill_matrix import SkillMatrix
+from core.ai.streaming import SlimJob, SlimSeeker, stream_chunk_size
+
+# Open jobs of the current run, loaded once per worker process
+_catalog = None
+
+
+class JobCatalog:
+    """Open jobs as slim rows in pk order, with their skill matrix."""
+
+    def __init__(self, run_id):
+        from core.models import Job
+
+        self.run_id = run_id
+        rows = (
+            SlimJob.values_list(Job.objects.filter(application_deadline__gte=timezone.now().date()).order_by('pk'))
+            .iterator(chunk_size=stream_chunk_size())
+        )
+        self.jobs = [SlimJob(values) for values in rows]
+        self.matrix = SkillMatrix(self.jobs)
+
+
+def job_catalog(run_id):
+    """The open jobs of run `run_id`, loaded by the first shard a process scores."""
+    global _catalog
+    if _catalog is None or _catalog.run_id != run_id:
+        _catalog = JobCatalog(run_id)
+    return _catalog
+
+
+def start_run(stale_only=False, resume=False):
+    """
+    Start a precompute run, or resume the last unfinished one
+
+    Args:
+        stale_only: Only score seekers without a fresh row
+        resume: Continue the last unfinished run if it scored with the current model
+
+    Returns:
+        Tuple of (PrecomputeRun, whether it was resumed)
+    """
+    from core.models import PrecomputeRun
+
+    model_version = registry.version('job')
+    if resume:
+        run = PrecomputeRun.objects.filter(finished_at__isnull=True).order_by('-started_at').first()
+        if run is not None and run.model_version == model_version:
+            return run, True
+    run = PrecomputeRun.objects.create(started_at=timezone.now(), model_version=model_version, stale_only=stale_only)
+    return run, False
+
+
+def seekers_to_score(run):
+    """Seekers run `run` still has to score: all (or the stale ones), minus those it already wrote."""
+    from authentication.models import JobSeekerProfile
+
+    seekers = JobSeekerProfile.objects.all()
+    if run.stale_only:
+        seekers = stale_seekers(seekers)
+    return seekers.exclude(
+        Q(job_recommendations__computed_at__gte=run.started_at)
+        & Q(job_recommendations__model_version=run.model_version)
+        & Q(job_recommendations__dirty_since__isnull=True)
+    )
+
+
+def seeker_shards(run, chunk_size):
+    """(first ID, last ID) ranges of at most `chunk_size` seekers still to score."""
+    seeker_ids = list(seekers_to_score(run).order_by('pk').values_list('pk', flat=True))
+    return [
+        (seeker_ids[start], seeker_ids[min(start + chunk_size, len(seeker_ids)) - 1])
+        for start in range(0, len(seeker_ids), chunk_size)
+    ]
+
+
+def score_shard(run_id, first_id, last_id):
+    """
+    Score the seekers of one ID range and upsert their rows (runs in a worker)
+
+    Args:
+        run_id: PrecomputeRun ID
+        first_id, last_id: Inclusive seeker ID range
+
+    Returns:
+        Number of rows written
+    """
+    from core.models import PrecomputeRun, SeekerRecommendation
+
+    run = PrecomputeRun.objects.get(pk=run_id)
+    catalog = job_catalog(run_id)
+    started_at = timezone.now()
+    seekers = [
+        SlimSeeker(values)
+        for values in SlimSeeker.values_list(seekers_to_score(run).filter(pk__range=(first_id, last_id)).order_by('pk'))
+    ]
+    if not seekers:
+        return 0
+
+    results = recommend_jobs_for_seekers(seekers, catalog.jobs, TOP_N, ML_SCORE_THRESHOLD, catalog.matrix)
+    computed_at = timezone.now()
+    save_records([
+        SeekerRecommendation(
+            seeker_id=seeker.id,
+            job_ids=[recommendation.id for recommendation in recommended],
+            scores=diagnostics.get('scores', []),
+            engine=diagnostics.get('engine', ''),
+            selection=diagnostics.get('selection', ''),
+            model_version=run.model_version,
+            computed_at=computed_at,
+        )
+        for seeker, (recommended, diagnostics) in zip(seekers, results)
+    ], started_at)
+    return len(seekers)
+
+
+def run_precompute(run, workers=1, chunk_size=500, progress=None):
+    """
+    Score every seeker of a run, `workers` processes in parallel
+
+    Args:
+        run: PrecomputeRun (see start_run)
+        workers: Worker processes; 1 scores in this process
+        chunk_size: Seekers per shard (one model call and one bulk write each)
+        progress: Optional callable receiving (shards done, shards, rows written)
+
+    Returns:
+        Number of rows written by this invocation
+    """
+    from core.models import PrecomputeRun
+
+    shards = seeker_shards(run, chunk_size)
+    written = 0
+
+    def done(count, finished):
+        nonlocal written
+        written += count
+        PrecomputeRun.objects.filter(pk=run.pk).update(written=F('written') + count)
+        if progress:
+            progress(finished, len(shards), written)
+
+    if workers <= 1:
+        for finished, (first_id, last_id) in enumerate(shards, 1):
+            done(score_shard(run.pk, first_id, last_id), finished)
+    elif shards:
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(score_shard, run.pk, first_id, last_id) for first_id, last_id in shards]
+            for finished, future in enumerate(as_completed(futures), 1):
+                done(future.result(), finished)
+
+    PrecomputeRun.objects.filter(pk=run.pk).update(finished_at=timezone.now())
+    return written
+
+
+def _init_worker():
+    # Spawned workers start a fresh interpreter; forked ones already have Django set up
+    django.setup()
@@ -1,30 +1,43 @@
 # AI logic for candidate recommendations for recruiters
 # Placeholder for actual ML model integration
 
+import logging
 import numpy as np
 import os
-from catboost import CatBoostClassifier
 from typing import List, Dict, Any, Tuple
 from django.conf import settings
 from ml_training.feature_extraction import (
-    jaccard_similarity, 
-    skills_overlap,
-    education_match,
-    location_match,
-    preferred_job_type_match
+    jaccard_similarity_ids,
+    skills_overlap_ids,
 )
 from ml_training.enhanced_matching import (
     normalize_skills,
+    skill_ids,
     extract_experience_years,
     education_level_score,
     job_type_match,
     enhanced_location_match,
-    get_matching_skills
 )
+from ml_training.gazetteer import places_within
+
+from core.ai.explain import explain_rows
+from core.ai.ml_stage import accepts_job_type, meets_experience
+from core.ai.model_registry import registry
+from core.ai.prediction_cache import cached_predict_proba
+from core.ai.results import Recommendation
+from core.ai.snapshot import current_snapshot
+from core.ai.streaming import RowStream, SlimSeeker, load_instances
+from core.ai.topk import BOUND_EPSILON, TopK, top_k_indices
+
+logger = logging.getLogger(__name__)
 
 MODEL_PATH = os.path.join(os.path.dirname(__file__), 'models/candidate_recommendation_model.cbm')
-candidate_catboost_model = CatBoostClassifier()
-candidate_catboost_model.load_model(MODEL_PATH)
+
+def __getattr__(name):
+    # The CatBoost model is loaded lazily (and hot-reloaded) by the model registry
+    if name == 'candidate_catboost_model':
+        return registry.get('candidate')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 FEATURE_ORDER = [
     "skills_jaccard",
@@ -40,7 +53,18 @@ FEATURE_ORDER = [
     "is_available",
 ]
 
-from core.ai.feature_extraction import as_dict_job_seeker, as_dict_job
+# At most the education (20%), location (10%), experience (10%), job type (5%)
+# and rating bonus (5%) components add to the skills component of a rule-based
+# candidate score
+RULE_NON_SKILL_WEIGHT = 0.2 + 0.1 + 0.1 + 0.05 + 0.05
+
+from core.ai.feature_extraction import as_dict_job_seeker, as_dict_job, build_feature_matrix
+from core.ai.feature_store import (
+    experience_years_of, seeker_education_of, job_education_of, location_place_of, parsed_education_score,
+)
+from core.ai.skill_matrix import SkillMatrix
+from core.ai.skill_bitset import chunk_skill_matrix
+from core.ai.skill_index import candidate_seekers_for_job
 
 def extract_candidate_features(seeker, job):
     """Extract features for candidate recommendation model"""
@@ -51,12 +75,12 @@ def extract_candidate_features(seeker, job):
     features = {}
     
     # Skills features
-    seeker_skills = normalize_skills(seeker_dict.get("skills", []))
-    job_skills = normalize_skills(job_dict.get("skills", []))
+    seeker_skills = skill_ids(seeker_dict.get("skills", []))
+    job_skills = skill_ids(job_dict.get("skills", []))
     
     if seeker_skills and job_skills:
-        features["skills_jaccard"] = jaccard_similarity(seeker_skills, job_skills)
-        features["skills_overlap"] = skills_overlap(seeker_skills, job_skills)
+        features["skills_jaccard"] = jaccard_similarity_ids(seeker_skills, job_skills)
+        features["skills_overlap"] = skills_overlap_ids(seeker_skills, job_skills)
     else:
         features["skills_jaccard"] = 0.0
         features["skills_overlap"] = 0.0
@@ -108,7 +132,38 @@ def extract_candidate_features(seeker, job):
     return [features.get(f, 0) for f in FEATURE_ORDER]
 
 
-def rule_based_candidate_recommendation(job, seekers, top_n=10):
+def extract_candidate_feature_matrix(job, seekers):
+    """
+    Batched extract_candidate_features for one job against many seekers.
+    The job side (skills, requirements, ...) is computed once.
+    
+    Args:
+        job: The job
+        seekers: Job seekers to build feature rows for
+        
+    Returns:
+        float32 NumPy array of shape (len(seekers), len(FEATURE_ORDER))
+    """
+    return build_feature_matrix(list(seekers), job, FEATURE_ORDER)
+
+def explain_candidate_recommendations(job, recommendations, X=None):
+    """
+    Explain recommended candidates with their scores, features and SHAP values
+    
+    Args:
+        job: The job
+        recommendations: Recommendation records of the seekers
+        X: Feature rows of the seekers when already built for scoring,
+            otherwise built here in one batch
+        
+    Returns:
+        List of explanation dicts (see core.ai.explain.explain_rows)
+    """
+    if X is None:
+        X = extract_candidate_feature_matrix(job, [recommendation.obj for recommendation in recommendations])
+    return explain_rows('candidate', recommendations, X, FEATURE_ORDER, 'seeker')
+
+def rule_based_candidate_recommendation(job, seekers, top_n=10, diagnostics=None, engine="rule_based"):
     """
     Enhanced rule-based candidate recommendation that doesn't rely on ML models.
     Uses direct matching on skills, education, and location with weighted scoring.
@@ -116,19 +171,31 @@ def rule_based_candidate_recommendation(job, seekers, top_n=10):
     
     Args:
         job: The job to find candidates for
-        seekers: List of job seekers to consider
+        seekers: List of job seekers to consider, or a RowStream of available
+            seekers (scored chunk by chunk; the records then hold SlimSeeker rows)
         top_n: Number of candidates to return
+        diagnostics: Optional dict receiving the scores of the returned candidates
+        engine: Engine recorded on the results ('rule_based' or 'cold_start')
         
     Returns:
-        List of recommended candidates
+        List of Recommendation records, best first
     """
-    # Only consider available seekers
-    available_seekers = [s for s in seekers if getattr(s, 'is_available', True)]
-    print(f"[DEBUG] Rule-based: {len(available_seekers)} available seekers")
+    if diagnostics is None:
+        diagnostics = {}
     
-    if not available_seekers:
-        print("[DEBUG] No available seekers found")
-        return []
+    if isinstance(seekers, RowStream):
+        # Streamed candidates were filtered to available seekers by the database
+        chunks = seekers
+        logger.debug("Rule-based: streaming available seekers")
+    else:
+        # Only consider available seekers
+        available_seekers = [s for s in seekers if getattr(s, 'is_available', True)]
+        print(f"[DEBUG] Rule-based: {len(available_seekers)} available seekers")
+        
+        if not available_seekers:
+            print("[DEBUG] No available seekers found")
+            return []
+        chunks = [available_seekers]
     
     # Convert job to dict for feature extraction
     job_dict = as_dict_job(job)
@@ -153,101 +220,131 @@ def rule_based_candidate_recommendation(job, seekers, top_n=10):
     normalized_job_skills = normalize_skills(job_skills)
     print(f"[DEBUG] Job skills (normalized): {normalized_job_skills}")
     
-    # Score each seeker
-    scored_seekers = []
-    for seeker in available_seekers:
-        seeker_dict = as_dict_job_seeker(seeker)
-        seeker_skills = seeker_dict.get("skills", [])
-        
-        # Skip if seeker has no skills
-        if not seeker_skills:
-            print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} has no skills listed, skipping")
-            continue
-        
-        # Normalize seeker skills
-        normalized_seeker_skills = normalize_skills(seeker_skills)
-        print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} normalized skills: {normalized_seeker_skills}")
-        
-        # Get matching skills using enhanced matching with normalized skills
-        matching_skills, skills_score = get_matching_skills(normalized_seeker_skills, normalized_job_skills)
+    job_skill_ids = skill_ids(job_skills)
+    
+    # Parse the job's education requirements and place its location once; each
+    # seeker's education and place come from the feature store
+    job_education = job_education_of(job, job_requirements)
+    job_place = location_place_of(job, job_location)
+    
+    # Score each chunk of seekers; the top_n heap and its floor carry over from
+    # one chunk to the next, and positions keep the input order for ties
+    top = TopK(top_n)
+    pruned = offset = 0
+    for chunk in chunks:
+        # Score the skills of every seeker at once (stored bitsets, else a sparse mat-vec)
+        skill_matrix = chunk_skill_matrix(chunk)
+        skill_scores = skill_matrix.match_scores(job_skill_ids, query_is_job=True)
         
         # STRICT REQUIREMENT: Must have at least one matching skill
-        if not matching_skills:
-            print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} has no matching skills, skipping")
-            continue
-            
-        print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} has matching skills: {matching_skills}, score: {skills_score:.2f}")
-        
-        # Adjust skills score weight (60% weight) - most important
-        skills_score = skills_score * 0.6
-        
-        # Education match (20% weight) using enhanced education matching
-        education_score = education_level_score(seeker_dict.get("education", {}), job_dict.get("requirements", []))
-        print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} education score: {education_score:.2f}")
-        education_score = education_score * 0.2
+        candidate_rows = np.flatnonzero(skill_scores.overlap > 0)
+        print(f"[DEBUG] {len(candidate_rows)} seekers have matching skills "
+              f"({int(np.count_nonzero(skill_matrix.row_sizes == 0))} seekers have no skills listed)")
         
-        # Location match (10% weight) using enhanced location matching
-        location_score = 0.0
-        if job_location and seeker_dict.get("location"):
-            location_score = enhanced_location_match(
-                seeker_dict["location"], 
-                job_location,
-                seeker_dict.get("willing_to_relocate", False)
-            ) * 0.1
-        
-        # Experience match (10% weight) using enhanced experience extraction
-        experience_score = 0.0
-        seeker_exp_years = extract_experience_years(seeker_dict.get("experience", []))
-        
-        # STRICT REQUIREMENT: Must meet minimum experience if specified
-        # Allow 60% of required experience (reduced from 70% to account for data quality issues)
-        if job_min_exp > 0 and seeker_exp_years < job_min_exp * 0.6:
-            print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} has insufficient experience: {seeker_exp_years} vs required {job_min_exp}")
-            continue
+        # Score each seeker, best skill match first: the other components add at most
+        # RULE_NON_SKILL_WEIGHT, so once a seeker's skills cannot lift them into
+        # the top_n, no later seeker of the chunk can and the loop stops
+        skill_order = candidate_rows[np.argsort(-skill_scores.skill_score[candidate_rows], kind="stable")]
+        for position, row in enumerate(skill_order):
+            # Adjust skills score weight (60% weight) - most important
+            skills_score = float(skill_scores.skill_score[row]) * 0.6
+            if not top.can_enter(skills_score + RULE_NON_SKILL_WEIGHT):
+                pruned += len(skill_order) - position
+                break
             
-        if seeker_exp_years >= job_min_exp:
-            experience_score = 0.1  # Full score if they meet minimum requirements
-        elif job_min_exp > 0 and seeker_exp_years > 0:
-            # Partial score if they have some experience but not enough
-            experience_score = (seeker_exp_years / job_min_exp) * 0.05  # Half weight for partial match
-        
-        # Job type match using enhanced job type matching
-        job_type_score = 0.0
-        if job_type and seeker_dict.get("preferred_job_types"):
-            job_type_score = job_type_match(seeker_dict["preferred_job_types"], job_type) * 0.05
-        
-        # Calculate final score
-        score = skills_score + education_score + location_score + experience_score + job_type_score
-        
-        # Add debug info
-        print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} scores: skills={skills_score:.2f}, edu={education_score:.2f}, loc={location_score:.2f}, exp={experience_score:.2f}, type={job_type_score:.2f}")
-        
-        # STRICT REQUIREMENT: Must have a minimum total score
-        if score < 0.3:  # Minimum 30% match required
-            print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} has insufficient total score: {score:.2f}")
-            continue
+            seeker = skill_matrix.items[row]
+            seeker_dict = as_dict_job_seeker(seeker)
             
-        # Add rating bonus (up to 5% extra)
-        rating = getattr(seeker, 'average_rating', 0) or 0
-        if rating > 0:
-            score += (rating / 5.0) * 0.05
-        
-        scored_seekers.append((score, seeker))
+            # Experience match (10% weight) using enhanced experience extraction
+            experience_score = 0.0
+            seeker_exp_years = experience_years_of(seeker, seeker_dict.get("experience", []))
+            
+            # STRICT REQUIREMENT: Must meet minimum experience if specified
+            # Allow 60% of required experience (reduced from 70% to account for data quality issues)
+            if job_min_exp > 0 and seeker_exp_years < job_min_exp * 0.6:
+                print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} has insufficient experience: {seeker_exp_years} vs required {job_min_exp}")
+                continue
+                
+            if seeker_exp_years >= job_min_exp:
+                experience_score = 0.1  # Full score if they meet minimum requirements
+            elif job_min_exp > 0 and seeker_exp_years > 0:
+                # Partial score if they have some experience but not enough
+                experience_score = (seeker_exp_years / job_min_exp) * 0.05  # Half weight for partial match
+            
+            # Job type match using enhanced job type matching
+            job_type_score = 0.0
+            if job_type and seeker_dict.get("preferred_job_types"):
+                job_type_score = job_type_match(seeker_dict["preferred_job_types"], job_type) * 0.05
+            
+            # Upper bounds with full education and location marks: skip the
+            # expensive matching (and the rating query) when even those cannot
+            # reach the threshold or, with the full rating bonus, the top_n
+            upper_bound = skills_score + 0.2 + experience_score + job_type_score
+            if job_location and seeker_dict.get("location"):
+                upper_bound += 0.1
+            if upper_bound + BOUND_EPSILON < 0.3 or not top.can_enter(upper_bound + 0.05):
+                pruned += 1
+                continue
+            
+            # Education match (20% weight) using enhanced education matching
+            seeker_education = seeker_dict.get("education", {})
+            education_score = parsed_education_score(
+                seeker_education_of(seeker, seeker_education), job_education, seeker_education, job_requirements
+            )
+            education_score = education_score * 0.2
+            
+            # Location match (10% weight) using enhanced location matching
+            location_score = 0.0
+            if job_location and seeker_dict.get("location"):
+                location_score = enhanced_location_match(
+                    seeker_dict["location"], 
+                    job_location,
+                    seeker_dict.get("willing_to_relocate", False),
+                    location_place_of(seeker, seeker_dict["location"]),
+                    job_place,
+                ) * 0.1
+            
+            # Calculate final score
+            score = skills_score + education_score + location_score + experience_score + job_type_score
+            
+            # Add debug info
+            print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} scores: skills={skills_score:.2f}, edu={education_score:.2f}, loc={location_score:.2f}, exp={experience_score:.2f}, type={job_type_score:.2f}")
+            
+            # STRICT REQUIREMENT: Must have a minimum total score
+            if score < 0.3:  # Minimum 30% match required
+                print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} has insufficient total score: {score:.2f}")
+                continue
+                
+            # Add rating bonus (up to 5% extra); ratings are Decimals
+            rating = float(getattr(seeker, 'average_rating', 0) or 0)
+            if rating > 0:
+                score += (rating / 5.0) * 0.05
+            
+            # Ties keep the input order of the seekers
+            top.push(score, offset + int(row), seeker)
+        offset += len(chunk)
     
-    # Sort by score (highest first)
-    scored_seekers.sort(reverse=True, key=lambda x: x[0])
+    # Best first, only the top_n were kept
+    ranked = top.items()
+    logger.debug("%d seekers skipped by the score upper bound", pruned)
     
     # Print top scores for debugging
-    if scored_seekers:
-        print(f"[DEBUG] Rule-based top scores: {[round(score, 2) for score, _ in scored_seekers[:5]]}")
+    if ranked:
+        print(f"[DEBUG] Rule-based top scores: {[round(score, 2) for score, _ in ranked[:5]]}")
     else:
         print("[DEBUG] No candidates met the strict matching criteria")
     
     # Return candidates with good scores, up to top_n
-    return [seeker for score, seeker in scored_seekers[:top_n]]
+    diagnostics["scores"] = [round(float(score), 4) for score, _ in ranked]
+    winners = SkillMatrix([seeker for _, seeker in ranked])
+    return [
+        Recommendation(seeker, score, winners.matching_skills(row, job_skill_ids), engine)
+        for row, (score, seeker) in enumerate(ranked)
+    ]
 
 
-def get_candidate_recommendations_for_job(job, seekers, top_n=10, score_threshold=0.15, explain=False):
+def get_candidate_recommendations_for_job(job, seekers=None, top_n=10, score_threshold=0.15, explain=False, diagnostics=None,
+                                          max_distance_km=None):
     """
     Get candidate recommendations for a job using a hybrid approach:
     1. ML model-based scoring (primary approach)
@@ -256,24 +353,63 @@ def get_candidate_recommendations_for_job(job, seekers, top_n=10, score_threshol
     
     Args:
         job: The job to find candidates for
-        seekers: List of job seekers to consider
+        seekers: List of job seekers to consider. Defaults to the available
+            seekers sharing at least one skill with the job, pulled from the
+            skill index and streamed as slim rows in chunks (see
+            core.ai.streaming); only the recommended seekers are loaded as
+            JobSeekerProfile instances
         top_n: Maximum number of recommendations to return
         score_threshold: Minimum score threshold for ML recommendations
-        explain: Whether to include explanation of scores
+        explain: Return explanations (score, features and SHAP values of
+            every recommended candidate, see explain_candidate_recommendations)
+            instead of the records
+        diagnostics: Optional dict filled with the engine used, candidate counts,
+            the top model scores and the scores of the returned candidates
+        max_distance_km: Only consider seekers located at most this far from
+            the job, by the gazetteer places of the feature store (applied by
+            the database for the default candidate set)
         
     Returns:
-        List of recommended candidates
+        List of Recommendation records (seeker, score, matched skills and
+        engine), best first, or of their explanations
     """
-    print(f"[DEBUG] Finding candidates for job ID: {job.id}, title: {job.title}")
-    print(f"[DEBUG] Total seekers to evaluate: {len(seekers)}")
+    if diagnostics is None:
+        diagnostics = {}
     
-    # Filter to only available seekers first
-    available_seekers = [s for s in seekers if getattr(s, 'is_available', True)]
-    print(f"[DEBUG] Available seekers: {len(available_seekers)}")
+    # Candidate generation: union of the skill postings of the job, with the
+    # availability constraint already applied by the database
+    prefiltered = seekers is None
     
-    if not available_seekers:
-        print("[DEBUG] No available seekers found")
-        return []
+    print(f"[DEBUG] Finding candidates for job ID: {job.id}, title: {job.title}")
+    if prefiltered:
+        available_seekers = RowStream(candidate_seekers_for_job(job, max_distance_km), SlimSeeker)
+        chunks = available_seekers
+        logger.debug("Streaming available seekers in chunks of %d", available_seekers.chunk_size)
+    else:
+        print(f"[DEBUG] Total seekers to evaluate: {len(seekers)}")
+        
+        # Filter to only available seekers first
+        available_seekers = [s for s in seekers if getattr(s, 'is_available', True)]
+        if max_distance_km is not None:
+            nearby = set(places_within(location_place_of(job, getattr(job, 'location', None)), max_distance_km))
+            available_seekers = [s for s in available_seekers if location_place_of(s, getattr(s, 'location', None)) in nearby]
+        print(f"[DEBUG] Available seekers: {len(available_seekers)}")
+        
+        if not available_seekers:
+            print("[DEBUG] No available seekers found")
+            return []
+        chunks = [available_seekers]
+    
+    def finish(recommended, X=None):
+        # Streamed records hold slim rows: load the winners, then explain them
+        if prefiltered:
+            from authentication.models import JobSeekerProfile
+            kept = load_instances(recommended, JobSeekerProfile.objects)
+            if X is not None and len(kept) < len(recommended):
+                kept_ids = {id(recommendation) for recommendation in kept}
+                X = X[[i for i, recommendation in enumerate(recommended) if id(recommendation) in kept_ids]]
+            recommended = kept
+        return explain_candidate_recommendations(job, recommended, X) if explain else recommended
     
     # Cold start: if job has minimal data
     min_skills = job.skills and len(job.skills) > 0
@@ -282,7 +418,8 @@ def get_candidate_recommendations_for_job(job, seekers, top_n=10, score_threshol
     if not (min_skills or min_description):
         print("[DEBUG] Using cold start approach - job has minimal data")
         # Use rule-based approach for cold start
-        return rule_based_candidate_recommendation(job, available_seekers, top_n)
+        diagnostics["engine"] = "cold_start"
+        return finish(rule_based_candidate_recommendation(job, available_seekers, top_n, diagnostics, engine="cold_start"))
     
     # Try ML-based recommendation first
     try:
@@ -308,33 +445,51 @@ def get_candidate_recommendations_for_job(job, seekers, top_n=10, score_threshol
             return []
             
         print(f"[DEBUG] Job normalized skills: {normalized_job_skills}")
+        job_skill_ids = skill_ids(job_skills)
         
-        # Pre-filter seekers using enhanced matching functions
-        filtered_seekers = []
-        for seeker in available_seekers:
-            seeker_dict = as_dict_job_seeker(seeker)
-            seeker_skills = seeker_dict.get("skills", [])
+        # Score chunk by chunk, keeping only the best max(top_n, 10) seekers (and
+        # their feature rows) in a heap; positions keep the input order for ties
+        loaded = registry.entry('candidate')
+        top = TopK(max(top_n, 10))
+        candidates = scored_count = 0
+        # The snapshot holds no gazetteer places: distance-filtered requests stream
+        snapshot, changed = current_snapshot('seekers') if prefiltered and max_distance_km is None else (None, None)
+        if snapshot is not None:
+            # Candidates, pre-filters and feature rows read from the shared
+            # snapshot instead of streaming the seekers from the database; only
+            # the seekers changed since the build are streamed. Positions are
+            # the seeker IDs on both sides, i.e. the pk order.
+            chunks = RowStream(candidate_seekers_for_job(job).filter(pk__in=changed), SlimSeeker) if changed else []
+            candidates, rows, X = snapshot.seeker_inputs(job, FEATURE_ORDER, exclude=changed)
+            scored_count = len(rows)
+            if scored_count:
+                scores = cached_predict_proba(loaded, X)
+                for i in top_k_indices(scores, top.k):
+                    top.push(float(scores[i]), int(snapshot.seekers.ids[rows[i]]), (snapshot.seekers.row(rows[i]), X[i]))
+            diagnostics["snapshot"] = snapshot.name
+            diagnostics["snapshot_changed"] = len(changed)
+        for chunk in chunks:
+            offset = candidates
+            candidates += len(chunk)
             
-            # Skip if seeker has no skills
-            if not seeker_skills:
-                print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} has no skills listed, skipping")
-                continue
-                
-            # Normalize seeker skills
-            normalized_seeker_skills = normalize_skills(seeker_skills)
-            print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} normalized skills: {normalized_seeker_skills}")
-                
-            # Use enhanced skill matching
-            matching_skills, skill_score = get_matching_skills(normalized_seeker_skills, normalized_job_skills)
+            # Pre-filter seekers on skills: one bitset AND (or sparse mat-vec) over the chunk
+            skill_matrix = chunk_skill_matrix(chunk)
+            skill_scores = skill_matrix.match_scores(job_skill_ids, query_is_job=True)
+            print(f"[DEBUG] {int(np.count_nonzero(skill_matrix.row_sizes == 0))} seekers have no skills listed")
             
-            if matching_skills:
+            filtered_rows = []
+            for row in np.flatnonzero(skill_scores.overlap > 0):
+                seeker = chunk[row]
+                seeker_dict = as_dict_job_seeker(seeker)
+                matched_count = int(skill_scores.overlap[row])
+                
                 # Also check experience requirements using enhanced extraction
-                seeker_exp_years = extract_experience_years(seeker_dict.get("experience", []))
+                seeker_exp_years = experience_years_of(seeker, seeker_dict.get("experience", []))
                 job_min_exp = job_dict.get("min_experience", 0)
                 
                 # Filter out seekers with significantly less experience than required
                 # Allow 60% of required experience (reduced from 70% to account for data quality issues)
-                if job_min_exp > 0 and seeker_exp_years < job_min_exp * 0.6:
+                if not meets_experience(seeker_exp_years, job_min_exp):
                     print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} has insufficient experience: {seeker_exp_years} vs required {job_min_exp}")
                     continue
                     
@@ -343,54 +498,72 @@ def get_candidate_recommendations_for_job(job, seekers, top_n=10, score_threshol
                 seeker_job_types = seeker_dict.get("preferred_job_types", [])
                 
                 # If seeker has job type preferences and job type doesn't match, skip
-                if seeker_job_types and job_type and not job_type_match(seeker_job_types, job_type):
+                if not accepts_job_type(seeker_job_types, job_type):
                     print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} job type preference doesn't match")
                     continue
                     
-                filtered_seekers.append(seeker)
-                print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} passed pre-filtering with {len(matching_skills)} matching skills")
-            else:
-                print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} has no matching skills, skipping")
+                filtered_rows.append(row)
+                print(f"[DEBUG] Seeker ID {getattr(seeker, 'id', 'unknown')} passed pre-filtering with {matched_count} matching skills")
+            
+            if not filtered_rows:
+                continue
+            scored_count += len(filtered_rows)
+            
+            # ML-based recommendation for jobs with sufficient data
+            X = extract_candidate_feature_matrix(job, [chunk[row] for row in filtered_rows])
+            scores = cached_predict_proba(loaded, X)
+            # Only the chunk's best can enter the heap: select them without a full sort
+            for i in top_k_indices(scores, top.k):
+                row = filtered_rows[i]
+                position = chunk[row].id if snapshot is not None else offset + int(row)
+                top.push(float(scores[i]), position, (chunk[row], X[i]))
         
-        print(f"[DEBUG] {len(filtered_seekers)} seekers passed all pre-filtering criteria")
+        print(f"[DEBUG] {scored_count} seekers passed all pre-filtering criteria")
         
-        if not filtered_seekers:
+        if not scored_count:
             print("[DEBUG] No seekers met the pre-filtering criteria")
             return []
         
-        # ML-based recommendation for jobs with sufficient data
-        features = [extract_candidate_features(seeker, job) for seeker in filtered_seekers]
-        if not features:
-            print("[DEBUG] No features extracted, falling back to rule-based")
-            return rule_based_candidate_recommendation(job, available_seekers, top_n)
-        
-        X = np.stack(features)
-        scores = candidate_catboost_model.predict_proba(X)[:, 1]
-        scored = list(zip(scores, filtered_seekers))
-        scored.sort(reverse=True, key=lambda x: x[0])
+        scored = top.items()
+        diagnostics.update({
+            "engine": "ml",
+            "model_version": loaded.version,
+            "candidates": candidates,
+            "scored": scored_count,
+            "top_scores": [round(float(score), 4) for score, _ in scored[:10]],
+        })
         
         # Print top scores for debugging
         if scored:
             print(f"[DEBUG] ML top scores: {[round(score, 2) for score, _ in scored[:5]]}")
         
         # STRICT REQUIREMENT: Only return candidates with scores above threshold
-        recommended = [seeker for score, seeker in scored[:top_n] if score >= score_threshold]
+        recommended = [(score, item) for score, item in scored[:top_n] if score >= score_threshold]
         
         # If no candidates meet threshold but some have reasonable scores (at least 0.15)
         if not recommended and scored and scored[0][0] >= 0.15:
             print("[DEBUG] No candidates above threshold but some reasonable scores found")
-            recommended = [seeker for score, seeker in scored[:5] if score >= 0.15]
+            recommended = [(score, item) for score, item in scored[:5] if score >= 0.15]
         
         # If still no recommendations, fall back to rule-based
         if not recommended:
             print("[DEBUG] ML model returned no recommendations, falling back to rule-based")
-            return rule_based_candidate_recommendation(job, available_seekers, top_n)
+            diagnostics["engine"] = "rule_based"
+            return finish(rule_based_candidate_recommendation(job, available_seekers, top_n, diagnostics))
             
         print(f"[DEBUG] Returning {len(recommended)} ML-based recommendations")
-        return recommended
+        diagnostics["scores"] = [round(float(score), 4) for score, _ in recommended]
+        winners = SkillMatrix([seeker for _, (seeker, _) in recommended])
+        records = [
+            Recommendation(seeker, score, winners.matching_skills(row, job_skill_ids), "ml")
+            for row, (score, (seeker, _)) in enumerate(recommended)
+        ]
+        # Explanations reuse the feature rows built for scoring
+        return finish(records, np.array([x for _, (_, x) in recommended]) if explain else None)
         
     except Exception as e:
         # If ML approach fails for any reason, fall back to rule-based
         print(f"[DEBUG] ML recommendation failed with error: {str(e)}")
         print("[DEBUG] Falling back to rule-based recommendation")
-        return rule_based_candidate_recommendation(job, available_seekers, top_n)
+        diagnostics.update({"engine": "rule_based", "error": str(e)})
+        return finish(rule_based_candidate_recommendation(job, available_seekers, top_n, diagnostics))
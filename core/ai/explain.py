@@ -0,0 +1,74 @@
+"""
+Explanations of recommendation scores.
+The feature rows of the returned items are explained with CatBoost's
+ShapValues in one batched call per request: per-feature contributions to the
+model's raw score (log-odds) which, added to the expected value, give it back.
+The NumPy backend cannot compute SHAP values, so explanations load the CatBoost
+model its .npz was exported from, on first use only.
+"""
+import os
+
+import numpy as np
+
+from core.ai.model_registry import MODEL_FILES, MODELS_DIR, ModelRegistry, registry
+
+# CatBoost models behind the NumPy backend, loaded by the first explanation
+_catboost_models = ModelRegistry()
+for _name, _stem in MODEL_FILES.items():
+    _catboost_models.register(_name, os.path.join(MODELS_DIR, _stem + '.cbm'))
+
+
+def catboost_model(name):
+    """CatBoost model behind the scores of `name`, whichever backend serves them."""
+    model = registry.get(name)
+    if hasattr(model, 'get_feature_importance'):
+        return model
+    return _catboost_models.get(name)
+
+
+def shap_values(name, X):
+    """
+    SHAP values of feature rows under model `name`, in one batched call
+
+    Args:
+        name: Registered model name ('job' or 'candidate')
+        X: Feature matrix in the model's FEATURE_ORDER
+
+    Returns:
+        Tuple of (contributions of shape (rows, features), expected value)
+    """
+    from catboost import Pool
+
+    X = np.asarray(X, dtype=np.float32)
+    if not len(X):
+        return np.zeros(X.shape), 0.0
+    values = catboost_model(name).get_feature_importance(Pool(X), type='ShapValues')
+    return values[:, :-1], float(values[0, -1])
+
+
+def explain_rows(name, recommendations, X, feature_order, item_key):
+    """
+    Explanation of every returned item: its score, feature values and SHAP contributions
+
+    Args:
+        name: Model the SHAP values are computed with ('job' or 'candidate')
+        recommendations: Returned Recommendation records (core.ai.results)
+        X: Feature rows of the recommended objects, in the same order
+        feature_order: Feature names of the columns of X
+        item_key: Key of the record in each explanation ('job' or 'seeker')
+
+    Returns:
+        List of dicts with the record, "score", "features", "shap" and "expected_value"
+    """
+    X = np.asarray(X, dtype=np.float32).reshape(len(recommendations), len(feature_order))
+    contributions, expected_value = shap_values(name, X)
+    return [
+        {
+            item_key: recommendation,
+            "score": recommendation.score,
+            "features": {feature: round(float(value), 6) for feature, value in zip(feature_order, row)},
+            "shap": {feature: round(float(value), 6) for feature, value in zip(feature_order, contribution)},
+            "expected_value": round(expected_value, 6),
+        }
+        for recommendation, row, contribution in zip(recommendations, X, contributions)
+    ]
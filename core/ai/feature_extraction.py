@@ -6,6 +6,16 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../ml_training')))
 from feature_extraction import *
+import numpy as np
+from ml_training.enhanced_matching import (
+    skill_ids,
+    job_type_match,
+    location_text_score,
+)
+from ml_training.gazetteer import PROXIMITY, UNRESOLVED
+from core.ai.feature_store import (
+    experience_years_of, seeker_education_of, job_education_of, location_place_of, parsed_education_score,
+)
 
 # Adapter: ORM -> dict for ML feature extraction
 
@@ -35,3 +45,164 @@ def as_dict_job(job):
         "experience_level": getattr(job, "experience_level", None),
         "next_step": getattr(job, "next_step", None),
     }
+
+# Batched feature extraction: one entity against many
+
+def _seeker_side(seeker):
+    """Seeker-dependent inputs of the recommendation features, computed once per seeker."""
+    seeker_dict = as_dict_job_seeker(seeker)
+    return {
+        "skill_ids": skill_ids(seeker_dict.get("skills", [])),
+        "education": seeker_dict.get("education", {}),
+        "education_profile": seeker_education_of(seeker, seeker_dict.get("education", {})),
+        "experience_years": experience_years_of(seeker, seeker_dict.get("experience", [])),
+        "preferred_job_types": seeker_dict.get("preferred_job_types", []),
+        "location": seeker_dict.get("location", ""),
+        "location_place": location_place_of(seeker, seeker_dict.get("location", "")),
+        "willing_to_relocate": seeker_dict.get("willing_to_relocate", False),
+        "min_salary": seeker_dict.get("min_salary", 0),
+        "rating": seeker_dict.get("average_rating", 0) / 5.0 if seeker_dict.get("average_rating") else 0.0,
+        "is_available": 1.0 if seeker_dict.get("is_available", True) else 0.0,
+    }
+
+def _job_side(job):
+    """Job-dependent inputs of the recommendation features, computed once per job."""
+    job_dict = as_dict_job(job)
+    return {
+        "skill_ids": skill_ids(job_dict.get("skills", [])),
+        "requirements": job_dict.get("requirements", []),
+        "education_requirements": job_education_of(job, job_dict.get("requirements", [])),
+        "min_experience": job_dict.get("min_experience", 0),
+        "job_type": job_dict.get("job_type", ""),
+        "location": job_dict.get("location", ""),
+        "location_place": location_place_of(job, job_dict.get("location", "")),
+        "min_salary": job_dict.get("min_salary", 0),
+        "max_salary": job_dict.get("max_salary", 0),
+    }
+
+def build_feature_matrix(seekers, jobs, feature_order):
+    """
+    Build the float32 feature matrix of (seeker, job) pairs, one entity against many.
+    Row i matches extract_job_features / extract_candidate_features for pair i.
+
+    Args:
+        seekers: One seeker, or a list of seekers when `jobs` is a single job
+        jobs: One job, or a list of jobs when `seekers` is a single seeker
+        feature_order: Column order of the matrix (FEATURE_ORDER)
+
+    Returns:
+        NumPy float32 array of shape (n_pairs, len(feature_order))
+    """
+    from core.ai.skill_matrix import SkillMatrix
+
+    many_jobs = isinstance(jobs, (list, tuple))
+    many = list(jobs) if many_jobs else list(seekers)
+    one = seekers if many_jobs else jobs
+    n = len(many)
+    if many_jobs:
+        seeker_sides, job_sides = [_seeker_side(one)], [_job_side(job) for job in many]
+    else:
+        seeker_sides, job_sides = [_seeker_side(seeker) for seeker in many], [_job_side(one)]
+    one_side = seeker_sides[0] if many_jobs else job_sides[0]
+    many_sides = job_sides if many_jobs else seeker_sides
+
+    def seeker_values(key):
+        return np.array([side[key] for side in seeker_sides], dtype=np.float64)
+
+    def job_values(key):
+        return np.array([side[key] for side in job_sides], dtype=np.float64)
+
+    # Skills: one sparse mat-vec of the single entity against the many
+    matrix = SkillMatrix.from_skill_ids([side["skill_ids"] for side in many_sides])
+    scores = matrix.match_scores(one_side["skill_ids"])
+
+    # Education and the categorical matches depend on both sides: evaluate them
+    # once per distinct input instead of once per pair
+    education = np.zeros(n, dtype=np.float64)
+    job_type_scores = np.zeros(n, dtype=np.float64)
+    location_text = np.zeros(n, dtype=np.float64)
+    job_type_memo, location_memo = {}, {}
+    for i in range(n):
+        seeker_side = seeker_sides[0 if many_jobs else i]
+        job_side = job_sides[i if many_jobs else 0]
+        if seeker_side["education"] and job_side["requirements"]:
+            education[i] = parsed_education_score(
+                seeker_side["education_profile"], job_side["education_requirements"],
+                seeker_side["education"], job_side["requirements"],
+            )
+
+        key = (tuple(seeker_side["preferred_job_types"] or ()), job_side["job_type"])
+        if key not in job_type_memo:
+            job_type_memo[key] = job_type_match(seeker_side["preferred_job_types"], job_side["job_type"])
+        job_type_scores[i] = job_type_memo[key]
+
+        key = (seeker_side["location"], job_side["location"], seeker_side["willing_to_relocate"])
+        if key not in location_memo:
+            location_memo[key] = location_text_score(*key)
+        location_text[i] = location_memo[key]
+
+    # Nearby gazetteer places lift the text match (as enhanced_location_match
+    # does): one gather from the place x place proximity matrix
+    def places(sides):
+        return np.array([side["location_place"] or UNRESOLVED for side in sides], dtype=np.intp)
+
+    location_scores = np.maximum(location_text, PROXIMITY[places(seeker_sides), places(job_sides)])
+    pair_scores = {
+        "education_match": education,
+        "preferred_job_type_match": job_type_scores,
+        "location_match": location_scores,
+    }
+    return assemble_feature_matrix(n, scores, pair_scores, seeker_values, job_values, feature_order)
+
+def assemble_feature_matrix(n, skill_scores, pair_scores, seeker_values, job_values, feature_order):
+    """
+    Combine the per-side inputs and pairwise scores of n pairs into the feature matrix
+
+    Args:
+        n: Number of pairs
+        skill_scores: SkillMatchScores of the pairs
+        pair_scores: Dict of the education_match, preferred_job_type_match and
+            location_match arrays of the pairs
+        seeker_values: Callable returning an array (length 1 or n) of a seeker-side input
+        job_values: Callable returning an array (length 1 or n) of a job-side input
+        feature_order: Column order of the matrix (FEATURE_ORDER)
+
+    Returns:
+        NumPy float32 array of shape (n, len(feature_order))
+    """
+    features = dict(pair_scores)
+    features["skills_jaccard"] = skill_scores.jaccard
+    features["skills_overlap"] = skill_scores.overlap.astype(np.float64)
+
+    # Experience
+    experience_years = np.broadcast_to(seeker_values("experience_years"), (n,))
+    job_min_exp = np.broadcast_to(job_values("min_experience"), (n,))
+    features["experience_years"] = experience_years
+    features["job_experience_required"] = job_min_exp
+    features["experience_gap"] = np.where(job_min_exp > 0, np.maximum(0, job_min_exp - experience_years), 0)
+
+    # Salary
+    seeker_min_salary = np.broadcast_to(seeker_values("min_salary"), (n,))
+    job_min_salary = np.broadcast_to(job_values("min_salary"), (n,))
+    job_max_salary = np.broadcast_to(job_values("max_salary"), (n,))
+    features["salary_within_range"] = np.select(
+        [
+            (seeker_min_salary > 0) & (job_max_salary > 0),
+            (seeker_min_salary > 0) & (job_min_salary > 0),
+        ],
+        [
+            (seeker_min_salary <= job_max_salary).astype(np.float64),
+            (seeker_min_salary <= job_min_salary * 1.2).astype(np.float64),
+        ],
+        default=0.5,  # Neutral when salary info is missing
+    )
+
+    # Other features
+    features["seeker_rating"] = np.broadcast_to(seeker_values("rating"), (n,))
+    features["is_available"] = np.broadcast_to(seeker_values("is_available"), (n,))
+
+    X = np.zeros((n, len(feature_order)), dtype=np.float32)
+    for column, name in enumerate(feature_order):
+        if name in features:
+            X[:, column] = features[name]
+    return X
@@ -0,0 +1,154 @@
+"""
+Feature store of the recommendation engines.
+Parsing experience durations, ranking education entries, averaging ratings,
+canonicalizing skills (into packed bitsets, see core.ai.skill_bitset) and
+resolving locations to gazetteer places (ml_training.gazetteer) used to run
+for every scored (seeker, job) pair of every request, although
+they depend on one side only. SeekerFeatures and JobFeatures keep them per
+seeker and per job: core.signals recomputes a row on every save of its
+profile, job or rating, and the candidate streams read it with the row
+(see core.ai.streaming), so scoring a pair is arithmetic only. Entities
+without a stored row (e.g. before `manage.py rebuild_feature_store` ran)
+are derived on the fly.
+"""
+from datetime import datetime
+
+from django.db import transaction
+
+from core.ai.skill_bitset import skill_bitset
+from ml_training.gazetteer import resolve_location
+from ml_training.enhanced_matching import (
+    extract_experience_years,
+    education_level_score,
+    compile_seeker_education,
+    compile_job_education,
+    compiled_education_score,
+)
+
+
+def seeker_feature_values(seeker):
+    """Field values of the SeekerFeatures row of a profile."""
+    average_rating = seeker.average_rating
+    return {
+        'experience_years': extract_experience_years(getattr(seeker, 'experience', None) or []),
+        'experience_year': datetime.now().year,
+        'education': compile_seeker_education(getattr(seeker, 'education', None)),
+        'average_rating': float(average_rating) if average_rating is not None else None,
+        'skill_bits': skill_bitset(getattr(seeker, 'skills', None)),
+        'location_place': resolve_location(getattr(seeker, 'location', None)),
+    }
+
+def update_seeker_features(seeker):
+    """
+    Recompute the feature store row of a single job seeker
+
+    Args:
+        seeker: Saved JobSeekerProfile instance
+    """
+    from core.models import SeekerFeatures
+
+    SeekerFeatures.objects.update_or_create(seeker_id=seeker.pk, defaults=seeker_feature_values(seeker))
+
+def update_seeker_rating(seeker_id):
+    """Refresh the stored average rating of a seeker after one of their ratings changed."""
+    from authentication.models import JobSeekerProfile
+    from core.models import SeekerFeatures
+
+    average_rating = JobSeekerProfile(id=seeker_id).average_rating
+    SeekerFeatures.objects.filter(seeker_id=seeker_id).update(
+        average_rating=float(average_rating) if average_rating is not None else None,
+    )
+
+def update_job_features(job):
+    """
+    Recompute the feature store row of a single job
+
+    Args:
+        job: Saved Job instance
+    """
+    from core.models import JobFeatures
+
+    JobFeatures.objects.update_or_create(job_id=job.pk, defaults={
+        'education': compile_job_education(job.requirements),
+        'skill_bits': skill_bitset(job.skills),
+        'location_place': resolve_location(job.location),
+    })
+
+def rebuild_feature_store(batch_size=1000):
+    """
+    Recompute the feature store rows of every job and seeker from scratch
+
+    Returns:
+        Tuple of (job rows written, seeker rows written)
+    """
+    from authentication.models import JobSeekerProfile
+    from core.models import Job, JobFeatures, SeekerFeatures
+
+    with transaction.atomic():
+        JobFeatures.objects.all().delete()
+        jobs = 0
+        batch = []
+        jobs_values = Job.objects.values_list('id', 'requirements', 'skills', 'location')
+        for job_id, requirements, skills, location in jobs_values.iterator(chunk_size=batch_size):
+            batch.append(JobFeatures(
+                job_id=job_id, education=compile_job_education(requirements), skill_bits=skill_bitset(skills),
+                location_place=resolve_location(location),
+            ))
+            if len(batch) >= batch_size:
+                jobs += len(JobFeatures.objects.bulk_create(batch))
+                batch = []
+        jobs += len(JobFeatures.objects.bulk_create(batch))
+
+        SeekerFeatures.objects.all().delete()
+        seekers = 0
+        batch = []
+        for seeker in JobSeekerProfile.objects.only('id', 'skills', 'experience', 'education', 'location').iterator(chunk_size=batch_size):
+            batch.append(SeekerFeatures(seeker_id=seeker.pk, **seeker_feature_values(seeker)))
+            if len(batch) >= batch_size:
+                seekers += len(SeekerFeatures.objects.bulk_create(batch))
+                batch = []
+        seekers += len(SeekerFeatures.objects.bulk_create(batch))
+    return jobs, seekers
+
+# Readers: stored values come with the slim rows of the candidate streams
+# (attributes feature_*); model instances and rows without a stored row are
+# derived from the raw fields
+
+def experience_years_of(seeker, experience):
+    """Total experience years of a seeker; `experience` is their raw experience list."""
+    stored = getattr(seeker, 'feature_experience_years', None)
+    # Durations ending 'present' count up to the current year
+    if stored is not None and getattr(seeker, 'feature_experience_year', None) == datetime.now().year:
+        return stored
+    return extract_experience_years(experience)
+
+def seeker_education_of(seeker, education):
+    """Parsed education of a seeker; `education` is their raw education list."""
+    stored = getattr(seeker, 'feature_education', None)
+    return stored if stored is not None else compile_seeker_education(education)
+
+def job_education_of(job, requirements):
+    """Parsed education requirements of a job; `requirements` is its raw requirements list."""
+    stored = getattr(job, 'feature_education', None)
+    return stored if stored is not None else compile_job_education(requirements)
+
+def location_place_of(entity, location):
+    """Gazetteer place ID of a seeker's or job's location; `location` is the raw string."""
+    stored = getattr(entity, 'feature_location_place', None)
+    return stored if stored is not None else resolve_location(location)
+
+def parsed_education_score(seeker_education, job_education, raw_education, raw_requirements):
+    """
+    education_level_score of a pair from its parsed sides
+
+    Args:
+        seeker_education: seeker_education_of() of the seeker
+        job_education: job_education_of() of the job
+        raw_education, raw_requirements: The raw lists, scored directly when
+            a side could not be parsed
+
+    Returns:
+        Education match score between 0.0 and 1.0
+    """
+    score = compiled_education_score(seeker_education, job_education)
+    return education_level_score(raw_education, raw_requirements) if score is None else score
@@ -1,31 +1,42 @@
 # AI logic for job recommendations for job seekers
 # Placeholder for actual ML model integration
 
+import logging
 import numpy as np
 import os
-import pickle
 from typing import List, Dict, Any, Tuple
 from django.conf import settings
-from catboost import CatBoostClassifier
+
+from core.ai.explain import explain_rows
+from core.ai.ml_stage import ML_SCORE_THRESHOLD, job_prefilter, score_jobs, select_recommendations
+from core.ai.model_registry import registry
+from core.ai.results import Recommendation
+from core.ai.snapshot import current_snapshot
+from core.ai.text_index import job_text_scorer, seeker_text_scorer
+from core.ai.streaming import RowStream, SlimJob, load_instances
+from core.ai.topk import BOUND_EPSILON, TopK, top_k_indices
+
+logger = logging.getLogger(__name__)
 
 MODEL_PATH = os.path.join(os.path.dirname(__file__), 'models/job_recommendation_model.cbm')
-job_catboost_model = CatBoostClassifier()
-job_catboost_model.load_model(MODEL_PATH)
+
+def __getattr__(name):
+    # The CatBoost model is loaded lazily (and hot-reloaded) by the model registry
+    if name == 'job_catboost_model':
+        return registry.get('job')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 from ml_training.feature_extraction import (
-    jaccard_similarity, 
-    skills_overlap,
-    education_match,
-    location_match,
-    preferred_job_type_match
+    jaccard_similarity_ids,
+    skills_overlap_ids,
 )
 from ml_training.enhanced_matching import (
     normalize_skills,
+    skill_ids,
     extract_experience_years,
     education_level_score,
     job_type_match,
     enhanced_location_match,
-    get_matching_skills
 )
 
 FEATURE_ORDER = [
@@ -42,7 +53,17 @@ FEATURE_ORDER = [
     "is_available",
 ]
 
-from core.ai.feature_extraction import as_dict_job_seeker, as_dict_job
+# At most the education (15%), location (15%) and job type (10%) components add
+# to the skills component of a rule-based job score
+RULE_NON_SKILL_WEIGHT = 0.15 + 0.15 + 0.1
+
+from core.ai.feature_extraction import as_dict_job_seeker, as_dict_job, build_feature_matrix
+from core.ai.feature_store import (
+    seeker_education_of, job_education_of, location_place_of, parsed_education_score,
+)
+from core.ai.skill_matrix import SkillMatrix
+from core.ai.skill_bitset import chunk_skill_matrix
+from core.ai.skill_index import candidate_jobs_for_seeker
 
 def extract_job_features(seeker, job):
     """Extract features for job recommendation model"""
@@ -53,12 +74,12 @@ def extract_job_features(seeker, job):
     features = {}
     
     # Skills features
-    seeker_skills = normalize_skills(seeker_dict.get("skills", []))
-    job_skills = normalize_skills(job_dict.get("skills", []))
+    seeker_skills = skill_ids(seeker_dict.get("skills", []))
+    job_skills = skill_ids(job_dict.get("skills", []))
     
     if seeker_skills and job_skills:
-        features["skills_jaccard"] = jaccard_similarity(seeker_skills, job_skills)
-        features["skills_overlap"] = skills_overlap(seeker_skills, job_skills)
+        features["skills_jaccard"] = jaccard_similarity_ids(seeker_skills, job_skills)
+        features["skills_overlap"] = skills_overlap_ids(seeker_skills, job_skills)
     else:
         features["skills_jaccard"] = 0.0
         features["skills_overlap"] = 0.0
@@ -109,7 +130,67 @@ def extract_job_features(seeker, job):
     # Return features in the expected order
     return [features.get(f, 0) for f in FEATURE_ORDER]
 
-def rule_based_job_recommendation(seeker, jobs, top_n=10):
+def extract_job_feature_matrix(seeker, jobs):
+    """
+    Batched extract_job_features for one seeker against many jobs.
+    The seeker side (skills, experience years, ...) is computed once.
+    
+    Args:
+        seeker: The job seeker
+        jobs: Jobs to build feature rows for
+        
+    Returns:
+        float32 NumPy array of shape (len(jobs), len(FEATURE_ORDER))
+    """
+    return build_feature_matrix(seeker, list(jobs), FEATURE_ORDER)
+
+def explain_job_recommendations(seeker, recommendations, X=None):
+    """
+    Explain recommended jobs with their scores, features and SHAP values
+    
+    Args:
+        seeker: The job seeker
+        recommendations: Recommendation records of the jobs
+        X: Feature rows of the jobs when already built for scoring, otherwise
+            built here in one batch
+        
+    Returns:
+        List of explanation dicts (see core.ai.explain.explain_rows)
+    """
+    if X is None:
+        X = extract_job_feature_matrix(seeker, [recommendation.obj for recommendation in recommendations])
+    return explain_rows('job', recommendations, X, FEATURE_ORDER, 'job')
+
+def score_job_for_seekers(job, seekers):
+    """
+    Score one job for many seekers the way the ML stage of
+    get_job_recommendations_for_seeker scores it for each of them (same
+    pre-filters, model score and description term, see core.ai.ml_stage).
+    Used to merge a new job into materialized recommendations without
+    rescoring whole catalogs.
+    
+    Args:
+        job: The job
+        seekers: Seekers found for the job by the retrieval stage
+        
+    Returns:
+        Tuple of (NumPy array of ranking scores, NaN where the job is
+        pre-filtered out for the seeker, model version)
+    """
+    kept = [i for i, seeker in enumerate(seekers) if job_prefilter(seeker, as_dict_job_seeker(seeker))(job)]
+    
+    loaded = registry.entry('job')
+    scores = np.full(len(seekers), np.nan)
+    if kept:
+        X = build_feature_matrix([seekers[i] for i in kept], job, FEATURE_ORDER)
+        scores[kept] = score_jobs(loaded, X)
+        # The description term of every kept seeker in one pass over their experience texts
+        text_boost = job_text_scorer(job.pk)
+        if text_boost is not None:
+            scores[kept] += text_boost([seekers[i] for i in kept])
+    return scores, loaded.version
+
+def rule_based_job_recommendation(seeker, jobs, top_n=10, diagnostics=None, engine="rule_based"):
     """
     Enhanced rule-based job recommendation that doesn't rely on ML models.
     Uses direct matching on skills, education, and location with weighted scoring.
@@ -117,22 +198,33 @@ def rule_based_job_recommendation(seeker, jobs, top_n=10):
     
     Args:
         seeker: The job seeker to find jobs for
-        jobs: List of jobs to consider
+        jobs: List of jobs to consider, or a RowStream of open jobs (scored
+            chunk by chunk; the records then hold SlimJob rows)
         top_n: Number of jobs to return
+        diagnostics: Optional dict receiving the scores of the returned jobs
+        engine: Engine recorded on the results ('rule_based' or 'cold_start')
         
     Returns:
-        List of recommended jobs
+        List of Recommendation records, best first
     """
     from django.utils import timezone
+    if diagnostics is None:
+        diagnostics = {}
     
-    # Filter to active jobs first
-    active_jobs = [job for job in jobs if job.application_deadline >= timezone.now().date()]
-    jobs_to_process = active_jobs if active_jobs else jobs
-    print(f"[DEBUG] Rule-based: {len(jobs_to_process)} active jobs to process")
-    
-    if not jobs_to_process:
-        print("[DEBUG] No active jobs found")
-        return []
+    if isinstance(jobs, RowStream):
+        # Streamed candidates were filtered to open jobs by the database
+        chunks = jobs
+        logger.debug("Rule-based: streaming active jobs to process")
+    else:
+        # Filter to active jobs first
+        active_jobs = [job for job in jobs if job.application_deadline >= timezone.now().date()]
+        jobs_to_process = active_jobs if active_jobs else jobs
+        print(f"[DEBUG] Rule-based: {len(jobs_to_process)} active jobs to process")
+        
+        if not jobs_to_process:
+            print("[DEBUG] No active jobs found")
+            return []
+        chunks = [jobs_to_process]
     
     # Convert seeker to dict for feature extraction
     seeker_dict = as_dict_job_seeker(seeker)
@@ -149,92 +241,125 @@ def rule_based_job_recommendation(seeker, jobs, top_n=10):
         print("[DEBUG] Seeker has no skills listed, cannot match jobs")
         return []
     
+    # Parse the seeker's education and place their location once; each job's
+    # requirements and place come from the feature store
+    seeker_education_profile = seeker_education_of(seeker, seeker_education)
+    seeker_place = location_place_of(seeker, seeker_location)
+    
     # Normalize seeker skills
     normalized_seeker_skills = normalize_skills(seeker_skills)
+    seeker_skill_ids = skill_ids(seeker_skills)
     print(f"[DEBUG] Seeker skills (normalized): {normalized_seeker_skills}")
     
-    # Score each job
-    scored_jobs = []
-    for job in jobs_to_process:
-        job_dict = as_dict_job(job)
-        job_skills = job_dict.get("skills", [])
-        job_requirements = job_dict.get("requirements", [])
-        job_location = job_dict.get("location", "")
-        job_type = job_dict.get("job_type", "")
-        job_min_exp = job_dict.get("min_experience", 0)
-        
-        # Skip if job has no skills
-        if not job_skills:
-            print(f"[DEBUG] Job ID {getattr(job, 'id', 'unknown')} has no skills listed, skipping")
-            continue
-        
-        # Get matching skills using enhanced matching
-        matching_skills, skills_score = get_matching_skills(seeker_skills, job_skills)
+    # Score each chunk of jobs; the top_n heap and its floor carry over from
+    # one chunk to the next, and positions keep the catalog order for ties
+    top = TopK(top_n)
+    pruned = offset = 0
+    for chunk in chunks:
+        # Score the skills of every job at once (stored bitsets, else a sparse mat-vec)
+        skill_matrix = chunk_skill_matrix(chunk)
+        skill_scores = skill_matrix.match_scores(seeker_skill_ids)
         
         # STRICT REQUIREMENT: Must have at least one matching skill
-        if not matching_skills:
-            print(f"[DEBUG] Job ID {getattr(job, 'id', 'unknown')} has no matching skills, skipping")
-            continue
-            
-        print(f"[DEBUG] Job ID {getattr(job, 'id', 'unknown')} has matching skills: {matching_skills}")
-        
-        # Adjust skills score weight (60% weight) - most important
-        skills_score = skills_score * 0.6
+        candidate_rows = np.flatnonzero(skill_scores.overlap > 0)
+        print(f"[DEBUG] {len(candidate_rows)} jobs have matching skills "
+              f"({int(np.count_nonzero(skill_matrix.row_sizes == 0))} jobs have no skills listed)")
         
-        # Education match (15% weight) using enhanced education matching
-        education_score = 0.0
-        if seeker_education and job_requirements:
-            education_score = education_level_score(seeker_education, job_requirements) * 0.15
-        
-        # Location match (15% weight) using enhanced location matching
-        location_score = 0.0
-        if seeker_location and job_location:
-            location_score = enhanced_location_match(
-                seeker_location, 
-                job_location,
-                seeker_dict.get("willing_to_relocate", False)
-            ) * 0.15
-        
-        # Job type match (10% weight) using enhanced job type matching
-        job_type_score = 0.0
-        if job_type:
-            job_type_score = job_type_match(seeker_job_types, job_type) * 0.1
+        # Score each job, best skill match first: the other components add at most
+        # RULE_NON_SKILL_WEIGHT, so once a job's skills cannot lift it into the
+        # top_n, no later job of the chunk can and the loop stops
+        skill_order = candidate_rows[np.argsort(-skill_scores.skill_score[candidate_rows], kind="stable")]
+        for position, row in enumerate(skill_order):
+            # Adjust skills score weight (60% weight) - most important
+            skills_score = float(skill_scores.skill_score[row]) * 0.6
+            if not top.can_enter(skills_score + RULE_NON_SKILL_WEIGHT):
+                pruned += len(skill_order) - position
+                break
+            
+            job = skill_matrix.items[row]
+            job_dict = as_dict_job(job)
+            job_requirements = job_dict.get("requirements", [])
+            job_location = job_dict.get("location", "")
+            job_type = job_dict.get("job_type", "")
+            job_min_exp = job_dict.get("min_experience", 0)
+            
+            # Job type match (10% weight) using enhanced job type matching
+            job_type_score = 0.0
+            if job_type:
+                job_type_score = job_type_match(seeker_job_types, job_type) * 0.1
+                
+                # STRICT REQUIREMENT: If seeker has job type preferences, job must match
+                if seeker_job_types and job_type_score == 0:
+                    print(f"[DEBUG] Job ID {getattr(job, 'id', 'unknown')} job type doesn't match seeker preferences")
+                    continue
             
-            # STRICT REQUIREMENT: If seeker has job type preferences, job must match
-            if seeker_job_types and job_type_score == 0:
-                print(f"[DEBUG] Job ID {getattr(job, 'id', 'unknown')} job type doesn't match seeker preferences")
+            # Experience check - STRICT REQUIREMENT
+            # Skip jobs requiring more experience than seeker has (allow 60% of required)
+            if job_min_exp > 0 and seeker_exp_years < job_min_exp * 0.6:
+                print(f"[DEBUG] Job ID {getattr(job, 'id', 'unknown')} requires more experience than seeker has: {job_min_exp} vs {seeker_exp_years}")
                 continue
-        
-        # Experience check - STRICT REQUIREMENT
-        # Skip jobs requiring more experience than seeker has (allow 60% of required)
-        if job_min_exp > 0 and seeker_exp_years < job_min_exp * 0.6:
-            print(f"[DEBUG] Job ID {getattr(job, 'id', 'unknown')} requires more experience than seeker has: {job_min_exp} vs {seeker_exp_years}")
-            continue
-        
-        # Calculate final score
-        score = skills_score + education_score + location_score + job_type_score
-        
-        # STRICT REQUIREMENT: Must have a minimum total score
-        if score < 0.3:  # Minimum 30% match required
-            print(f"[DEBUG] Job ID {getattr(job, 'id', 'unknown')} has insufficient total score: {score:.2f}")
-            continue
-        
-        scored_jobs.append((score, job))
+            
+            # Upper bound with full education and location marks: skip the
+            # expensive matching when even those cannot reach the threshold or the top_n
+            upper_bound = skills_score + job_type_score
+            if seeker_education and job_requirements:
+                upper_bound += 0.15
+            if seeker_location and job_location:
+                upper_bound += 0.15
+            if upper_bound + BOUND_EPSILON < 0.3 or not top.can_enter(upper_bound):
+                pruned += 1
+                continue
+            
+            # Education match (15% weight) using enhanced education matching
+            education_score = 0.0
+            if seeker_education and job_requirements:
+                education_score = parsed_education_score(
+                    seeker_education_profile, job_education_of(job, job_requirements), seeker_education, job_requirements
+                ) * 0.15
+            
+            # Location match (15% weight) using enhanced location matching
+            location_score = 0.0
+            if seeker_location and job_location:
+                location_score = enhanced_location_match(
+                    seeker_location, 
+                    job_location,
+                    seeker_dict.get("willing_to_relocate", False),
+                    seeker_place,
+                    location_place_of(job, job_location),
+                ) * 0.15
+            
+            # Calculate final score
+            score = skills_score + education_score + location_score + job_type_score
+            
+            # STRICT REQUIREMENT: Must have a minimum total score
+            if score < 0.3:  # Minimum 30% match required
+                print(f"[DEBUG] Job ID {getattr(job, 'id', 'unknown')} has insufficient total score: {score:.2f}")
+                continue
+            
+            # Ties keep the catalog order of the jobs
+            top.push(score, offset + int(row), job)
+        offset += len(chunk)
     
-    # Sort by score (highest first)
-    scored_jobs.sort(reverse=True, key=lambda x: x[0])
+    # Best first, only the top_n were kept
+    ranked = top.items()
+    logger.debug("%d jobs skipped by the score upper bound", pruned)
     
     # Print top scores for debugging
-    if scored_jobs:
-        print(f"[DEBUG] Rule-based top job scores: {[round(score, 2) for score, _ in scored_jobs[:5]]}")
+    if ranked:
+        print(f"[DEBUG] Rule-based top job scores: {[round(score, 2) for score, _ in ranked[:5]]}")
     else:
         print("[DEBUG] No jobs met the strict matching criteria")
     
     # Return jobs with good scores, up to top_n
-    return [job for score, job in scored_jobs[:top_n]]
+    diagnostics["scores"] = [round(float(score), 4) for score, _ in ranked]
+    winners = SkillMatrix([job for _, job in ranked])
+    return [
+        Recommendation(job, score, winners.matching_skills(row, seeker_skill_ids), engine)
+        for row, (score, job) in enumerate(ranked)
+    ]
 
 
-def get_job_recommendations_for_seeker(seeker, jobs, top_n=10, score_threshold=0.5, explain=False):
+def get_job_recommendations_for_seeker(seeker, jobs=None, top_n=10, score_threshold=ML_SCORE_THRESHOLD, explain=False, diagnostics=None):
     """
     Get job recommendations for a seeker using a hybrid approach:
     1. ML model-based scoring (primary approach)
@@ -243,34 +368,75 @@ def get_job_recommendations_for_seeker(seeker, jobs, top_n=10, score_threshold=0
     
     Args:
         seeker: The job seeker to find jobs for
-        jobs: List of jobs to consider
+        jobs: List of jobs to consider. Defaults to the active jobs sharing at
+            least one skill with the seeker and of a job type they accept,
+            pulled from the skill index and streamed as slim rows in chunks
+            (see core.ai.streaming); only the recommended jobs are loaded
+            as Job instances
         top_n: Maximum number of recommendations to return
-        score_threshold: Minimum score threshold for ML recommendations
-        explain: Whether to include explanation of scores
+        score_threshold: Minimum score threshold for ML recommendations (the
+            model probability plus RECOMMENDATION_TEXT_WEIGHT x the cosine
+            similarity of the seeker's experience with the job description,
+            see core.ai.text_index)
+        explain: Return explanations (score, features and SHAP values of
+            every recommended job, see explain_job_recommendations) instead
+            of the records
+        diagnostics: Optional dict filled with the engine used (with the
+            selection rule of ML results, 'threshold' or 'fallback'), candidate
+            counts, the top model scores and the scores of the returned jobs,
+            reusing the scores computed for ranking
         
     Returns:
-        List of recommended jobs
+        List of Recommendation records (job, score, matched skills and
+        engine), best first, or of their explanations
     """
+    if diagnostics is None:
+        diagnostics = {}
+    
+    # Candidate generation: union of the skill postings of the seeker, with the
+    # deadline and job type constraints already applied by the database
+    prefiltered = jobs is None
+    if prefiltered:
+        jobs_to_process = RowStream(candidate_jobs_for_seeker(seeker), SlimJob)
+        chunks = jobs_to_process
+    
     print(f"[DEBUG] Finding jobs for seeker ID: {seeker.id}, name: {getattr(seeker, 'user', None) and seeker.user.get_full_name()}")
-    print(f"[DEBUG] Total jobs to evaluate: {len(jobs)}")
+    if prefiltered:
+        logger.debug("Streaming active jobs to evaluate in chunks of %d", jobs_to_process.chunk_size)
+    else:
+        print(f"[DEBUG] Total jobs to evaluate: {len(jobs)}")
     
     # Check for minimal profile data (cold start condition)
     min_skills = seeker.skills and len(seeker.skills) > 0
     min_location = bool(getattr(seeker, 'location', None))
     min_experience = seeker.experience and len(seeker.experience) > 0
     
-    # Filter jobs to active ones first
-    from django.utils import timezone
-    active_jobs = [job for job in jobs if job.application_deadline >= timezone.now().date()]
-    print(f"[DEBUG] Active jobs: {len(active_jobs)}")
+    if not prefiltered:
+        # Filter jobs to active ones first
+        from django.utils import timezone
+        active_jobs = [job for job in jobs if job.application_deadline >= timezone.now().date()]
+        print(f"[DEBUG] Active jobs: {len(active_jobs)}")
+        
+        # If no active jobs, use all jobs
+        jobs_to_process = active_jobs if active_jobs else jobs
+        chunks = [jobs_to_process]
     
-    # If no active jobs, use all jobs
-    jobs_to_process = active_jobs if active_jobs else jobs
+    def finish(recommended, X=None):
+        # Streamed records hold slim rows: load the winners, then explain them
+        if prefiltered:
+            from core.models import Job
+            kept = load_instances(recommended, Job.objects)
+            if X is not None and len(kept) < len(recommended):
+                kept_ids = {id(recommendation) for recommendation in kept}
+                X = X[[i for i, recommendation in enumerate(recommended) if id(recommendation) in kept_ids]]
+            recommended = kept
+        return explain_job_recommendations(seeker, recommended, X) if explain else recommended
     
     # Cold start: use rule-based for minimal profiles
     if not (min_skills or min_location or min_experience):
         print("[DEBUG] Using cold start approach - seeker has minimal profile data")
-        return rule_based_job_recommendation(seeker, jobs_to_process, top_n)
+        diagnostics["engine"] = "cold_start"
+        return finish(rule_based_job_recommendation(seeker, jobs_to_process, top_n, diagnostics, engine="cold_start"))
     # Try ML-based recommendation
     try:
         print("[DEBUG] Attempting ML-based job recommendation")
@@ -301,116 +467,216 @@ def get_job_recommendations_for_seeker(seeker, jobs, top_n=10, score_threshold=0
         # Normalize seeker skills
         normalized_seeker_skills = normalize_skills(seeker_skills)
         print(f"[DEBUG] Seeker skills (normalized): {normalized_seeker_skills}")
+        seeker_skill_ids = skill_ids(seeker_skills)
+        # Experience and job type pre-filters of the ML stage
+        prefilter = job_prefilter(seeker, seeker_dict)
         
-        # Pre-filter jobs using enhanced matching functions
-        filtered_jobs = []
-        for job in jobs_to_process:
-            job_dict = as_dict_job(job)
-            job_skills = job_dict.get("skills", [])
-            job_requirements = job_dict.get("requirements", [])
+        # Score chunk by chunk, keeping only the best max(top_n, 10) jobs (and
+        # their feature rows) in a heap; positions keep the catalog order for ties
+        loaded = registry.entry('job')
+        top = TopK(max(top_n, 10))
+        candidates = skill_matched = scored_count = 0
+        # Optional ranking term: similarity of the seeker's experience with the job descriptions
+        text_boost = seeker_text_scorer(seeker)
+        snapshot, changed = current_snapshot('jobs') if prefiltered else (None, None)
+        if snapshot is not None:
+            # Candidates, pre-filters and feature rows read from the shared
+            # snapshot instead of streaming the jobs from the database; only
+            # the jobs changed since the build are streamed. Positions are the
+            # job IDs on both sides, i.e. the catalog order.
+            chunks = RowStream(candidate_jobs_for_seeker(seeker).filter(pk__in=changed), SlimJob) if changed else []
+            candidates, rows, X = snapshot.job_inputs(seeker, FEATURE_ORDER, exclude=changed)
+            skill_matched, scored_count = candidates, len(rows)
+            if scored_count:
+                scores = score_jobs(loaded, X, snapshot.jobs.ids[rows], text_boost)
+                for i in top_k_indices(scores, top.k):
+                    top.push(float(scores[i]), int(snapshot.jobs.ids[rows[i]]), (snapshot.jobs.row(rows[i]), X[i]))
+            diagnostics["snapshot"] = snapshot.name
+            diagnostics["snapshot_changed"] = len(changed)
+        for chunk in chunks:
+            offset = candidates
+            candidates += len(chunk)
             
-            # Print detailed job info for debugging
-            print(f"[DEBUG] Job ID {getattr(job, 'id', 'unknown')}, Title: {getattr(job, 'title', 'unknown')}")
-            print(f"[DEBUG] Job Skills: {job_skills}")
-            print(f"[DEBUG] Job Requirements: {job_requirements}")
-            print(f"[DEBUG] Job Experience Level: {job_dict.get('experience_level', 'None')}")
-            print(f"[DEBUG] Job Min Experience: {job_dict.get('min_experience', 0)}")
+            # Pre-filter jobs on skills: one bitset AND (or sparse mat-vec) over the chunk
+            skill_matrix = chunk_skill_matrix(chunk)
+            skill_scores = skill_matrix.match_scores(seeker_skill_ids)
+            filtered_rows = np.flatnonzero(skill_scores.overlap > 0)
+            skill_matched += len(filtered_rows)
+            print(f"[DEBUG] {int(np.count_nonzero(skill_matrix.row_sizes == 0))} jobs have no skills listed")
             
-            # Skip if job has no skills
-            if not job_skills:
-                print(f"[DEBUG] Job ID {getattr(job, 'id', 'unknown')} has no skills listed, skipping")
+            # Pre-filter jobs by experience requirements and job type preferences
+            experience_filtered_rows = [row for row in filtered_rows if prefilter(chunk[row])]
+            print(f"[DEBUG] {len(filtered_rows) - len(experience_filtered_rows)} jobs filtered out on experience or job type")
+            
+            if not experience_filtered_rows:
                 continue
-                
-            # Normalize job skills
-            normalized_job_skills = normalize_skills(job_skills)
-            print(f"[DEBUG] Job normalized skills: {normalized_job_skills}")
-                
-            # Use enhanced skill matching
-            matching_skills, skill_score = get_matching_skills(normalized_seeker_skills, normalized_job_skills)
+            scored_count += len(experience_filtered_rows)
             
-            if matching_skills:
-                filtered_jobs.append(job)
-                print(f"[DEBUG] Job ID {getattr(job, 'id', 'unknown')} has matching skills: {matching_skills}")
-            else:
-                print(f"[DEBUG] Job ID {getattr(job, 'id', 'unknown')} has no matching skills, skipping")
+            # ML-based recommendation for filtered jobs
+            X = extract_job_feature_matrix(seeker, [chunk[row] for row in experience_filtered_rows])
+            scores = score_jobs(loaded, X, [chunk[row].id for row in experience_filtered_rows], text_boost)
+            # Only the chunk's best can enter the heap: select them without a full sort
+            for i in top_k_indices(scores, top.k):
+                row = experience_filtered_rows[i]
+                position = chunk[row].id if snapshot is not None else offset + int(row)
+                top.push(float(scores[i]), position, (chunk[row], X[i]))
         
-        print(f"[DEBUG] {len(filtered_jobs)} jobs have at least one matching skill")
+        print(f"[DEBUG] {skill_matched} jobs have at least one matching skill")
         
-        if not filtered_jobs:
+        if not skill_matched:
             print("[DEBUG] No jobs with matching skills found")
             return []
-            
-        # Pre-filter jobs by experience requirements using enhanced experience extraction
-        experience_filtered_jobs = []
-        for job in filtered_jobs:
-            job_dict = as_dict_job(job)
-            job_min_exp = job_dict.get("min_experience", 0)
-            
-            # Allow 60% of required experience (reduced from 80% to account for data quality issues)
-            if job_min_exp == 0 or seeker_exp_years >= job_min_exp * 0.6:
-                # Also check job type preferences if specified
-                job_type = job_dict.get("job_type", "")
-                
-                # If seeker has job type preferences and job type doesn't match, skip
-                if seeker_job_types and job_type and not job_type_match(seeker_job_types, job_type):
-                    print(f"[DEBUG] Job ID {getattr(job, 'id', 'unknown')} job type doesn't match seeker preferences")
-                    continue
-                    
-                experience_filtered_jobs.append(job)
-            else:
-                print(f"[DEBUG] Job ID {getattr(job, 'id', 'unknown')} requires more experience than seeker has: {job_min_exp} vs {seeker_exp_years}")
         
-        print(f"[DEBUG] {len(experience_filtered_jobs)} jobs passed all pre-filtering criteria")
+        print(f"[DEBUG] {scored_count} jobs passed all pre-filtering criteria")
         
-        if not experience_filtered_jobs:
+        if not scored_count:
             print("[DEBUG] No jobs met the pre-filtering criteria")
             return []
         
-        # ML-based recommendation for filtered jobs
-        features_list = [extract_job_features(seeker, job) for job in experience_filtered_jobs]
-        if not features_list:
-            print("[DEBUG] No features extracted, falling back to rule-based")
-            return rule_based_job_recommendation(seeker, jobs_to_process, top_n)
-        
-        X = np.stack(features_list)
-        scores = job_catboost_model.predict_proba(X)[:, 1]
-        scored = list(zip(scores, experience_filtered_jobs))
-        scored.sort(reverse=True, key=lambda x: x[0])
+        scored = top.items()
+        diagnostics.update({
+            "engine": "ml",
+            "model_version": loaded.version,
+            "candidates": candidates,
+            "scored": scored_count,
+            "top_scores": [round(float(score), 4) for score, _ in scored[:10]],
+        })
+        if text_boost is not None:
+            diagnostics["text_weight"] = float(getattr(settings, 'RECOMMENDATION_TEXT_WEIGHT', 0.0))
         
         # Print scores for debugging
         if scored:
             print(f"[DEBUG] ML top job scores: {[round(score, 2) for score, _ in scored[:5]]}")
         
-        # STRICT REQUIREMENT: Only return jobs with scores above threshold
-        recommended = [job for score, job in scored[:top_n] if score >= score_threshold]
-        
-        # If no jobs meet threshold but some have reasonable scores (at least 0.3)
-        if not recommended and scored and scored[0][0] >= 0.3:
+        # STRICT REQUIREMENT: Only return jobs with scores above threshold,
+        # or the few with reasonable scores when none is
+        recommended = select_recommendations(scored, top_n, score_threshold, diagnostics)
+        if diagnostics.get("selection") == "fallback":
             print("[DEBUG] No jobs above threshold but some reasonable scores found")
-            recommended = [job for score, job in scored[:5] if score >= 0.3]
         
         # If still no recommendations, fall back to rule-based
         if not recommended:
             print("[DEBUG] ML model returned no recommendations, falling back to rule-based")
-            return rule_based_job_recommendation(seeker, jobs_to_process, top_n)
+            diagnostics["engine"] = "rule_based"
+            return finish(rule_based_job_recommendation(seeker, jobs_to_process, top_n, diagnostics))
             
         print(f"[DEBUG] Returning {len(recommended)} ML-based job recommendations")
-        return recommended
+        diagnostics["scores"] = [round(float(score), 4) for score, _ in recommended]
+        winners = SkillMatrix([job for _, (job, _) in recommended])
+        records = [
+            Recommendation(job, score, winners.matching_skills(row, seeker_skill_ids), "ml")
+            for row, (score, (job, _)) in enumerate(recommended)
+        ]
+        # Explanations reuse the feature rows built for scoring
+        return finish(records, np.array([x for _, (_, x) in recommended]) if explain else None)
         
     except Exception as e:
         # If ML approach fails for any reason, fall back to rule-based
         print(f"[DEBUG] ML job recommendation failed with error: {str(e)}")
         print("[DEBUG] Falling back to rule-based job recommendation")
-        return rule_based_job_recommendation(seeker, jobs_to_process, top_n)
+        diagnostics.pop("selection", None)
+        diagnostics.update({"engine": "rule_based", "error": str(e)})
+        return finish(rule_based_job_recommendation(seeker, jobs_to_process, top_n, diagnostics))
 
-    if explain:
-        return [
-            {
-                "job": job,
-                "score": float(score),
-                "features": dict(zip(FEATURE_ORDER, extract_job_features(seeker, job))),
-            }
-            for score, job in scored[:top_n] if score >= 0.3
-        ]
-    else:
-        return recommended
+
+def recommend_jobs_for_seekers(seekers, jobs, top_n=10, score_threshold=ML_SCORE_THRESHOLD, job_matrix=None):
+    """
+    get_job_recommendations_for_seeker for many seekers over one list of open
+    jobs, with a single model call: the feature rows of every seeker reaching
+    the ML stage are stacked and scored together. Pre-filters, thresholds and
+    the cold start and rule-based fallbacks are those of the live engine.
+    Used by the offline batch scorer (core.ai.batch_scoring).
+    
+    Args:
+        seekers: Job seekers
+        jobs: Open jobs to consider, in catalog (pk) order
+        top_n: Maximum number of recommendations per seeker
+        score_threshold: Minimum score threshold for ML recommendations
+        job_matrix: SkillMatrix of `jobs`, when already built
+        
+    Returns:
+        List of (Recommendation records, diagnostics dict) tuples, one per seeker
+    """
+    job_matrix = job_matrix if job_matrix is not None else SkillMatrix(jobs)
+    results = [None] * len(seekers)
+    pending = []  # (index, candidate jobs, scored jobs, feature rows, seeker skill IDs)
+    
+    for index, seeker in enumerate(seekers):
+        diagnostics = {}
+        seeker_dict = as_dict_job_seeker(seeker)
+        seeker_skills = seeker_dict.get("skills", [])
+        seeker_skill_ids = skill_ids(seeker_skills or [])
+        # The live engine's candidates: open jobs sharing a skill with the seeker
+        candidates = [jobs[row] for row in np.flatnonzero(job_matrix.overlap(seeker_skill_ids) > 0)]
+        
+        # Cold start: use rule-based for minimal profiles
+        min_skills = seeker.skills and len(seeker.skills) > 0
+        min_location = bool(getattr(seeker, 'location', None))
+        min_experience = seeker.experience and len(seeker.experience) > 0
+        if not (min_skills or min_location or min_experience):
+            diagnostics["engine"] = "cold_start"
+            results[index] = (rule_based_job_recommendation(seeker, candidates, top_n, diagnostics, engine="cold_start"), diagnostics)
+            continue
+        
+        try:
+            if not seeker_skills or not candidates:
+                results[index] = ([], diagnostics)
+                continue
+            
+            scored_jobs = list(filter(job_prefilter(seeker, seeker_dict), candidates))
+            
+            if not scored_jobs:
+                results[index] = ([], diagnostics)
+                continue
+            pending.append((index, candidates, scored_jobs, extract_job_feature_matrix(seeker, scored_jobs), seeker_skill_ids))
+        except Exception as e:
+            logger.warning("ML job recommendation failed for seeker %s with error: %s", getattr(seeker, 'id', 'unknown'), e)
+            diagnostics.update({"engine": "rule_based", "error": str(e)})
+            results[index] = (rule_based_job_recommendation(seeker, candidates, top_n, diagnostics), diagnostics)
+    
+    if pending:
+        # One model call for every seeker of the batch
+        loaded = registry.entry('job')
+        try:
+            all_scores = score_jobs(loaded, np.vstack([X for _, _, _, X, _ in pending]))
+            error = None
+        except Exception as e:
+            logger.warning("ML batch job recommendation failed with error: %s", e)
+            all_scores, error = None, str(e)
+        
+        start = 0
+        for index, candidates, scored_jobs, X, seeker_skill_ids in pending:
+            seeker = seekers[index]
+            diagnostics = {}
+            if error is not None:
+                diagnostics.update({"engine": "rule_based", "error": error})
+                results[index] = (rule_based_job_recommendation(seeker, candidates, top_n, diagnostics), diagnostics)
+                continue
+            scores = all_scores[start:start + len(scored_jobs)]
+            start += len(scored_jobs)
+            text_boost = seeker_text_scorer(seeker)
+            if text_boost is not None:
+                # The description term score_jobs adds, per seeker after the stacked model call
+                scores = scores + text_boost([job.pk for job in scored_jobs])
+            
+            scored = [(scores[row], scored_jobs[row]) for row in top_k_indices(scores, max(top_n, 10))]
+            diagnostics.update({
+                "engine": "ml",
+                "model_version": loaded.version,
+                "candidates": len(candidates),
+                "scored": len(scored_jobs),
+                "top_scores": [round(float(score), 4) for score, _ in scored[:10]],
+            })
+            recommended = select_recommendations(scored, top_n, score_threshold, diagnostics)
+            if not recommended:
+                diagnostics["engine"] = "rule_based"
+                results[index] = (rule_based_job_recommendation(seeker, candidates, top_n, diagnostics), diagnostics)
+                continue
+            
+            diagnostics["scores"] = [round(float(score), 4) for score, _ in recommended]
+            winners = SkillMatrix([job for _, job in recommended])
+            results[index] = ([
+                Recommendation(job, score, winners.matching_skills(row, seeker_skill_ids), "ml")
+                for row, (score, job) in enumerate(recommended)
+            ], diagnostics)
+    return results
@@ -0,0 +1,208 @@
+"""
+MinHash / LSH retrieval of recommendation candidates.
+Posting-list unions over common skills ("communication", "customer service")
+return most of a large catalog. Here every job and seeker gets a MinHash
+signature of its canonical skills on save, cut into lsh_banding() bands of
+rows; each band is hashed into a bucket key stored in
+JobLSHBucket / SeekerLSHBucket (kept current by core.signals). Entities
+sharing a bucket with a query are its approximate high-Jaccard neighbors,
+found with one indexed lookup per band, and the engines score that short
+list exactly. Enabled with RECOMMENDATION_RETRIEVAL = 'lsh' (see
+core.ai.skill_index); recall against exact Jaccard is reported by
+benchmarks/bench_lsh_recall.py.
+"""
+import hashlib
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ml_training.enhanced_matching import canonical_skills
+
+# Default banding of the signatures: 32 bands of 4 rows
+DEFAULT_LSH_BANDS = 32
+DEFAULT_LSH_ROWS = 4
+
+# Universal hash functions h(x) = (a * x + b) mod p over 32-bit skill hashes,
+# drawn once from a fixed seed so that every process computes the same signatures
+_PRIME = (1 << 32) + 15
+_MAX_PERMUTATIONS = 1024
+_rng = np.random.RandomState(1181)
+_A = _rng.randint(1, 1 << 32, size=_MAX_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.randint(0, 1 << 32, size=_MAX_PERMUTATIONS, dtype=np.uint64)
+del _rng
+
+def lsh_banding():
+    """
+    Bands x rows per band of the signatures (RECOMMENDATION_LSH_BANDS/ROWS);
+    changing either needs `manage.py rebuild_lsh_index`
+
+    Returns:
+        Tuple of (bands, rows)
+    """
+    return (
+        int(getattr(settings, 'RECOMMENDATION_LSH_BANDS', DEFAULT_LSH_BANDS)),
+        int(getattr(settings, 'RECOMMENDATION_LSH_ROWS', DEFAULT_LSH_ROWS)),
+    )
+
+@lru_cache(maxsize=16384)
+def _skill_hash(name):
+    return int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=4).digest(), 'little')
+
+def minhash_signature(skills, num_perm=None):
+    """
+    MinHash signature of a raw skills list
+
+    Args:
+        skills: Raw skills list
+        num_perm: Signature length (defaults to bands * rows of lsh_banding())
+
+    Returns:
+        uint32 NumPy array of length num_perm, or None without skills
+    """
+    if not num_perm:
+        bands, rows = lsh_banding()
+        num_perm = bands * rows
+    names = canonical_skills(skills or [])
+    if not names:
+        return None
+    hashes = np.array([_skill_hash(name) for name in names], dtype=np.uint64)
+    # (a * x + b) < 2**64 for 32-bit a, b and x: no overflow before the modulo
+    permuted = (_A[:num_perm, None] * hashes[None, :] + _B[:num_perm, None]) % np.uint64(_PRIME)
+    return permuted.min(axis=1).astype(np.uint32)
+
+def band_keys(signature, bands=None, rows=None):
+    """
+    LSH bucket keys of a signature, one per band (signed 64-bit integers)
+
+    Args:
+        signature: minhash_signature() of at least bands * rows values, or None
+        bands, rows: Banding of the signature (defaults to lsh_banding())
+
+    Returns:
+        Set of bucket keys (empty for None)
+    """
+    default_bands, default_rows = lsh_banding()
+    bands = bands or default_bands
+    rows = rows or default_rows
+    if signature is None:
+        return set()
+    keys = set()
+    for band in range(bands):
+        # The banding is part of the key: indexes built with another banding never match
+        prefix = np.array([rows, band], dtype='<u2').tobytes()
+        digest = hashlib.blake2b(prefix + signature[band * rows:(band + 1) * rows].astype('<u4').tobytes(), digest_size=8)
+        keys.add(int.from_bytes(digest.digest(), 'little', signed=True))
+    return keys
+
+def skill_band_keys(skills):
+    """Bucket keys of a raw skills list (empty without skills or with malformed entries)."""
+    try:
+        return band_keys(minhash_signature(skills))
+    except (AttributeError, TypeError):
+        return set()
+
+def index_job_lsh(job):
+    """
+    Rebuild the LSH buckets of a single job
+
+    Args:
+        job: Saved Job instance
+    """
+    from core.models import JobLSHBucket
+
+    with transaction.atomic():
+        JobLSHBucket.objects.filter(job_id=job.pk).delete()
+        JobLSHBucket.objects.bulk_create([
+            JobLSHBucket(key=key, job_id=job.pk, application_deadline=job.application_deadline)
+            for key in skill_band_keys(job.skills)
+        ])
+
+def index_seeker_lsh(seeker):
+    """
+    Rebuild the LSH buckets of a single job seeker
+
+    Args:
+        seeker: Saved JobSeekerProfile instance
+    """
+    from core.models import SeekerLSHBucket
+
+    with transaction.atomic():
+        SeekerLSHBucket.objects.filter(seeker_id=seeker.pk).delete()
+        SeekerLSHBucket.objects.bulk_create([
+            SeekerLSHBucket(key=key, seeker_id=seeker.pk, is_available=seeker.is_available)
+            for key in skill_band_keys(seeker.skills)
+        ])
+
+def rebuild_lsh_index(batch_size=1000):
+    """
+    Rebuild the LSH buckets of every job and seeker from scratch
+
+    Returns:
+        Tuple of (job buckets written, seeker buckets written)
+    """
+    from authentication.models import JobSeekerProfile
+    from core.models import Job, JobLSHBucket, SeekerLSHBucket
+
+    with transaction.atomic():
+        JobLSHBucket.objects.all().delete()
+        jobs = 0
+        batch = []
+        for job_id, skills, deadline in Job.objects.values_list('id', 'skills', 'application_deadline').iterator(chunk_size=batch_size):
+            batch.extend(JobLSHBucket(key=key, job_id=job_id, application_deadline=deadline) for key in skill_band_keys(skills))
+            if len(batch) >= batch_size:
+                jobs += len(JobLSHBucket.objects.bulk_create(batch))
+                batch = []
+        jobs += len(JobLSHBucket.objects.bulk_create(batch))
+
+        SeekerLSHBucket.objects.all().delete()
+        seekers = 0
+        batch = []
+        rows = JobSeekerProfile.objects.values_list('id', 'skills', 'is_available').iterator(chunk_size=batch_size)
+        for seeker_id, skills, is_available in rows:
+            batch.extend(SeekerLSHBucket(key=key, seeker_id=seeker_id, is_available=is_available) for key in skill_band_keys(skills))
+            if len(batch) >= batch_size:
+                seekers += len(SeekerLSHBucket.objects.bulk_create(batch))
+                batch = []
+        seekers += len(SeekerLSHBucket.objects.bulk_create(batch))
+    return jobs, seekers
+
+def active_job_ids_for_lsh(skills):
+    """
+    Jobs sharing an LSH bucket with `skills`, restricted to jobs still open for applications
+
+    Returns:
+        Queryset of distinct job IDs, evaluated lazily (usable as a subquery)
+    """
+    from core.models import JobLSHBucket
+
+    return (
+        JobLSHBucket.objects
+        .filter(key__in=skill_band_keys(skills), application_deadline__gte=timezone.now().date())
+        .values('job_id')
+        .distinct()
+    )
+
+def seeker_ids_for_lsh(skills):
+    """Distinct IDs of every seeker (available or not) sharing an LSH bucket with `skills`, as a lazy queryset."""
+    from core.models import SeekerLSHBucket
+
+    return SeekerLSHBucket.objects.filter(key__in=skill_band_keys(skills)).values('seeker_id').distinct()
+
+def available_seeker_ids_for_lsh(skills):
+    """
+    Seekers sharing an LSH bucket with `skills`, restricted to available seekers
+
+    Returns:
+        Queryset of distinct seeker IDs, evaluated lazily (usable as a subquery)
+    """
+    from core.models import SeekerLSHBucket
+
+    return (
+        SeekerLSHBucket.objects
+        .filter(key__in=skill_band_keys(skills), is_available=True)
+        .values('seeker_id')
+        .distinct()
+    )
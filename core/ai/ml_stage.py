@@ -0,0 +1,98 @@
+"""
+The ML stage of the job recommendations: filter, then score, then select.
+The live engine (get_job_recommendations_for_seeker), the batch precompute
+(recommend_jobs_for_seekers), the new-job merge (score_job_for_seekers and
+core.ai.recommendation_store) and the matching snapshot (core.ai.snapshot)
+all run their candidates through these helpers, so a stored or snapshot
+result is the one the live engine would compute.
+"""
+from core.ai.feature_extraction import as_dict_job
+from core.ai.feature_store import experience_years_of
+from core.ai.prediction_cache import cached_predict_proba
+from ml_training.enhanced_matching import job_type_match
+
+# Share of a job's required experience a seeker needs for the pair to be scored
+EXPERIENCE_TOLERANCE = 0.6
+
+# Minimum job model score of an ML recommendation (get_job_recommendations_for_seeker's default)
+ML_SCORE_THRESHOLD = 0.5
+
+# Minimum score and number of jobs of the fallback selection, used when no
+# job reaches the threshold
+FALLBACK_SCORE_THRESHOLD = 0.3
+FALLBACK_TOP_N = 5
+
+def meets_experience(seeker_years, min_experience):
+    """
+    Experience pre-filter: the job requires no experience, or the seeker has
+    EXPERIENCE_TOLERANCE of it. Works elementwise on NumPy arrays.
+    """
+    return (min_experience == 0) | (seeker_years >= min_experience * EXPERIENCE_TOLERANCE)
+
+def accepts_job_type(preferences, job_type):
+    """Job type pre-filter: seekers without preferences and jobs without a type always pass."""
+    return not preferences or not job_type or bool(job_type_match(preferences, job_type))
+
+def job_prefilter(seeker, seeker_dict):
+    """
+    Pre-filters of the ML stage for one seeker
+
+    Args:
+        seeker: The job seeker
+        seeker_dict: as_dict_job_seeker(seeker)
+
+    Returns:
+        Callable of a job returning whether the pair is scored
+    """
+    seeker_years = experience_years_of(seeker, seeker_dict.get("experience", []))
+    preferences = seeker_dict.get("preferred_job_types", [])
+
+    def keep(job):
+        job_dict = as_dict_job(job)
+        return bool(
+            meets_experience(seeker_years, job_dict.get("min_experience", 0))
+            and accepts_job_type(preferences, job_dict.get("job_type", ""))
+        )
+    return keep
+
+def score_jobs(loaded, X, job_ids=None, text_boost=None):
+    """
+    Ranking scores of feature rows
+
+    Args:
+        loaded: Job model registry entry
+        X: Feature matrix, one row per job
+        job_ids: IDs of the jobs of the rows (for the description term)
+        text_boost: seeker_text_scorer() of the seeker, if any
+
+    Returns:
+        NumPy array of job model scores, plus the description term
+    """
+    scores = cached_predict_proba(loaded, X)
+    if text_boost is not None:
+        scores = scores + text_boost(job_ids)
+    return scores
+
+def select_recommendations(scored, top_n, score_threshold, diagnostics):
+    """
+    Recommendations of the ML stage
+
+    Args:
+        scored: (score, item) pairs, best first
+        top_n: Maximum number of recommendations
+        score_threshold: Minimum score of a recommendation
+        diagnostics: Dict receiving "selection": 'threshold', or 'fallback'
+            when only the fallback selection found jobs
+
+    Returns:
+        The (score, item) pairs recommended, best first; empty when the
+        rule-based engine has to take over
+    """
+    recommended = [(score, item) for score, item in scored[:top_n] if score >= score_threshold]
+    diagnostics["selection"] = "threshold"
+    if not recommended and scored and scored[0][0] >= FALLBACK_SCORE_THRESHOLD:
+        recommended = [(score, item) for score, item in scored[:FALLBACK_TOP_N] if score >= FALLBACK_SCORE_THRESHOLD]
+        diagnostics["selection"] = "fallback"
+    if not recommended:
+        diagnostics.pop("selection", None)
+    return recommended
@@ -0,0 +1,258 @@
+"""
+Registry of the recommendation models.
+- Models are loaded lazily on first use, so management commands and the
+  gunicorn master don't pay for them unless asked to (see warm()).
+- Each loaded model carries its version (SHA-256 checksum of the .cbm file),
+  load time and resident memory cost.
+- The model file is re-checked at most every RECOMMENDATION_MODEL_CHECK_INTERVAL
+  seconds; when it changed, the new model is loaded next to the old one and
+  swapped in atomically, so in-flight requests finish on the model they started with.
+- RECOMMENDATION_MODEL_BACKEND picks CatBoost itself or the NumPy evaluator of
+  the exported trees (core/ai/oblivious_trees.py); both expose predict_proba().
+  The NumPy backend watches the .cbm as well: its version is the .cbm checksum,
+  and a .npz not exported from the current .cbm is not served (CatBoost scores
+  the .cbm until `manage.py export_tree_models` is run).
+"""
+import hashlib
+import importlib
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from core.ai.oblivious_trees import ObliviousTrees
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), 'models')
+
+# Seconds between two stat() checks of a model file
+DEFAULT_CHECK_INTERVAL = 5.0
+
+# File stem of each recommendation model in MODELS_DIR
+MODEL_FILES = {
+    'job': 'job_recommendation_model',
+    'candidate': 'candidate_recommendation_model',
+}
+
+
+def _file_signature(path):
+    st = os.stat(path)
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _files_signature(path, source=None):
+    """Signatures of a model file and of the file it was exported from (None while missing)."""
+    if source is None:
+        return (_file_signature(path),)
+    return (_file_signature(path), _file_signature(source) if os.path.exists(source) else None)
+
+
+def _file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _rss_bytes():
+    """Resident set size of this process, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def load_catboost_model(path):
+    from catboost import CatBoostClassifier
+
+    model = CatBoostClassifier()
+    model.load_model(path)
+    return model
+
+
+def load_oblivious_trees(path):
+    """
+    Load the NumPy export of a model, or the CatBoost model next to it when the
+    export is stale (the .cbm was retrained since), so a retrained model goes
+    live with either backend
+    """
+    model = ObliviousTrees.load(path)
+    cbm_path = os.path.splitext(path)[0] + '.cbm'
+    if os.path.exists(cbm_path) and _file_checksum(cbm_path) != model.source_checksum:
+        logger.warning("%s was not exported from the current %s, scoring with CatBoost "
+                       "until `manage.py export_tree_models` is run", path, cbm_path)
+        return load_catboost_model(cbm_path)
+    return model
+
+
+class LoadedModel:
+    """A loaded model together with the metadata of the file it came from."""
+    __slots__ = ('name', 'path', 'model', 'checksum', 'signature', 'loaded_at', 'load_seconds', 'memory_bytes')
+
+    def __init__(self, name, path, model, checksum, signature, load_seconds, memory_bytes):
+        self.name = name
+        self.path = path
+        self.model = model
+        self.checksum = checksum
+        self.signature = signature
+        self.loaded_at = time.time()
+        self.load_seconds = load_seconds
+        self.memory_bytes = memory_bytes
+
+    @property
+    def version(self):
+        return self.checksum[:12]
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'path': self.path,
+            'version': self.version,
+            'checksum': self.checksum,
+            'loaded_at': self.loaded_at,
+            'load_seconds': round(self.load_seconds, 4),
+            'memory_bytes': self.memory_bytes,
+            'file_bytes': self.signature[0][1],
+        }
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._specs = {}
+        self._loaded = {}
+        self._next_check = {}
+        self._lock = threading.Lock()
+        # A lock held by another thread at fork time would stay locked forever
+        # in the child (gunicorn forks workers after preloading the app)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_lock)
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+    def register(self, name, path, loader=load_catboost_model, requires=('catboost',), source=None):
+        """
+        Register a model file
+
+        Args:
+            name: Model name used by get()/entry()
+            path: Path of the model file
+            loader: Callable loading the model from `path`
+            requires: Modules imported before timing the load, so the reported
+                load time and memory are the model's own and not the library's
+            source: File `path` is exported from (the .cbm of a .npz): a change
+                of either reloads the model, and the checksum of the source
+                (while it exists) is the model's version
+        """
+        self._specs[name] = (path, loader, requires, source)
+
+    def names(self):
+        return list(self._specs)
+
+    def _check_interval(self):
+        return float(getattr(settings, 'RECOMMENDATION_MODEL_CHECK_INTERVAL', DEFAULT_CHECK_INTERVAL))
+
+    def _load(self, name):
+        path, loader, requires, source = self._specs[name]
+        for module in requires:
+            importlib.import_module(module)
+        signature = _files_signature(path, source)
+        checksum = _file_checksum(source if source is not None and os.path.exists(source) else path)
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        model = loader(path)
+        load_seconds = time.perf_counter() - start
+        rss_after = _rss_bytes()
+        memory_bytes = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+        loaded = LoadedModel(name, path, model, checksum, signature, load_seconds, memory_bytes)
+        logger.info("Loaded %s model version %s in %.1f ms (%.1f MiB resident)",
+                    name, loaded.version, load_seconds * 1000, (memory_bytes or 0) / 2**20)
+        return loaded
+
+    def entry(self, name):
+        """
+        Get the current LoadedModel of `name`, loading or hot-reloading it if needed
+
+        Args:
+            name: Registered model name ('job' or 'candidate')
+
+        Returns:
+            LoadedModel
+        """
+        loaded = self._loaded.get(name)
+        now = time.monotonic()
+        if loaded is not None and now < self._next_check.get(name, 0):
+            return loaded
+
+        with self._lock:
+            loaded = self._loaded.get(name)
+            if loaded is not None and now < self._next_check.get(name, 0):
+                return loaded
+            self._next_check[name] = now + self._check_interval()
+            try:
+                changed = loaded is None or _files_signature(loaded.path, self._specs[name][3]) != loaded.signature
+                if changed:
+                    new = self._load(name)
+                    # A fresh export of the .cbm served by CatBoost has its version but another model type
+                    if loaded is None or new.checksum != loaded.checksum or type(new.model) is not type(loaded.model):
+                        # Atomic swap: readers see either the old or the new model
+                        self._loaded[name] = new
+                    else:
+                        # Touched but identical file: keep the old model object
+                        loaded.signature = new.signature
+            except Exception as e:
+                if loaded is None:
+                    raise
+                # Keep serving the previous model (e.g. a half-written file) and retry later
+                logger.warning("Reloading %s model failed, keeping version %s: %s", name, loaded.version, e)
+            return self._loaded[name]
+
+    def get(self, name):
+        """Get the current model object of `name`."""
+        return self.entry(name).model
+
+    def version(self, name):
+        return self.entry(name).version
+
+    def reload(self, name):
+        """Force a reload check of `name` on next access."""
+        self._next_check.pop(name, None)
+        return self.entry(name)
+
+    def warm(self):
+        """Load every registered model now (e.g. in the gunicorn master before forking)."""
+        return [self.entry(name) for name in self._specs]
+
+    def status(self):
+        """Metadata of the models loaded so far, without loading the others."""
+        return [loaded.as_dict() for loaded in self._loaded.values()]
+
+
+def register_models(registry, backend):
+    """
+    Register the recommendation models for a scoring backend
+
+    Args:
+        registry: ModelRegistry to register into
+        backend: 'catboost' (the .cbm files) or 'numpy' (their .npz export)
+    """
+    for name, stem in MODEL_FILES.items():
+        if backend == 'catboost':
+            registry.register(name, os.path.join(MODELS_DIR, stem + '.cbm'))
+        elif backend == 'numpy':
+            registry.register(
+                name, os.path.join(MODELS_DIR, stem + '.npz'), loader=load_oblivious_trees, requires=(),
+                source=os.path.join(MODELS_DIR, stem + '.cbm'),
+            )
+        else:
+            raise ImproperlyConfigured(f"Unknown RECOMMENDATION_MODEL_BACKEND {backend!r}")
+
+
+registry = ModelRegistry()
+register_models(registry, getattr(settings, 'RECOMMENDATION_MODEL_BACKEND', 'catboost'))
@@ -0,0 +1,130 @@
+"""
+Pure-NumPy evaluator for CatBoost oblivious-tree models.
+- export_catboost_model() turns a .cbm file into a compact .npz of split
+  features, borders and leaf values (needs catboost, at export time only).
+- ObliviousTrees scores a whole feature matrix with a gather, a comparison
+  and a sum, without CatBoost's per-call overhead on small batches.
+Trees shallower than the deepest one are padded with splits that never fire
+(border +inf), so every tree has the same depth and leaf count.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+
+def _file_checksum(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def export_catboost_model(cbm_path, npz_path=None):
+    """
+    Export a binary-classification CatBoost model to NumPy arrays
+
+    Args:
+        cbm_path: Path of the .cbm model
+        npz_path: Output path, defaults to the .cbm path with a .npz suffix
+
+    Returns:
+        Path of the written .npz file
+    """
+    from catboost import CatBoostClassifier
+
+    npz_path = npz_path or os.path.splitext(cbm_path)[0] + '.npz'
+    model = CatBoostClassifier()
+    model.load_model(cbm_path)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'model.json')
+        model.save_model(json_path, format='json')
+        with open(json_path) as f:
+            spec = json.load(f)
+
+    if spec['features_info'].keys() - {'float_features'}:
+        raise ValueError(f"{cbm_path}: only models over float features can be exported")
+    scale, biases = spec['scale_and_bias']
+    if len(biases) != 1:
+        raise ValueError(f"{cbm_path}: only binary classification models can be exported")
+
+    trees = spec['oblivious_trees']
+    depth = max(len(tree['splits']) for tree in trees)
+    split_features = np.zeros((len(trees), depth), dtype=np.int32)
+    split_borders = np.full((len(trees), depth), np.inf, dtype=np.float32)
+    leaf_values = np.zeros((len(trees), 1 << depth), dtype=np.float64)
+    for t, tree in enumerate(trees):
+        for d, split in enumerate(tree['splits']):
+            if split['split_type'] != 'FloatFeature':
+                raise ValueError(f"{cbm_path}: unsupported split type {split['split_type']}")
+            split_features[t, d] = split['float_feature_index']
+            split_borders[t, d] = split['border']
+        leaf_values[t, :len(tree['leaf_values'])] = tree['leaf_values']
+
+    feature_names = [feature['feature_id'] for feature in spec['features_info']['float_features']]
+    np.savez(
+        npz_path,
+        split_features=split_features,
+        split_borders=split_borders,
+        leaf_values=leaf_values,
+        scale_and_bias=np.array([scale, biases[0]], dtype=np.float64),
+        feature_names=np.array(feature_names),
+        source_checksum=np.array(_file_checksum(cbm_path)),
+    )
+    return npz_path
+
+
+class ObliviousTrees:
+    """
+    Oblivious-tree ensemble evaluated with NumPy.
+    predict_proba() has the same contract as CatBoostClassifier.predict_proba.
+    """
+
+    def __init__(self, split_features, split_borders, leaf_values, scale_and_bias, feature_names=(), source_checksum=''):
+        self.split_features = np.ascontiguousarray(split_features, dtype=np.intp)
+        self.split_borders = np.ascontiguousarray(split_borders, dtype=np.float32)
+        self.leaf_values = np.ascontiguousarray(leaf_values, dtype=np.float64)
+        self.scale, self.bias = (float(v) for v in scale_and_bias)
+        self.feature_names = [str(name) for name in feature_names]
+        self.source_checksum = str(source_checksum)
+        n_trees, depth = self.split_borders.shape
+        # Split d of a tree sets bit d of the leaf index
+        self._bit_weights = 1 << np.arange(depth, dtype=np.intp)
+        # Offset of each tree's leaves in the flattened leaf table
+        self._leaf_offsets = np.arange(n_trees, dtype=np.intp) * self.leaf_values.shape[1]
+        self._flat_leaf_values = self.leaf_values.ravel()
+
+    @classmethod
+    def load(cls, npz_path):
+        with np.load(npz_path, allow_pickle=False) as arrays:
+            return cls(**{name: arrays[name] for name in arrays.files})
+
+    @property
+    def tree_count(self):
+        return self.split_borders.shape[0]
+
+    def get_borders(self):
+        """Sorted split borders of every feature, like CatBoostClassifier.get_borders()."""
+        n_features = max(len(self.feature_names), int(self.split_features.max()) + 1)
+        borders = {index: set() for index in range(n_features)}
+        for feature, border in zip(self.split_features.ravel(), self.split_borders.ravel()):
+            if np.isfinite(border):
+                borders[int(feature)].add(float(border))
+        return {index: sorted(values) for index, values in borders.items()}
+
+    def leaf_indices(self, X):
+        """Leaf reached in every tree, shape (rows, trees)."""
+        X = np.asarray(X, dtype=np.float32)
+        # CatBoost compares float32 feature values: split fires when value > border
+        bits = X[:, self.split_features] > self.split_borders
+        return bits @ self._bit_weights
+
+    def predict_raw(self, X):
+        """Raw formula values (log-odds), one per row."""
+        leaves = self.leaf_indices(X) + self._leaf_offsets
+        return self._flat_leaf_values[leaves].sum(axis=1) * self.scale + self.bias
+
+    def predict_proba(self, X):
+        """Class probabilities, shape (rows, 2)."""
+        positive = 1.0 / (1.0 + np.exp(-self.predict_raw(X)))
+        return np.column_stack((1.0 - positive, positive))
@@ -0,0 +1,184 @@
+"""
+Memoized predictions of the recommendation models.
+Oblivious trees only look at which side of each split border a feature falls,
+so feature vectors are bucketized by the model's own borders: every row with
+the same bucket vector gets exactly the same prediction. Rows are deduplicated
+per batch with np.unique, cached buckets are served from a bounded LRU and only
+the misses reach the model. The cache is cleared when the model version changes.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+
+# Default number of bucket vectors kept per model
+DEFAULT_CACHE_SIZE = 100_000
+
+
+class PredictionCache:
+    """
+    Bounded LRU of positive-class probabilities for one model.
+
+    Args:
+        max_entries: Number of bucket vectors kept, 0 disables caching
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._version = None
+        self._borders = []
+        self._weights = None
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.batches = 0
+        self.model_calls = 0
+        self.rows = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.inference_seconds = 0.0
+        self.lookup_seconds = 0.0
+
+    def _bind(self, loaded):
+        """Switch to the borders of `loaded`, dropping entries of any other version."""
+        if loaded.checksum == self._version:
+            return
+        borders = loaded.model.get_borders()
+        feature_borders = [np.asarray(borders.get(i, ()), dtype=np.float32) for i in range(max(borders, default=-1) + 1)]
+        # Mixed-radix weights packing a bucket vector into one int64 code, when it fits
+        radices = [len(b) + 1 for b in feature_borders]
+        weights = np.cumprod([1] + radices[:-1], dtype=object)
+        if weights.size and weights[-1] * radices[-1] < 2 ** 63:
+            self._weights = weights.astype(np.int64)
+        else:
+            self._weights = None
+        self._borders = feature_borders
+        self._entries.clear()
+        self._version = loaded.checksum
+        self.invalidations += 1
+
+    @staticmethod
+    def bucketize(feature_borders, X):
+        """Bucket of every feature value: the number of model borders below it."""
+        X = np.asarray(X, dtype=np.float32)
+        buckets = np.zeros(X.shape, dtype=np.uint16)
+        for i, borders in enumerate(feature_borders[:X.shape[1]]):
+            if borders.size:
+                # A split fires when value > border, i.e. for the borders counted here
+                buckets[:, i] = np.searchsorted(borders, X[:, i], side='left')
+        return buckets
+
+    def _unique_keys(self, borders, weights, X):
+        """Distinct bucket keys of `X`, the first row of each and every row's key index."""
+        buckets = self.bucketize(borders, X)
+        if weights is not None:
+            codes = buckets[:, :len(weights)].astype(np.int64) @ weights[:buckets.shape[1]]
+            unique, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+            return unique.tolist(), first, inverse
+        unique, first, inverse = np.unique(buckets, axis=0, return_index=True, return_inverse=True)
+        return [row.tobytes() for row in unique], first, inverse.reshape(-1)
+
+    def predict(self, loaded, X):
+        """
+        Positive-class probabilities of `X`, scoring only rows with unseen buckets
+
+        Args:
+            loaded: LoadedModel from the model registry
+            X: Feature matrix in FEATURE_ORDER
+
+        Returns:
+            NumPy array with one probability per row
+        """
+        if self.max_entries <= 0 or not len(X):
+            return loaded.model.predict_proba(X)[:, 1]
+
+        start = time.perf_counter()
+        with self._lock:
+            self._bind(loaded)
+            borders, weights = self._borders, self._weights
+        keys, first, inverse = self._unique_keys(borders, weights, X)
+
+        probabilities = np.empty(len(keys), dtype=np.float64)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                probability = self._entries.get(key)
+                if probability is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    probabilities[i] = probability
+        lookup_seconds = time.perf_counter() - start
+
+        inference_seconds = 0.0
+        if missing:
+            start = time.perf_counter()
+            scored = loaded.model.predict_proba(np.asarray(X)[first[missing]])[:, 1]
+            inference_seconds = time.perf_counter() - start
+            probabilities[missing] = scored
+
+        with self._lock:
+            if missing and self._version == loaded.checksum:
+                for i, probability in zip(missing, scored):
+                    self._entries[keys[i]] = float(probability)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            self.batches += 1
+            self.model_calls += bool(missing)
+            self.rows += len(X)
+            self.hits += len(X) - len(missing)
+            self.misses += len(missing)
+            self.lookup_seconds += lookup_seconds
+            self.inference_seconds += inference_seconds
+
+        return probabilities[inverse]
+
+    def stats(self):
+        """
+        Counters since start-up.
+        Per-call overhead dominates small batches, so saved time is estimated
+        as the batches that needed no model call at the average cost of a call,
+        minus the time spent in the cache itself.
+        """
+        per_call = self.inference_seconds / self.model_calls if self.model_calls else 0.0
+        return {
+            'version': self._version[:12] if self._version else None,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'batches': self.batches,
+            'model_calls': self.model_calls,
+            'rows': self.rows,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / self.rows, 4) if self.rows else 0.0,
+            'invalidations': self.invalidations,
+            'inference_seconds': round(self.inference_seconds, 6),
+            'lookup_seconds': round(self.lookup_seconds, 6),
+            'estimated_saved_seconds': round((self.batches - self.model_calls) * per_call - self.lookup_seconds, 6),
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_prediction_cache(name):
+    with _caches_lock:
+        if name not in _caches:
+            size = int(getattr(settings, 'RECOMMENDATION_PREDICTION_CACHE_SIZE', DEFAULT_CACHE_SIZE))
+            _caches[name] = PredictionCache(size)
+        return _caches[name]
+
+
+def cached_predict_proba(loaded, X):
+    """Positive-class probabilities of `X` under `loaded`, through its model's prediction cache."""
+    return get_prediction_cache(loaded.name).predict(loaded, X)
+
+
+def prediction_cache_stats():
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -0,0 +1,417 @@
+"""
+Materialized job recommendations (core.models.SeekerRecommendation).
+Rows are filled in the background by `manage.py precompute_recommendations`
+and written through whenever a request has to score live, so reads are a
+single indexed lookup while the row is fresh: younger than
+RECOMMENDATION_MAX_AGE seconds and computed with the current job model.
+New jobs are merged into the fresh rows of the seekers they match by
+merge_new_job(), instead of waiting for the next recompute; job creation
+schedules the merge on a timer thread (schedule_merge).
+Profile edits mark a row dirty (mark_dirty) and schedule a debounced
+recompute of that seeker alone: edits less than RECOMMENDATION_RECOMPUTE_DELAY
+seconds apart collapse into one recompute, and reads never serve a dirty row.
+"""
+import logging
+import math
+import os
+import threading
+from bisect import bisect_right
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from core.ai.job_recommendation import (
+    get_job_recommendations_for_seeker,
+    rule_based_job_recommendation,
+    score_job_for_seekers,
+)
+from core.ai.ml_stage import FALLBACK_SCORE_THRESHOLD, FALLBACK_TOP_N, ML_SCORE_THRESHOLD
+from core.ai.model_registry import registry
+from core.ai.results import Recommendation
+from core.ai.result_cache import bump_versions, cached_recommendations
+from core.ai.lsh_index import seeker_ids_for_lsh
+from core.ai.skill_index import retrieval_ids, seeker_ids_for_skills
+from ml_training.enhanced_matching import get_matching_skills
+
+logger = logging.getLogger(__name__)
+
+# Default lifetime of a materialized row, in seconds
+DEFAULT_MAX_AGE = 6 * 60 * 60
+
+# Default delay, in seconds, between a profile edit and the recompute it schedules
+DEFAULT_RECOMPUTE_DELAY = 10
+
+# Jobs stored per seeker
+TOP_N = 10
+
+# Fields rewritten when a row is recomputed
+STORED_FIELDS = ['job_ids', 'scores', 'engine', 'selection', 'model_version', 'computed_at']
+
+def max_age():
+    return timedelta(seconds=int(getattr(settings, 'RECOMMENDATION_MAX_AGE', DEFAULT_MAX_AGE)))
+
+def recompute_delay():
+    return float(getattr(settings, 'RECOMMENDATION_RECOMPUTE_DELAY', DEFAULT_RECOMPUTE_DELAY))
+
+def job_model_version():
+    return registry.version('job')
+
+def is_fresh(record, model_version=None, now=None):
+    """Whether a SeekerRecommendation row may be served as is."""
+    now = now or timezone.now()
+    model_version = model_version or job_model_version()
+    return (
+        record.dirty_since is None
+        and record.model_version == model_version
+        and record.computed_at >= now - max_age()
+    )
+
+def compute_job_recommendations(seeker, diagnostics=None):
+    """
+    Score a seeker live and build (without saving) their materialized row
+
+    Args:
+        seeker: The job seeker
+        diagnostics: Optional dict filled by get_job_recommendations_for_seeker
+
+    Returns:
+        Tuple of (Recommendation records, unsaved SeekerRecommendation)
+    """
+    from core.models import SeekerRecommendation
+
+    if diagnostics is None:
+        diagnostics = {}
+    recommended = get_job_recommendations_for_seeker(seeker, top_n=TOP_N, diagnostics=diagnostics)
+    record = SeekerRecommendation(
+        seeker=seeker,
+        job_ids=[recommendation.id for recommendation in recommended],
+        scores=diagnostics.get('scores', []),
+        engine=diagnostics.get('engine', ''),
+        selection=diagnostics.get('selection', ''),
+        model_version=job_model_version(),
+        computed_at=timezone.now(),
+    )
+    return recommended, record
+
+def save_records(records, started_at):
+    """
+    Insert or overwrite materialized rows with one bulk upsert
+
+    Args:
+        records: Unsaved SeekerRecommendation rows
+        started_at: When the seekers' profiles were read. Rows marked dirty
+            later stay dirty, their recompute did not see the edit.
+    """
+    from core.models import SeekerRecommendation
+
+    SeekerRecommendation.objects.bulk_create(
+        records, update_conflicts=True, unique_fields=['seeker'], update_fields=STORED_FIELDS,
+    )
+    SeekerRecommendation.objects.filter(
+        seeker_id__in=[record.seeker_id for record in records], dirty_since__lte=started_at,
+    ).update(dirty_since=None)
+
+def refresh_job_recommendations(seeker, diagnostics=None, started_at=None):
+    """Score a seeker live, store the result and return its Recommendation records."""
+    started_at = started_at or timezone.now()
+    recommended, record = compute_job_recommendations(seeker, diagnostics)
+    save_records([record], started_at)
+    return recommended
+
+def materialized_job_recommendations(seeker, diagnostics=None):
+    """
+    Serve a seeker's materialized recommendations
+
+    Args:
+        seeker: The job seeker
+        diagnostics: Optional dict receiving the engine, scores and age of the row
+
+    Returns:
+        Recommendation records of the still-open jobs in stored order, or
+        None when there is no fresh row
+    """
+    from core.models import Job, SeekerRecommendation
+
+    record = SeekerRecommendation.objects.filter(seeker_id=seeker.pk).first()
+    if record is None or not is_fresh(record):
+        return None
+
+    # Jobs deleted or closed since the row was computed are skipped
+    jobs = Job.objects.filter(pk__in=record.job_ids, application_deadline__gte=timezone.now().date()).in_bulk()
+    ranked = [(job_id, score) for job_id, score in zip(record.job_ids, record.scores) if job_id in jobs]
+    if diagnostics is not None:
+        diagnostics.update({
+            'engine': 'materialized',
+            'computed_by': record.engine,
+            'model_version': record.model_version,
+            'computed_at': record.computed_at.isoformat(),
+            'scores': [score for _, score in ranked],
+        })
+    return [
+        Recommendation(jobs[job_id], score, get_matching_skills(seeker.skills, jobs[job_id].skills)[0], record.engine)
+        for job_id, score in ranked
+    ]
+
+def job_recommendations(seeker, diagnostics=None):
+    """
+    Recommendation records of a seeker: from the versioned result cache, else
+    the materialized row while fresh, else scored live (and stored)
+    """
+    def compute(computed):
+        recommended = materialized_job_recommendations(seeker, computed)
+        return recommended if recommended is not None else refresh_job_recommendations(seeker, computed)
+
+    return cached_recommendations('job', seeker.pk, compute, diagnostics)
+
+def fresh_records(seeker_ids):
+    """Fresh SeekerRecommendation rows of `seeker_ids` (a list or a lazy queryset), with their seekers."""
+    from core.models import SeekerRecommendation
+
+    return (
+        SeekerRecommendation.objects
+        .filter(
+            seeker_id__in=seeker_ids, dirty_since__isnull=True,
+            model_version=job_model_version(), computed_at__gte=timezone.now() - max_age(),
+        )
+        .select_related('seeker')
+    )
+
+def insert_ranked(record, job_id, score, top_n=TOP_N):
+    """
+    Insert a job into a row's ranking, keeping it sorted and at most top_n long.
+    Ties go after the stored jobs, as a full recompute ranks older (lower pk) jobs first.
+
+    Returns:
+        True when the job made it into the row
+    """
+    if job_id in record.job_ids:
+        return False
+    # Scores are stored best first: count the stored scores >= score
+    position = bisect_right([-stored for stored in record.scores], -score)
+    if position >= top_n:
+        return False
+    record.job_ids = (record.job_ids[:position] + [job_id] + record.job_ids[position:])[:top_n]
+    record.scores = (record.scores[:position] + [score] + record.scores[position:])[:top_n]
+    return True
+
+def merge_job_score(record, job_id, score):
+    """
+    Apply a new job's ML score to a stored row the way a recompute of the
+    seeker would select it (see select_recommendations in core.ai.ml_stage). Rows
+    whose recompute already saw the job are left as they are.
+
+    Args:
+        record: Fresh SeekerRecommendation
+        job_id: ID of the new job
+        score: Ranking score of the job for the seeker (NaN when the job is
+            pre-filtered out for them)
+
+    Returns:
+        True when the row now includes the job, False when a recompute would
+        leave it unchanged, None when the row comes from the rule-based
+        engine or only a full recompute can tell
+    """
+    if job_id in record.job_ids:
+        return False
+    stored = round(float(score), 4)
+    if record.engine == 'ml' and record.selection == 'threshold':
+        # Jobs under the threshold stay out, whatever else was scored
+        return bool(score >= ML_SCORE_THRESHOLD) and insert_ranked(record, job_id, stored)
+    if record.engine == 'ml' and record.selection == 'fallback':
+        if score >= ML_SCORE_THRESHOLD:
+            # The only job reaching the threshold is recommended alone
+            record.job_ids, record.scores, record.selection = [job_id], [stored], 'threshold'
+            return True
+        return bool(score >= FALLBACK_SCORE_THRESHOLD) and insert_ranked(record, job_id, stored, FALLBACK_TOP_N)
+    if record.engine in ('', 'rule_based'):
+        # The ML stage had nothing to score, or nothing reaching the fallback score
+        if score >= FALLBACK_SCORE_THRESHOLD:
+            selection = 'threshold' if score >= ML_SCORE_THRESHOLD else 'fallback'
+            record.job_ids, record.scores, record.engine, record.selection = [job_id], [stored], 'ml', selection
+            return True
+        if record.engine == '' and math.isnan(score):
+            return False
+        return None
+    if record.engine == 'ml':
+        # Rows stored before selections were recorded
+        return None if score >= FALLBACK_SCORE_THRESHOLD else False
+    return None
+
+def merge_new_job(job, notify=True):
+    """
+    Merge a newly posted job into the materialized recommendations it qualifies for.
+    Only the seekers the retrieval stage finds for the job are scored (those
+    sharing a skill with it, or one of its LSH buckets with
+    RECOMMENDATION_RETRIEVAL = 'lsh'; see retrieval_ids), and each row follows
+    the selection rule that produced it (merge_job_score): a merged row equals
+    a recompute of the seeker. Rows that only a full recompute can settle
+    (ML found nothing but the job, scoring under the fallback score) are
+    marked dirty instead. Seekers without a fresh row pick the job up at their
+    next live read or recompute.
+
+    Args:
+        job: Saved Job instance
+        notify: Whether to send job match notifications to available seekers
+
+    Returns:
+        List of the seekers whose recommendations now include the job
+    """
+    from core.models import SeekerRecommendation
+    from notifications.services import create_job_match_notifications
+
+    if job.application_deadline < timezone.now().date():
+        return []
+    records = list(fresh_records(retrieval_ids(job.skills, seeker_ids_for_skills, seeker_ids_for_lsh)))
+
+    merged = []
+    dirty = []
+    scores, _ = score_job_for_seekers(job, [record.seeker for record in records]) if records else ([], None)
+    for record, score in zip(records, scores):
+        score = float(score)
+        outcome = merge_job_score(record, job.pk, score)
+        if outcome is None and record.engine in ('rule_based', 'cold_start'):
+            # Rule-based scores depend on the pair only, so scoring the job alone gives its stored score
+            recommended = rule_based_job_recommendation(record.seeker, [job], 1)
+            outcome = bool(recommended) and insert_ranked(record, job.pk, round(recommended[0].score, 4))
+        if outcome is None:
+            dirty.append(record.seeker_id)
+        elif outcome:
+            merged.append(record)
+
+    SeekerRecommendation.objects.bulk_update(merged, ['job_ids', 'scores', 'engine', 'selection'])
+    if dirty:
+        SeekerRecommendation.objects.filter(seeker_id__in=dirty).update(dirty_since=timezone.now())
+        for seeker_id in dirty:
+            schedule_recompute(seeker_id)
+    # Results cached between the job's save and this merge must not outlive it
+    bump_versions([f'seeker:{seeker_id}' for seeker_id in [record.seeker_id for record in merged] + dirty])
+    seekers = [record.seeker for record in merged]
+    if notify:
+        create_job_match_notifications([seeker for seeker in seekers if seeker.is_available], job)
+    logger.debug("New job %s: scored for %d seekers, merged into %d recommendation lists, %d marked dirty",
+                 job.pk, len(records), len(merged), len(dirty))
+    return seekers
+
+def merge_job_by_id(job_id):
+    """merge_new_job of a job by ID, if it still exists."""
+    from core.models import Job
+
+    job = Job.objects.filter(pk=job_id).first()
+    return merge_new_job(job) if job is not None else []
+
+def stale_seekers(seekers=None):
+    """Seekers without a fresh materialized row."""
+    from django.db.models import Q
+    from authentication.models import JobSeekerProfile
+
+    seekers = seekers if seekers is not None else JobSeekerProfile.objects.all()
+    return seekers.exclude(
+        Q(job_recommendations__dirty_since__isnull=True)
+        & Q(job_recommendations__model_version=job_model_version())
+        & Q(job_recommendations__computed_at__gte=timezone.now() - max_age())
+    )
+
+# Debounced recompute after profile edits and new job merges (process-local timers)
+
+_pending = {}
+_pending_lock = threading.Lock()
+
+def _forget_pending_timers():
+    # Timer threads don't survive a fork; their entries would block rescheduling forever
+    _pending.clear()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_pending_timers)
+
+def mark_dirty(seeker_id):
+    """
+    Mark a seeker's stored recommendations dirty and schedule their recompute
+
+    Args:
+        seeker_id: ID of the edited JobSeekerProfile
+
+    Returns:
+        True when a recompute was scheduled (replacing a pending one), False
+        when the seeker has no stored row or scheduling is disabled
+    """
+    from core.models import SeekerRecommendation
+
+    # Always re-stamp, so a recompute that read the profile before this edit keeps the row dirty
+    if not SeekerRecommendation.objects.filter(seeker_id=seeker_id).update(dirty_since=timezone.now()):
+        return False
+    return schedule_recompute(seeker_id)
+
+def schedule_recompute(seeker_id, delay=None):
+    """
+    Recompute a dirty seeker after `delay` seconds. A recompute still pending
+    is replaced, so a burst of edits is recomputed once, `delay` seconds after
+    the last one.
+    """
+    delay = recompute_delay() if delay is None else delay
+    if delay <= 0:
+        # Reads score dirty seekers live and precompute_recommendations --stale-only catches up
+        return False
+    return _start_timer(('seeker', seeker_id), delay, recompute_dirty_seeker, seeker_id, replace=True)
+
+def schedule_merge(job_id, delay=None):
+    """
+    Merge a new job into the stored recommendations after `delay` seconds, off
+    the request thread, unless its merge is already pending. Merges right away
+    when scheduling is disabled.
+
+    Returns:
+        True when the merge was scheduled
+    """
+    delay = recompute_delay() if delay is None else delay
+    if delay <= 0:
+        try:
+            merge_job_by_id(job_id)
+        except Exception:
+            # Stored recommendations catch up at their next recompute
+            logger.exception("Merging new job %s into recommendations failed", job_id)
+        return False
+    return _start_timer(('job', job_id), delay, merge_job_by_id, job_id)
+
+def _start_timer(key, delay, function, argument, replace=False):
+    with _pending_lock:
+        if key in _pending:
+            if not replace:
+                return False
+            _pending[key].cancel()
+        timer = threading.Timer(delay, _run_pending, args=(key, function, argument))
+        timer.daemon = True
+        _pending[key] = timer
+    timer.start()
+    return True
+
+def _run_pending(key, function, argument):
+    # Unregister first: an edit landing during the run schedules a new one.
+    # A timer replaced while it was starting leaves its replacement registered.
+    with _pending_lock:
+        if _pending.get(key) is threading.current_thread():
+            del _pending[key]
+    try:
+        function(argument)
+    except Exception:
+        logger.exception("Background %s of %s %s failed", function.__name__, key[0], argument)
+    finally:
+        # Timer threads open their own database connection
+        connection.close()
+
+def recompute_dirty_seeker(seeker_id):
+    """
+    Recompute one seeker's recommendations if their row is still dirty
+
+    Returns:
+        True when the row was recomputed, False when a read or a precompute got there first
+    """
+    from core.models import SeekerRecommendation
+
+    started_at = timezone.now()
+    record = SeekerRecommendation.objects.filter(seeker_id=seeker_id, dirty_since__isnull=False).select_related('seeker').first()
+    if record is None:
+        return False
+    refresh_job_recommendations(record.seeker, started_at=started_at)
+    return True
@@ -0,0 +1,194 @@
+"""
+Versioned cache of recommendation results.
+A result is keyed on the version counters of everything it was computed
+from (core.models.RecommendationVersion) plus the model version and the
+date (deadlines close at midnight without any save):
+- job recommendations of a seeker: 'seeker:<id>' and the 'jobs' catalog
+- candidate recommendations of a job: 'job:<id>' and the 'seekers' pool
+Saves and deletes bump the counters (core.signals), so an entry is never
+served once one of its inputs changed. Entries live in a per-process LRU
+bounded by RECOMMENDATION_RESULT_CACHE_SIZE; the counters are shared by all
+workers through the database.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from core.ai.model_registry import registry
+
+# Default number of cached results per process
+DEFAULT_CACHE_SIZE = 10_000
+
+# Version counters and model of each kind of result
+RESULT_INPUTS = {
+    'job': ('seeker:{}', 'jobs', 'job'),
+    'candidate': ('job:{}', 'seekers', 'candidate'),
+}
+
+# Counter key prefix of a job or seeker -> counter of its catalog
+ENTITY_CATALOGS = {'job:': 'jobs', 'seeker:': 'seekers'}
+
+
+class ResultCache:
+    """Thread-safe LRU of (results, diagnostics) entries."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache(int(getattr(settings, 'RECOMMENDATION_RESULT_CACHE_SIZE', DEFAULT_CACHE_SIZE)))
+        return _cache
+
+
+def get_versions(keys):
+    """Current value of each version counter (0 for counters never bumped), in one query."""
+    from core.models import RecommendationVersion
+
+    found = dict(RecommendationVersion.objects.filter(key__in=keys).values_list('key', 'version'))
+    return tuple(found.get(key, 0) for key in keys)
+
+
+def bump_versions(keys):
+    """
+    Increment version counters, creating the missing ones. Jobs and seekers
+    bumped along with their catalog counter also record the catalog's new
+    version (see MatchingSnapshot.changed_ids).
+
+    Args:
+        keys: Counter keys, e.g. ['job:12', 'jobs']
+    """
+    from core.models import RecommendationVersion
+
+    keys = list(dict.fromkeys(keys))
+    updated = RecommendationVersion.objects.filter(key__in=keys).update(version=F('version') + 1)
+    if updated < len(keys):
+        existing = set(RecommendationVersion.objects.filter(key__in=keys).values_list('key', flat=True))
+        RecommendationVersion.objects.bulk_create(
+            [RecommendationVersion(key=key, version=1) for key in keys if key not in existing],
+            ignore_conflicts=True,
+        )
+    for prefix, catalog in ENTITY_CATALOGS.items():
+        entities = [key for key in keys if key.startswith(prefix)]
+        if entities and catalog in keys:
+            # The bump above holds the catalog row until commit, so versions follow commit order
+            version = RecommendationVersion.objects.get(key=catalog).version
+            RecommendationVersion.objects.filter(key__in=entities).update(catalog_version=version)
+
+
+def result_key(kind, entity_id, params=()):
+    """Cache key of a result: its input versions, model version, date and call parameters."""
+    entity_key, catalog_key, model_name = RESULT_INPUTS[kind]
+    versions = get_versions([entity_key.format(entity_id), catalog_key])
+    return (kind, entity_id, versions, registry.version(model_name), timezone.now().date(), tuple(sorted(params)))
+
+
+def cached_recommendations(kind, entity_id, compute, diagnostics=None, params=()):
+    """
+    Serve a recommendation result from the cache, computing it on a miss
+
+    Args:
+        kind: 'job' (recommendations of a seeker) or 'candidate' (of a job)
+        entity_id: ID of the seeker or job
+        compute: Callable taking a diagnostics dict and returning the results list
+        diagnostics: Optional dict receiving the diagnostics of the result
+            and whether it was a cache 'hit' or 'miss'
+        params: Items of the call parameters the result depends on
+
+    Returns:
+        List of recommendations
+    """
+    cache = get_result_cache()
+    key = result_key(kind, entity_id, params)
+    entry = cache.get(key)
+    if entry is None:
+        computed = {}
+        results = compute(computed)
+        entry = (list(results), dict(computed))
+        cache.put(key, entry)
+        status = 'miss'
+    else:
+        status = 'hit'
+
+    results, stored = entry
+    if diagnostics is not None:
+        diagnostics.update(stored)
+        diagnostics['result_cache'] = status
+    return list(results)
+
+
+def cached_job_recommendations_for_seeker(seeker, diagnostics=None, **kwargs):
+    """get_job_recommendations_for_seeker through the result cache (default candidate set only)."""
+    from core.ai.job_recommendation import get_job_recommendations_for_seeker
+
+    if kwargs.get('jobs') is not None:
+        return get_job_recommendations_for_seeker(seeker, diagnostics=diagnostics, **kwargs)
+    return cached_recommendations(
+        'job', seeker.pk,
+        lambda computed: get_job_recommendations_for_seeker(seeker, diagnostics=computed, **kwargs),
+        diagnostics, kwargs.items(),
+    )
+
+
+def cached_candidate_recommendations_for_job(job, diagnostics=None, **kwargs):
+    """get_candidate_recommendations_for_job through the result cache (default candidate set only)."""
+    from core.ai.candidate_recommendation import get_candidate_recommendations_for_job
+
+    if kwargs.get('seekers') is not None:
+        return get_candidate_recommendations_for_job(job, diagnostics=diagnostics, **kwargs)
+    return cached_recommendations(
+        'candidate', job.pk,
+        lambda computed: get_candidate_recommendations_for_job(job, diagnostics=computed, **kwargs),
+        diagnostics, kwargs.items(),
+    )
+
+
+def result_cache_stats():
+    return get_result_cache().stats()
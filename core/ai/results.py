@@ -0,0 +1,36 @@
+"""
+Compact recommendation results.
+The engines return one Recommendation per recommended job or seeker, carrying
+the score that ranked it and the skills it matched on, so callers never have
+to rescore what the engine already scored.
+"""
+
+# Engines a recommendation can come from
+ENGINES = ('ml', 'rule_based', 'cold_start')
+
+
+class Recommendation:
+    """
+    One recommended job or job seeker.
+
+    Attributes:
+        id: Primary key of the recommended object
+        score: Score that ranked it: job/candidate model probability for the
+            'ml' engine (for jobs, plus RECOMMENDATION_TEXT_WEIGHT x the
+            description similarity when set), weighted rule score otherwise
+        matched_skills: Sorted canonical skills shared by the seeker and the job
+        engine: 'ml', 'rule_based' or 'cold_start'
+        obj: The recommended Job or JobSeekerProfile
+    """
+
+    __slots__ = ('id', 'score', 'matched_skills', 'engine', 'obj')
+
+    def __init__(self, obj, score, matched_skills=(), engine='ml'):
+        self.id = obj.pk
+        self.score = float(score)
+        self.matched_skills = tuple(sorted(matched_skills))
+        self.engine = engine
+        self.obj = obj
+
+    def __repr__(self):
+        return f"Recommendation(id={self.id}, score={self.score:.4f}, engine={self.engine!r})"
@@ -0,0 +1,129 @@
+"""
+Packed skill bitsets.
+The feature store rows (core.ai.feature_store) keep the canonical skills of
+every job and seeker as a little-endian bitset over the canonical skills of
+ml_training.enhanced_matching.SKILL_MAPPING, computed on save. Bit positions
+are fixed and dense (the order of the mapping), so every bitset has the same
+few words and nothing is written to the database to assign them. Scoring a
+chunk of rows against a profile is then a bitwise AND and a popcount per
+64-bit word, with no per-row canonicalization or set building.
+
+Skills outside the mapping have no bit: rows listing any are stored without
+a bitset and scored through a SkillMatrix built from their raw skills.
+Every bitset starts with a word identifying the vocabulary, so bitsets
+stored before SKILL_MAPPING changed are scored the same way until
+`manage.py rebuild_feature_store` recomputes them.
+"""
+import hashlib
+
+import numpy as np
+
+from core.ai.skill_matrix import SkillMatrix, skill_match_scores
+from ml_training.enhanced_matching import SKILL_MAPPING, canonical_skills, skill_name
+
+# Canonical skill name -> bit
+SKILL_BITS = {name: bit for bit, name in enumerate(SKILL_MAPPING)}
+# 64-bit words per bitset, after the vocabulary word
+SKILL_WORDS = (len(SKILL_BITS) + 63) // 64
+VOCABULARY_WORD = int.from_bytes(hashlib.blake2b("\n".join(SKILL_BITS).encode(), digest_size=8).digest(), 'little')
+_BITSET_BYTES = (1 + SKILL_WORDS) * 8
+
+def skill_bitset(skills):
+    """
+    Packed bitset of a raw skills list, as stored in the feature store
+
+    Returns:
+        Bytes (the vocabulary word and SKILL_WORDS words), or None when the
+        skills cannot be encoded (malformed entries, or skills outside
+        SKILL_MAPPING)
+    """
+    try:
+        names = canonical_skills(skills or [])
+    except (AttributeError, TypeError):
+        return None
+    bits = 0
+    for name in names:
+        if name not in SKILL_BITS:
+            return None
+        bits |= 1 << SKILL_BITS[name]
+    return VOCABULARY_WORD.to_bytes(8, 'little') + bits.to_bytes(SKILL_WORDS * 8, 'little')
+
+def is_current_bitset(bitset):
+    """Whether a stored bitset was packed over the current vocabulary."""
+    return (
+        bitset is not None and len(bitset) == _BITSET_BYTES
+        and int.from_bytes(bytes(bitset[:8]), 'little') == VOCABULARY_WORD
+    )
+
+
+class SkillBitsets:
+    """
+    Rows of packed skill bitsets, scored against a profile with one AND and
+    popcount per word. Drop-in for SkillMatrix.overlap / match_scores.
+
+    Args:
+        items: Jobs or seekers, one per row
+        bitsets: Their stored bitsets (bytes or memoryview); rows whose bitset
+            is missing or not current (is_current_bitset) are scored through
+            a SkillMatrix of their raw skills
+    """
+
+    def __init__(self, items, bitsets):
+        self.items = list(items)
+        current = [is_current_bitset(bitset) for bitset in bitsets]
+        empty = bytes(_BITSET_BYTES)
+        buffer = b"".join(bytes(bitset) if ok else empty for bitset, ok in zip(bitsets, current))
+        self.words = np.frombuffer(buffer, dtype="<u8").reshape(len(bitsets), 1 + SKILL_WORDS)[:, 1:]
+        # Number of distinct canonical skills per row
+        self.row_sizes = np.bitwise_count(self.words).sum(axis=1, dtype=np.int32)
+
+        self.fallback_rows = np.flatnonzero(~np.array(current, dtype=bool))
+        self.fallback = None
+        if self.fallback_rows.size:
+            self.fallback = SkillMatrix([self.items[row] for row in self.fallback_rows])
+            self.row_sizes[self.fallback_rows] = self.fallback.row_sizes
+
+    def __len__(self):
+        return self.words.shape[0]
+
+    def _query_words(self, query_ids):
+        # Skills outside the mapping are in no stored bitset
+        bits = 0
+        for name in map(skill_name, query_ids):
+            if name in SKILL_BITS:
+                bits |= 1 << SKILL_BITS[name]
+        return np.frombuffer(bits.to_bytes(SKILL_WORDS * 8, 'little'), dtype="<u8")
+
+    def overlap(self, query_ids):
+        """Number of skills each row shares with `query_ids` (popcount of the AND)."""
+        if not len(self) or not query_ids:
+            return np.zeros(len(self), dtype=np.int32)
+        overlap = np.bitwise_count(self.words & self._query_words(query_ids)).sum(axis=1, dtype=np.int32)
+        if self.fallback is not None:
+            overlap[self.fallback_rows] = self.fallback.overlap(query_ids)
+        return overlap
+
+    def match_scores(self, query_ids, query_is_job=False):
+        """
+        Score a profile's skills against every row
+
+        Args:
+            query_ids: Canonical skill IDs of the profile (skill_ids())
+            query_is_job: True when the query is a job and the rows are seekers
+
+        Returns:
+            SkillMatchScores of NumPy arrays, as SkillMatrix.match_scores
+        """
+        return skill_match_scores(self.overlap(query_ids), self.row_sizes, len(query_ids), query_is_job)
+
+
+def chunk_skill_matrix(chunk):
+    """
+    Skill scorer of a chunk of slim rows: their stored bitsets, with the rows
+    lacking a current one scored from their raw skills; a plain SkillMatrix
+    when no row has one
+    """
+    bitsets = [getattr(row, 'feature_skill_bits', None) for row in chunk]
+    if any(is_current_bitset(bitset) for bitset in bitsets):
+        return SkillBitsets(chunk, bitsets)
+    return SkillMatrix(chunk)
@@ -0,0 +1,229 @@
+"""
+Inverted skill indexes used for recommendation candidate generation.
+Postings map a canonical skill (see ml_training.enhanced_matching) to the
+entities listing it and are kept current by the receivers in core.signals.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ml_training.enhanced_matching import canonical_skills, job_type_match
+from ml_training.gazetteer import places_within, resolve_location
+from core.ai.lsh_index import active_job_ids_for_lsh, available_seeker_ids_for_lsh
+
+# Postings store canonical skill names (the integer skill IDs are per process)
+SKILL_KEY_LENGTH = 255
+
+# Defaults of RECOMMENDATION_RETRIEVAL and RECOMMENDATION_LSH_MIN_CANDIDATES
+DEFAULT_RETRIEVAL = 'postings'
+DEFAULT_LSH_MIN_CANDIDATES = 20
+
+def retrieval_mode():
+    """Candidate retrieval stage: 'postings' or 'lsh' (core.ai.lsh_index)."""
+    return getattr(settings, 'RECOMMENDATION_RETRIEVAL', DEFAULT_RETRIEVAL)
+
+def lsh_min_candidates():
+    """Size under which an LSH short list falls back to the postings."""
+    return int(getattr(settings, 'RECOMMENDATION_LSH_MIN_CANDIDATES', DEFAULT_LSH_MIN_CANDIDATES))
+
+def skill_keys(skills):
+    """Canonical, de-duplicated posting keys for a raw skills list."""
+    return list(dict.fromkeys(skill[:SKILL_KEY_LENGTH] for skill in canonical_skills(skills or [])))
+
+def index_job_skills(job):
+    """
+    Rebuild the skill postings of a single job
+
+    Args:
+        job: Saved Job instance
+    """
+    from core.models import JobSkill
+
+    with transaction.atomic():
+        JobSkill.objects.filter(job_id=job.pk).delete()
+        JobSkill.objects.bulk_create([
+            JobSkill(skill=skill, job_id=job.pk, application_deadline=job.application_deadline)
+            for skill in skill_keys(job.skills)
+        ])
+
+def rebuild_job_skill_index(batch_size=1000):
+    """
+    Rebuild the postings of every job from scratch
+
+    Returns:
+        Number of postings written
+    """
+    from core.models import Job, JobSkill
+
+    written = 0
+    with transaction.atomic():
+        JobSkill.objects.all().delete()
+        batch = []
+        for job_id, skills, deadline in Job.objects.values_list('id', 'skills', 'application_deadline').iterator(chunk_size=batch_size):
+            batch.extend(JobSkill(skill=skill, job_id=job_id, application_deadline=deadline) for skill in skill_keys(skills))
+            if len(batch) >= batch_size:
+                written += len(JobSkill.objects.bulk_create(batch))
+                batch = []
+        written += len(JobSkill.objects.bulk_create(batch))
+    return written
+
+def active_job_ids_for_skills(skills):
+    """
+    Union of the postings of `skills`, restricted to jobs still open for applications
+
+    Args:
+        skills: Raw skills list (e.g. a seeker's skills)
+
+    Returns:
+        Queryset of distinct job IDs, evaluated lazily (usable as a subquery)
+    """
+    from core.models import JobSkill
+
+    return (
+        JobSkill.objects
+        .filter(skill__in=skill_keys(skills), application_deadline__gte=timezone.now().date())
+        .values('job_id')
+        .distinct()
+    )
+
+def rejected_job_types(preferences):
+    """
+    Job types (JOB_TYPE_CHOICES values) that preferred_job_types rule out entirely
+
+    Args:
+        preferences: A seeker's preferred_job_types
+
+    Returns:
+        List of the job types job_type_match() scores 0 (none without
+        preferences, or when they are malformed: the engines' ML stage
+        then fails on them and falls back to the rule-based scorer)
+    """
+    from core.models import JOB_TYPE_CHOICES
+
+    if not preferences:
+        return []
+    try:
+        return [job_type for job_type, _ in JOB_TYPE_CHOICES if not job_type_match(preferences, job_type)]
+    except (AttributeError, TypeError):
+        return []
+
+def retrieval_ids(skills, postings_ids, lsh_ids):
+    """
+    Candidate IDs of the configured retrieval stage (RECOMMENDATION_RETRIEVAL)
+
+    Args:
+        skills: Raw skills list of the query (seeker or job)
+        postings_ids: Function returning the posting union of `skills`
+        lsh_ids: Function returning its LSH neighbors (core.ai.lsh_index)
+
+    Returns:
+        Queryset of distinct IDs, evaluated lazily (usable as a subquery).
+        LSH short lists under RECOMMENDATION_LSH_MIN_CANDIDATES rows fall
+        back to the postings, so that rare profiles still get candidates.
+    """
+    if retrieval_mode() == 'lsh':
+        ids = lsh_ids(skills)
+        min_candidates = lsh_min_candidates()
+        if ids[:min_candidates].count() >= min_candidates:
+            return ids
+    return postings_ids(skills)
+
+def candidate_jobs_for_seeker(seeker):
+    """
+    Jobs that can be recommended to the seeker: still open, sharing at least
+    one canonical skill with them and of a job type their preferences accept.
+    Every one of these constraints runs in the database. With
+    RECOMMENDATION_RETRIEVAL = 'lsh' the skill constraint is replaced by the
+    seeker's LSH neighbors (see retrieval_ids).
+    """
+    from core.models import Job
+
+    job_ids = retrieval_ids(getattr(seeker, 'skills', None), active_job_ids_for_skills, active_job_ids_for_lsh)
+    return (
+        Job.objects
+        .filter(pk__in=job_ids, application_deadline__gte=timezone.now().date())
+        .exclude(job_type__in=rejected_job_types(getattr(seeker, 'preferred_job_types', None)))
+        .order_by('pk')
+    )
+
+def index_seeker_skills(seeker):
+    """
+    Rebuild the skill postings of a single job seeker
+
+    Args:
+        seeker: Saved JobSeekerProfile instance
+    """
+    from core.models import SeekerSkill
+
+    with transaction.atomic():
+        SeekerSkill.objects.filter(seeker_id=seeker.pk).delete()
+        SeekerSkill.objects.bulk_create([
+            SeekerSkill(skill=skill, seeker_id=seeker.pk, is_available=seeker.is_available)
+            for skill in skill_keys(seeker.skills)
+        ])
+
+def rebuild_seeker_skill_index(batch_size=1000):
+    """
+    Rebuild the postings of every job seeker from scratch
+
+    Returns:
+        Number of postings written
+    """
+    from authentication.models import JobSeekerProfile
+    from core.models import SeekerSkill
+
+    written = 0
+    with transaction.atomic():
+        SeekerSkill.objects.all().delete()
+        batch = []
+        rows = JobSeekerProfile.objects.values_list('id', 'skills', 'is_available').iterator(chunk_size=batch_size)
+        for seeker_id, skills, is_available in rows:
+            batch.extend(SeekerSkill(skill=skill, seeker_id=seeker_id, is_available=is_available) for skill in skill_keys(skills))
+            if len(batch) >= batch_size:
+                written += len(SeekerSkill.objects.bulk_create(batch))
+                batch = []
+        written += len(SeekerSkill.objects.bulk_create(batch))
+    return written
+
+def seeker_ids_for_skills(skills):
+    """Distinct IDs of every seeker (available or not) listing one of `skills`, as a lazy queryset."""
+    from core.models import SeekerSkill
+
+    return SeekerSkill.objects.filter(skill__in=skill_keys(skills)).values('seeker_id').distinct()
+
+def available_seeker_ids_for_skills(skills):
+    """
+    Union of the postings of `skills`, restricted to available seekers
+
+    Args:
+        skills: Raw skills list (e.g. a job's skills)
+
+    Returns:
+        Queryset of distinct seeker IDs, evaluated lazily (usable as a subquery)
+    """
+    from core.models import SeekerSkill
+
+    return (
+        SeekerSkill.objects
+        .filter(skill__in=skill_keys(skills), is_available=True)
+        .values('seeker_id')
+        .distinct()
+    )
+
+def candidate_seekers_for_job(job, max_distance_km=None):
+    """
+    Available seekers sharing at least one canonical skill with the job (or,
+    with RECOMMENDATION_RETRIEVAL = 'lsh', its LSH neighbors). Availability
+    is checked on the profile as well as on the postings.
+    With `max_distance_km`, only seekers whose location resolves (in the
+    feature store) to a gazetteer place within that distance of the job's
+    place are kept; none are when the job's location does not resolve.
+    """
+    from authentication.models import JobSeekerProfile
+
+    seeker_ids = retrieval_ids(getattr(job, 'skills', None), available_seeker_ids_for_skills, available_seeker_ids_for_lsh)
+    seekers = JobSeekerProfile.objects.filter(pk__in=seeker_ids, is_available=True)
+    if max_distance_km is not None:
+        job_place = resolve_location(getattr(job, 'location', None))
+        seekers = seekers.filter(features__location_place__in=places_within(job_place, max_distance_km))
+    return seekers.order_by('pk')
@@ -0,0 +1,121 @@
+"""
+Vectorized skill matching against a whole catalog.
+Skills of every entity (job or seeker) are stored as a scipy.sparse CSR
+entity x skill incidence matrix over interned skill IDs, so one sparse
+mat-vec scores a profile against all rows at once.
+"""
+from collections import namedtuple
+
+import numpy as np
+from scipy import sparse
+
+from ml_training.enhanced_matching import skill_ids, skill_name
+
+# Per-row skill scores. `skill_score` equals the score of
+# enhanced_matching.get_matching_skills (0.0 when nothing matches).
+SkillMatchScores = namedtuple("SkillMatchScores", ["overlap", "jaccard", "coverage", "skill_score"])
+
+
+def skill_match_scores(overlap, row_sizes, query_size, query_is_job=False):
+    """
+    SkillMatchScores of every row from its overlap with a query
+
+    Args:
+        overlap: Number of skills each row shares with the query
+        row_sizes: Number of distinct canonical skills of each row
+        query_size: Number of distinct canonical skills of the query
+        query_is_job: True when the query is a job and the rows are seekers
+    """
+    union = row_sizes + query_size - overlap
+    job_sizes = np.full(len(overlap), query_size) if query_is_job else row_sizes
+
+    matched = overlap > 0
+    jaccard = np.zeros(len(overlap), dtype=np.float64)
+    coverage = np.zeros(len(overlap), dtype=np.float64)
+    np.divide(overlap, union, out=jaccard, where=matched)
+    np.divide(overlap, job_sizes, out=coverage, where=matched)
+    skill_score = np.where(matched, jaccard * 0.4 + coverage * 0.6, 0.0)
+    return SkillMatchScores(overlap, jaccard, coverage, skill_score)
+
+
+class SkillMatrix:
+    """
+    CSR incidence matrix of canonical skill IDs, one row per entity.
+
+    Args:
+        items: Jobs or seekers (anything with a `skills` attribute)
+        skills_of: Optional callable returning the raw skills list of an item
+        row_skill_ids: Optional precomputed skill ID sets, one per row
+    """
+
+    def __init__(self, items, skills_of=None, row_skill_ids=None):
+        self.items = list(items)
+        if row_skill_ids is None:
+            if skills_of is None:
+                skills_of = lambda item: getattr(item, "skills", None) or []
+            row_skill_ids = [skill_ids(skills_of(item)) for item in self.items]
+
+        indptr = np.zeros(len(row_skill_ids) + 1, dtype=np.int64)
+        np.cumsum([len(ids) for ids in row_skill_ids], out=indptr[1:])
+        indices = np.fromiter((sid for ids in row_skill_ids for sid in sorted(ids)), dtype=np.int32, count=int(indptr[-1]))
+        n_cols = int(indices.max()) + 1 if indices.size else 0
+
+        self.matrix = sparse.csr_matrix(
+            (np.ones(indices.size, dtype=np.int32), indices, indptr),
+            shape=(len(row_skill_ids), n_cols),
+        )
+        # Number of distinct canonical skills per row
+        self.row_sizes = np.diff(indptr).astype(np.int32)
+
+    @classmethod
+    def from_skill_ids(cls, row_skill_ids, items=None):
+        """Build the matrix from precomputed skill ID sets (one per row)."""
+        return cls(items if items is not None else [], row_skill_ids=row_skill_ids)
+
+    @classmethod
+    def from_csr(cls, indptr, indices, data, row_sizes, n_cols):
+        """
+        Wrap existing CSR arrays (e.g. memory-mapped ones) without copying them.
+        indptr and indices must share an integer dtype for scipy to keep them.
+        """
+        self = cls.__new__(cls)
+        self.items = []
+        self.matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(row_sizes), n_cols))
+        self.row_sizes = row_sizes
+        return self
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def _query_vector(self, query_ids):
+        vector = np.zeros(self.matrix.shape[1], dtype=np.int32)
+        known = [sid for sid in query_ids if sid < vector.size]
+        vector[known] = 1
+        return vector
+
+    def overlap(self, query_ids):
+        """Number of skills each row shares with `query_ids` (one sparse mat-vec)."""
+        if not len(self) or not query_ids:
+            return np.zeros(len(self), dtype=np.int32)
+        return self.matrix @ self._query_vector(query_ids)
+
+    def match_scores(self, query_skills, query_is_job=False):
+        """
+        Score a profile's skills against every row
+
+        Args:
+            query_skills: Raw skills list or a set of skill IDs of the profile
+            query_is_job: True when the query is a job and the rows are seekers,
+                so that coverage is measured over the query's skills
+
+        Returns:
+            SkillMatchScores of NumPy arrays, one entry per row
+        """
+        query_ids = query_skills if isinstance(query_skills, frozenset) else skill_ids(query_skills)
+        return skill_match_scores(self.overlap(query_ids), self.row_sizes, len(query_ids), query_is_job)
+
+    def matching_skills(self, row, query_skills):
+        """Canonical names of the skills row `row` shares with the query."""
+        query_ids = query_skills if isinstance(query_skills, frozenset) else skill_ids(query_skills)
+        start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        return {skill_name(int(sid)) for sid in self.matrix.indices[start:end] if int(sid) in query_ids}
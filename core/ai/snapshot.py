@@ -0,0 +1,532 @@
+"""
+Read-only matching snapshot shared by every worker process.
+`manage.py build_matching_snapshot` writes the matching inputs of all jobs and
+seekers as .npy files: skill-ID CSR arrays, location, job type, requirement
+and education IDs, experience years, deadlines and availability. Strings and
+JSON values are interned into per-column tables kept in meta.json. Workers
+open the files with np.load(mmap_mode='r'), so every gunicorn worker reads the
+same pages of the page cache and nothing is copied into their heaps.
+
+A snapshot records the 'jobs' and 'seekers' version counters it was built at
+(see core.ai.result_cache). Every job or profile changed since then records a
+later catalog version, so the engines skip those rows of the snapshot and
+stream them from the database instead: they score exactly what the database
+holds. Past RECOMMENDATION_SNAPSHOT_MAX_CHANGED changed rows the catalog is
+streamed whole until the next rebuild.
+
+Layout of RECOMMENDATION_SNAPSHOT_DIR:
+    CURRENT                 name of the snapshot in use
+    <name>/meta.json        catalog versions, skill names and value tables
+    <name>/jobs/*.npy       one array per job column, rows in pk order
+    <name>/seekers/*.npy    one array per seeker column, rows in pk order
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from ml_training.enhanced_matching import (
+    canonical_skills,
+    skill_name,
+    education_level_score,
+    job_type_match,
+    enhanced_location_match,
+)
+from core.ai.feature_extraction import _job_side, _seeker_side, assemble_feature_matrix
+from core.ai.ml_stage import accepts_job_type, meets_experience
+from core.ai.result_cache import ENTITY_CATALOGS, get_versions
+from core.ai.skill_index import rejected_job_types
+from core.ai.skill_matrix import SkillMatchScores, SkillMatrix
+from core.ai.streaming import RowStream, SlimJob, SlimRow, SlimSeeker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(settings.BASE_DIR, 'snapshots')
+
+# Version counters a snapshot is built at, one per catalog
+CATALOGS = ('jobs', 'seekers')
+
+# Snapshots kept on disk: the current one and the one workers may still have open
+KEEP_SNAPSHOTS = 2
+
+# Default of RECOMMENDATION_SNAPSHOT_MAX_CHANGED
+DEFAULT_SNAPSHOT_MAX_CHANGED = 1000
+
+# Columns of each catalog: numeric inputs of the features, stored as float64,
+# and values interned into a table of meta.json, stored as int32 table IDs
+NUMERIC_COLUMNS = {
+    'jobs': ('min_experience', 'min_salary', 'max_salary'),
+    'seekers': ('experience_years', 'min_salary', 'rating', 'is_available'),
+}
+INTERNED_COLUMNS = {
+    'jobs': ('requirements', 'job_type', 'location'),
+    'seekers': ('education', 'preferred_job_types', 'location'),
+}
+
+
+def snapshot_dir():
+    return str(getattr(settings, 'RECOMMENDATION_SNAPSHOT_DIR', DEFAULT_SNAPSHOT_DIR))
+
+
+def snapshot_max_changed():
+    """Changed rows of a catalog past which its snapshot is no longer used."""
+    return int(getattr(settings, 'RECOMMENDATION_SNAPSHOT_MAX_CHANGED', DEFAULT_SNAPSHOT_MAX_CHANGED))
+
+
+def current_name(root=None):
+    """Name of the snapshot in use, or None before the first build."""
+    try:
+        with open(os.path.join(root or snapshot_dir(), 'CURRENT')) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+class SnapshotRow(SlimRow):
+    """A job or seeker read from the snapshot: its ID and canonical skills."""
+
+    fields = ('id', 'skills')
+    __slots__ = fields
+
+
+class SnapshotCatalog:
+    """
+    Memory-mapped columns of one catalog (jobs or seekers).
+
+    Args:
+        path: Directory of the catalog's .npy files
+        tables: Value tables of its interned columns
+        skill_names: Canonical skill name of every skill column
+    """
+
+    def __init__(self, path, tables, skill_names):
+        self.arrays = {
+            name[:-len('.npy')]: np.load(os.path.join(path, name), mmap_mode='r')
+            for name in os.listdir(path) if name.endswith('.npy')
+        }
+        self.ids = self.arrays['ids']
+        self.tables = tables
+        self.skill_names = skill_names
+        self.skills = SkillMatrix.from_csr(
+            self.arrays['skill_indptr'], self.arrays['skill_indices'], self.arrays['skill_data'],
+            self.arrays['skill_row_sizes'], len(skill_names),
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def distinct(self, column, rows):
+        """
+        Distinct values of an interned column over `rows`
+
+        Returns:
+            Tuple of (list of the distinct values, index of each row's value in that list)
+        """
+        value_ids, inverse = np.unique(self.arrays[column][rows], return_inverse=True)
+        return [self.tables[column][value_id] for value_id in value_ids], inverse.reshape(-1)
+
+    def value_ids(self, column, values):
+        """Table IDs of the entries of an interned column equal to one of `values`."""
+        return [value_id for value_id, value in enumerate(self.tables[column]) if value in values]
+
+    def row(self, row):
+        """The row as a SnapshotRow, e.g. to hand to Recommendation."""
+        indptr, indices = self.arrays['skill_indptr'], self.arrays['skill_indices']
+        columns = indices[indptr[row]:indptr[row + 1]]
+        return SnapshotRow((int(self.ids[row]), [self.skill_names[column] for column in columns]))
+
+
+class MatchingSnapshot:
+    """An opened snapshot directory."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.path = path
+        self.name = meta['name']
+        self.built_at = meta['built_at']
+        self.catalog_versions = meta['catalog_versions']
+        # Snapshots built before rows recorded their catalog version only know the counters
+        self.tracks_changes = meta.get('tracks_changes', False)
+        self.skill_columns = {name: column for column, name in enumerate(meta['skills'])}
+        self.jobs = SnapshotCatalog(os.path.join(path, 'jobs'), meta['tables']['jobs'], meta['skills'])
+        self.seekers = SnapshotCatalog(os.path.join(path, 'seekers'), meta['tables']['seekers'], meta['skills'])
+
+    def is_current(self, catalog):
+        """Whether `catalog` ('jobs' or 'seekers') has not changed since the build."""
+        return self.catalog_versions.get(catalog) == get_versions([catalog])[0]
+
+    def changed_ids(self, catalog, limit=None):
+        """
+        Jobs or seekers changed (or deleted) since the build, whose snapshot
+        rows are stale
+
+        Args:
+            catalog: 'jobs' or 'seekers'
+            limit: Maximum number of IDs to read
+
+        Returns:
+            Sorted list of IDs
+        """
+        from core.models import RecommendationVersion
+
+        prefix = next(prefix for prefix, name in ENTITY_CATALOGS.items() if name == catalog)
+        keys = (
+            RecommendationVersion.objects
+            .filter(catalog_version__gt=self.catalog_versions[catalog], key__startswith=prefix)
+            .values_list('key', flat=True)
+        )
+        return sorted(int(key[len(prefix):]) for key in keys[:limit])
+
+    def query_skill_ids(self, skills):
+        """
+        Skill columns of a raw skills list. Skills unknown to the snapshot get
+        columns past the last one: they match no row but still count in the
+        query's size, as with SkillMatrix.match_scores over skill_ids().
+        """
+        ids = []
+        unknown = len(self.skill_columns)
+        for skill in set(canonical_skills(skills or [])):
+            column = self.skill_columns.get(skill)
+            if column is None:
+                column, unknown = unknown, unknown + 1
+            ids.append(column)
+        return frozenset(ids)
+
+    def job_inputs(self, seeker, feature_order, exclude=()):
+        """
+        Candidate jobs and feature rows of the ML stage of get_job_recommendations_for_seeker
+
+        Candidates are the jobs candidate_jobs_for_seeker returns (open,
+        sharing a skill, of an accepted job type); the rows scored are those
+        passing the engine's experience and job type pre-filters.
+
+        Args:
+            seeker: The job seeker
+            feature_order: Column order of the feature matrix
+            exclude: IDs of jobs to leave out (changed_ids)
+
+        Returns:
+            Tuple of (number of candidates, snapshot rows scored in pk order,
+            their float32 feature matrix)
+        """
+        seeker_side = _seeker_side(seeker)
+        jobs = self.jobs
+        scores = jobs.skills.match_scores(self.query_skill_ids(getattr(seeker, 'skills', None)))
+        candidate = (scores.overlap > 0) & (jobs.arrays['deadline'] >= timezone.now().date().toordinal())
+        rejected = rejected_job_types(getattr(seeker, 'preferred_job_types', None))
+        if rejected:
+            candidate &= ~np.isin(jobs.arrays['job_type'], jobs.value_ids('job_type', rejected))
+        if len(exclude):
+            candidate &= ~np.isin(jobs.ids, exclude)
+        candidates = np.flatnonzero(candidate)
+
+        # The ML stage's experience and job type pre-filters (core.ai.ml_stage)
+        keep = meets_experience(seeker_side['experience_years'], jobs.arrays['min_experience'][candidates])
+        preferences = seeker_side['preferred_job_types']
+        if preferences:
+            job_types, inverse = jobs.distinct('job_type', candidates)
+            accepted = np.array([accepts_job_type(preferences, job_type) for job_type in job_types], dtype=bool)
+            keep &= accepted[inverse]
+        rows = candidates[keep]
+
+        # Pairwise scores, evaluated once per distinct job value
+        requirements, inverse = jobs.distinct('requirements', rows)
+        education = _per_value([
+            education_level_score(seeker_side['education'], value) if seeker_side['education'] and value else 0.0
+            for value in requirements
+        ], inverse)
+        job_types, inverse = jobs.distinct('job_type', rows)
+        job_type_scores = _per_value([job_type_match(preferences, job_type) for job_type in job_types], inverse)
+        locations, inverse = jobs.distinct('location', rows)
+        location_scores = _per_value([
+            enhanced_location_match(
+                seeker_side['location'], location, seeker_side['willing_to_relocate'], seeker_place=seeker_side['location_place'],
+            )
+            for location in locations
+        ], inverse)
+
+        X = assemble_feature_matrix(
+            len(rows),
+            SkillMatchScores(*(values[rows] for values in scores)),
+            {'education_match': education, 'preferred_job_type_match': job_type_scores, 'location_match': location_scores},
+            lambda key: np.array([seeker_side[key]], dtype=np.float64),
+            lambda key: jobs.arrays[key][rows],
+            feature_order,
+        )
+        return len(candidates), rows, X
+
+    def seeker_inputs(self, job, feature_order, exclude=()):
+        """
+        Candidate seekers and feature rows of the ML stage of get_candidate_recommendations_for_job
+
+        Candidates are the seekers candidate_seekers_for_job returns
+        (available, sharing a skill); the rows scored are those passing the
+        engine's experience and job type pre-filters.
+
+        Args:
+            job: The job
+            feature_order: Column order of the feature matrix
+            exclude: IDs of seekers to leave out (changed_ids)
+
+        Returns:
+            Tuple of (number of candidates, snapshot rows scored in pk order,
+            their float32 feature matrix)
+        """
+        job_side = _job_side(job)
+        seekers = self.seekers
+        scores = seekers.skills.match_scores(self.query_skill_ids(getattr(job, 'skills', None)), query_is_job=True)
+        candidate = (scores.overlap > 0) & (seekers.arrays['is_available'] > 0)
+        if len(exclude):
+            candidate &= ~np.isin(seekers.ids, exclude)
+        candidates = np.flatnonzero(candidate)
+
+        # The ML stage's experience and job type pre-filters (core.ai.ml_stage)
+        keep = meets_experience(seekers.arrays['experience_years'][candidates], job_side['min_experience'])
+        preferences, inverse = seekers.distinct('preferred_job_types', candidates)
+        if job_side['job_type']:
+            accepted = np.array([accepts_job_type(value, job_side['job_type']) for value in preferences], dtype=bool)
+            keep &= accepted[inverse]
+        rows = candidates[keep]
+
+        # Pairwise scores, evaluated once per distinct seeker value
+        educations, inverse = seekers.distinct('education', rows)
+        education = _per_value([
+            education_level_score(value, job_side['requirements']) if value and job_side['requirements'] else 0.0
+            for value in educations
+        ], inverse)
+        preferences, inverse = seekers.distinct('preferred_job_types', rows)
+        job_type_scores = _per_value([job_type_match(value, job_side['job_type']) for value in preferences], inverse)
+        # Location and relocation combined into one code per seeker
+        location_codes = seekers.arrays['location'][rows].astype(np.int64) * 2 + seekers.arrays['willing_to_relocate'][rows]
+        codes, inverse = np.unique(location_codes, return_inverse=True)
+        location_scores = _per_value([
+            enhanced_location_match(
+                seekers.tables['location'][code // 2], job_side['location'], bool(code % 2), job_place=job_side['location_place'],
+            )
+            for code in codes
+        ], inverse.reshape(-1))
+
+        X = assemble_feature_matrix(
+            len(rows),
+            SkillMatchScores(*(values[rows] for values in scores)),
+            {'education_match': education, 'preferred_job_type_match': job_type_scores, 'location_match': location_scores},
+            lambda key: seekers.arrays[key][rows],
+            lambda key: np.array([job_side[key]], dtype=np.float64),
+            feature_order,
+        )
+        return len(candidates), rows, X
+
+
+def _per_value(scores, inverse):
+    """Scores of the distinct values, spread back onto the rows."""
+    return np.array(scores, dtype=np.float64)[inverse]
+
+
+class SnapshotStore:
+    """
+    Process-wide handle on the snapshot in use. The CURRENT pointer is re-read
+    at most every RECOMMENDATION_MODEL_CHECK_INTERVAL seconds; a new snapshot
+    is opened next to the old one and swapped in atomically.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        # gunicorn forks the workers after the master opened the snapshot
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_lock)
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+    def get(self):
+        """The open MatchingSnapshot, or None when none was built."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return self._snapshot
+
+        with self._lock:
+            if now < self._next_check:
+                return self._snapshot
+            self._next_check = now + float(getattr(settings, 'RECOMMENDATION_MODEL_CHECK_INTERVAL', 5.0))
+            try:
+                root = snapshot_dir()
+                name = current_name(root)
+                if name is None:
+                    self._snapshot = None
+                elif self._snapshot is None or self._snapshot.name != name:
+                    self._snapshot = MatchingSnapshot(os.path.join(root, name))
+                    logger.info("Opened matching snapshot %s (%d jobs, %d seekers)",
+                                name, len(self._snapshot.jobs), len(self._snapshot.seekers))
+            except Exception as e:
+                # Keep serving the previous snapshot (if any) and retry later
+                logger.warning("Opening matching snapshot failed: %s", e)
+            return self._snapshot
+
+    def reload(self):
+        """Re-read the CURRENT pointer now."""
+        self._next_check = 0.0
+        return self.get()
+
+
+store = SnapshotStore()
+
+
+def current_snapshot(catalog):
+    """
+    The snapshot to read `catalog` ('jobs' or 'seekers') from
+
+    Returns:
+        Tuple of (MatchingSnapshot, sorted IDs of the rows changed since the
+        build, to read from the database instead), or (None, None) when no
+        snapshot was built or more than RECOMMENDATION_SNAPSHOT_MAX_CHANGED
+        rows changed since it was
+    """
+    snapshot = store.get()
+    if snapshot is None:
+        return None, None
+    if not snapshot.tracks_changes:
+        return (snapshot, []) if snapshot.is_current(catalog) else (None, None)
+    max_changed = snapshot_max_changed()
+    changed = snapshot.changed_ids(catalog, limit=max_changed + 1)
+    if len(changed) > max_changed:
+        return None, None
+    return snapshot, changed
+
+
+def _write_catalog(path, rows, side_of, catalog, skill_columns, extra_columns):
+    """
+    Write the columns of one catalog
+
+    Args:
+        path: Directory to write the .npy files to
+        rows: RowStream of the catalog's slim rows in pk order
+        side_of: _job_side or _seeker_side
+        catalog: 'jobs' or 'seekers'
+        skill_columns: Dict of canonical skill name -> column, extended in place
+        extra_columns: Dict of column name -> (dtype, callable of a slim row)
+
+    Returns:
+        Value tables of the interned columns
+    """
+    numeric = NUMERIC_COLUMNS[catalog]
+    interned = INTERNED_COLUMNS[catalog]
+    columns = {name: [] for name in ('ids', *numeric, *interned, *extra_columns)}
+    tables = {name: [] for name in interned}
+    table_ids = {name: {} for name in interned}
+    indptr, indices = [0], []
+
+    for chunk in rows:
+        for row in chunk:
+            side = side_of(row)
+            columns['ids'].append(row.id)
+            for name in numeric:
+                columns[name].append(side[name])
+            for name in interned:
+                value = side[name]
+                key = json.dumps(value, sort_keys=True, default=str)
+                if key not in table_ids[name]:
+                    table_ids[name][key] = len(tables[name])
+                    tables[name].append(value)
+                columns[name].append(table_ids[name][key])
+            for name, (_, value_of) in extra_columns.items():
+                columns[name].append(value_of(row))
+            for sid in side['skill_ids']:
+                indices.append(skill_columns.setdefault(skill_name(sid), len(skill_columns)))
+            indices[indptr[-1]:] = sorted(indices[indptr[-1]:])
+            indptr.append(len(indices))
+
+    # scipy keeps the memory-mapped CSR arrays only if they share one index dtype
+    index_dtype = np.int32 if len(indices) < 2**31 else np.int64
+    arrays = {
+        'ids': np.array(columns['ids'], dtype=np.int64),
+        'skill_indptr': np.array(indptr, dtype=index_dtype),
+        'skill_indices': np.array(indices, dtype=index_dtype),
+        'skill_data': np.ones(len(indices), dtype=np.int8),
+        'skill_row_sizes': np.diff(np.array(indptr, dtype=np.int64)).astype(np.int32),
+    }
+    arrays.update({name: np.array(columns[name], dtype=np.float64) for name in numeric})
+    arrays.update({name: np.array(columns[name], dtype=np.int32) for name in interned})
+    arrays.update({name: np.array(columns[name], dtype=dtype) for name, (dtype, _) in extra_columns.items()})
+
+    os.makedirs(path)
+    for name, array in arrays.items():
+        np.save(os.path.join(path, name + '.npy'), array)
+    return tables
+
+
+def build_snapshot(root=None):
+    """
+    Write a new snapshot of every job and seeker and make it the current one
+
+    Args:
+        root: Snapshot directory (RECOMMENDATION_SNAPSHOT_DIR by default)
+
+    Returns:
+        Dict with the snapshot's name, catalog versions and row counts
+    """
+    from authentication.models import JobSeekerProfile
+    from core.models import Job
+
+    root = root or snapshot_dir()
+    # Read the counters first: a change racing the build records a later
+    # catalog version, which only marks its row stale
+    catalog_versions = dict(zip(CATALOGS, get_versions(list(CATALOGS))))
+    built_at = timezone.now()
+    name = f"{built_at:%Y%m%d-%H%M%S-%f}-j{catalog_versions['jobs']}-s{catalog_versions['seekers']}"
+    path = os.path.join(root, name)
+    tmp_path = os.path.join(root, f'.{name}.tmp')
+    shutil.rmtree(tmp_path, ignore_errors=True)
+
+    skill_columns = {}
+    tables = {
+        'jobs': _write_catalog(
+            os.path.join(tmp_path, 'jobs'), RowStream(Job.objects.order_by('pk'), SlimJob), _job_side, 'jobs',
+            skill_columns, {'deadline': (np.int32, lambda job: job.application_deadline.toordinal())},
+        ),
+        'seekers': _write_catalog(
+            os.path.join(tmp_path, 'seekers'), RowStream(JobSeekerProfile.objects.order_by('pk'), SlimSeeker), _seeker_side, 'seekers',
+            skill_columns, {'willing_to_relocate': (np.bool_, lambda seeker: bool(seeker.willing_to_relocate))},
+        ),
+    }
+    meta = {
+        'name': name,
+        'built_at': built_at.isoformat(),
+        'catalog_versions': catalog_versions,
+        'tracks_changes': True,
+        'skills': list(skill_columns),
+        'tables': tables,
+    }
+    with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+    # Publish: rename the complete directory, then swap the pointer atomically
+    os.rename(tmp_path, path)
+    pointer = os.path.join(root, '.CURRENT.tmp')
+    with open(pointer, 'w') as f:
+        f.write(name)
+    os.replace(pointer, os.path.join(root, 'CURRENT'))
+
+    # Workers keep reading a removed snapshot through their open mappings
+    # until they pick up the new one
+    snapshots = sorted(entry for entry in os.listdir(root) if not entry.startswith('.') and entry != 'CURRENT')
+    for old in snapshots[:-KEEP_SNAPSHOTS]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+
+    snapshot = MatchingSnapshot(path)
+    return {
+        'name': name,
+        'catalog_versions': catalog_versions,
+        'jobs': len(snapshot.jobs),
+        'seekers': len(snapshot.seekers),
+        'skills': len(skill_columns),
+        'bytes': sum(array.nbytes for catalog in (snapshot.jobs, snapshot.seekers) for array in catalog.arrays.values()),
+    }
@@ -0,0 +1,164 @@
+"""
+Bounded-memory candidate streams for the recommendation engines.
+Candidate sets are read as slim rows holding only the columns the features
+and rule scores read (no descriptions, no company details), in chunks of
+RECOMMENDATION_STREAM_CHUNK_SIZE rows via values_list().iterator(). The
+engines score one chunk at a time into a top-k heap and load full model
+instances for the winners only, so peak memory does not grow with the tables.
+"""
+from itertools import islice
+
+from django.conf import settings
+
+# Default number of rows fetched and scored per chunk
+DEFAULT_STREAM_CHUNK_SIZE = 2000
+
+def stream_chunk_size():
+    """Rows fetched and scored per chunk (RECOMMENDATION_STREAM_CHUNK_SIZE)."""
+    return int(getattr(settings, 'RECOMMENDATION_STREAM_CHUNK_SIZE', DEFAULT_STREAM_CHUNK_SIZE))
+
+
+class SlimRow:
+    """
+    Read-only attribute view of one values_list() row. Subclasses list the
+    columns in `fields` (primary key first); fields left out are missing, so
+    the getattr() defaults of the feature adapters apply as for any object.
+    """
+
+    __slots__ = ()
+    fields = ()
+    # Fields read from another column than their own name (e.g. a feature store join)
+    lookups = {}
+
+    def __init__(self, values):
+        for name, value in zip(self.fields, values):
+            setattr(self, name, value)
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={self.id})"
+
+    @classmethod
+    def columns(cls):
+        """values_list() lookups of the fields."""
+        return [cls.lookups.get(name, name) for name in cls.fields]
+
+    @classmethod
+    def annotations(cls):
+        """Expressions of the fields computed by the query, by name."""
+        return {}
+
+    @classmethod
+    def values_list(cls, queryset):
+        """values_list() of the fields over a queryset of the model."""
+        return queryset.annotate(**cls.annotations()).values_list(*cls.columns())
+
+
+class SlimJob(SlimRow):
+    """Job columns read by the job and candidate recommendation features, with the job's feature store row."""
+
+    fields = (
+        'id', 'skills', 'requirements', 'location', 'job_type', 'salary_min', 'salary_max',
+        'experience_level', 'next_step', 'application_deadline', 'feature_education', 'feature_skill_bits',
+        'feature_location_place',
+    )
+    lookups = {
+        'feature_education': 'features__education',
+        'feature_skill_bits': 'features__skill_bits',
+        'feature_location_place': 'features__location_place',
+    }
+    __slots__ = fields
+
+
+class SlimSeeker(SlimRow):
+    """JobSeekerProfile columns read by the recommendation features, with the seeker's feature store row."""
+
+    fields = (
+        'id', 'skills', 'education', 'experience', 'preferred_job_types', 'salary_expectation',
+        'location', 'willing_to_relocate', 'is_available',
+        'feature_experience_years', 'feature_experience_year', 'feature_education', 'feature_average_rating',
+        'feature_skill_bits', 'feature_location_place', 'rating_average',
+    )
+    lookups = {
+        'feature_experience_years': 'features__experience_years',
+        'feature_experience_year': 'features__experience_year',
+        'feature_education': 'features__education',
+        'feature_average_rating': 'features__average_rating',
+        'feature_skill_bits': 'features__skill_bits',
+        'feature_location_place': 'features__location_place',
+    }
+    __slots__ = fields
+
+    @classmethod
+    def annotations(cls):
+        from django.db.models import Avg, Case, OuterRef, Subquery, When
+        from core.models import FeedbackRating
+
+        # Average rating of the seekers without a feature store row, in the same query
+        ratings = FeedbackRating.objects.filter(profile=OuterRef('pk')).values('profile').annotate(average=Avg('rating'))
+        return {
+            'rating_average': Case(When(features__isnull=True, then=Subquery(ratings.values('average')))),
+        }
+
+    @property
+    def average_rating(self):
+        if self.feature_experience_year is not None:
+            # The seeker has a feature store row
+            return self.feature_average_rating
+        if self.rating_average is None:
+            return None
+        # Same rounding as JobSeekerProfile.average_rating
+        return min(round(self.rating_average, 2), 5.0)
+
+
+class RowStream:
+    """
+    Re-iterable stream of a queryset as chunks (lists) of slim rows. Every
+    iteration runs the query again, so a fallback engine can take a second
+    pass without the first one having been kept in memory.
+
+    Args:
+        queryset: Candidate queryset (ordered, e.g. by pk)
+        row_class: SlimRow subclass the rows are read as
+        chunk_size: Rows per chunk (and per database fetch)
+    """
+
+    def __init__(self, queryset, row_class, chunk_size=None):
+        self.queryset = queryset
+        self.row_class = row_class
+        self.chunk_size = chunk_size or stream_chunk_size()
+
+    def __iter__(self):
+        rows = (
+            self.row_class(values)
+            for values in self.row_class.values_list(self.queryset).iterator(chunk_size=self.chunk_size)
+        )
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def load_instances(recommendations, queryset):
+    """
+    Swap the slim rows of the winning records for full model instances
+
+    Args:
+        recommendations: Recommendation records (core.ai.results) holding slim rows
+        queryset: Queryset of the model to load from (e.g. Job.objects)
+
+    Returns:
+        The records, in order, minus any whose object was deleted meanwhile
+    """
+    instances = queryset.in_bulk([recommendation.id for recommendation in recommendations])
+    loaded = []
+    for recommendation in recommendations:
+        instance = instances.get(recommendation.id)
+        if instance is not None:
+            recommendation.obj = instance
+            loaded.append(recommendation)
+    return loaded
@@ -0,0 +1,579 @@
+"""
+TF-IDF index of job descriptions.
+`manage.py build_text_index` hashes the title and description of every job
+with a stateless HashingVectorizer (no vocabulary to keep in sync), weights
+the terms by sublinear tf x idf and stores the L2-normalized rows as .npy
+files in column-major (CSC) segments. Workers memory-map the segments, so
+the index is shared through the page cache like the matching snapshot
+(core.ai.snapshot).
+
+A query only reads the columns of its own terms: its cosine similarity with
+every indexed job is the sum of those columns weighted by the query's tf-idf,
+so the cost follows the postings of the query's terms, not the catalog size.
+The same similarities give the seeker experience / job description score
+the job engine can add to its ranking (RECOMMENDATION_TEXT_WEIGHT) and the
+ranking of /api/jobs/search/.
+
+The idf weights are fixed when the index is built. `build_text_index
+--append` adds the jobs posted since as one more segment, weighted with the
+stored idf; the full build (e.g. nightly) recomputes the idf, picks up edited
+descriptions and merges the segments.
+
+Layout of RECOMMENDATION_TEXT_INDEX_DIR:
+    CURRENT                         name of the index in use
+    <name>/meta.json                build parameters, document count and segment list
+    <name>/idf.npy                  idf weight of every hashed term
+    <name>/segments/<n>/*.npy       CSC arrays, terms and job IDs of one segment, rows in pk order
+"""
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from django.conf import settings
+from django.utils import timezone
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from core.ai.topk import top_k_indices
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEXT_INDEX_DIR = os.path.join(settings.BASE_DIR, 'text_index')
+
+# Hashed term space: collisions stay rare for job-posting vocabularies
+TEXT_INDEX_FEATURES = 2**20
+
+# Rows per segment of a full build; bounds the memory of the CSC conversion
+SEGMENT_ROWS = 50000
+
+# Indexes kept on disk: the current one and the one workers may still have open
+KEEP_INDEXES = 2
+
+# Fields of a seeker's experience entries holding free text
+EXPERIENCE_TEXT_FIELDS = ('title', 'position', 'role', 'company', 'description', 'responsibilities', 'achievements')
+
+_vectorizer = HashingVectorizer(
+    n_features=TEXT_INDEX_FEATURES, alternate_sign=False, norm=None, stop_words='english', dtype=np.float32,
+)
+
+def text_index_dir():
+    return str(getattr(settings, 'RECOMMENDATION_TEXT_INDEX_DIR', DEFAULT_TEXT_INDEX_DIR))
+
+def current_name(root=None):
+    """Name of the text index in use, or None before the first build."""
+    try:
+        with open(os.path.join(root or text_index_dir(), 'CURRENT')) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def job_text(title, description):
+    """Indexed text of a job."""
+    return f"{title or ''}\n{description or ''}"
+
+def seeker_experience_text(experience):
+    """
+    Free text of a seeker's experience entries
+
+    Args:
+        experience: JobSeekerProfile.experience (list of dicts)
+
+    Returns:
+        The text fields of every entry, one per line ('' without any)
+    """
+    parts = []
+    for entry in experience or []:
+        if isinstance(entry, dict):
+            parts.extend(str(entry[field]) for field in EXPERIENCE_TEXT_FIELDS if entry.get(field))
+        elif isinstance(entry, str):
+            parts.append(entry)
+    return "\n".join(parts)
+
+def term_frequencies(texts):
+    """Sublinear term frequencies (1 + log tf) of texts, as a CSR matrix over the hashed terms."""
+    tf = _vectorizer.transform(texts)
+    np.log(tf.data, out=tf.data)
+    tf.data += 1
+    return tf
+
+def _tfidf_rows(texts, idf):
+    """L2-normalized tf-idf rows of texts (CSR)."""
+    rows = term_frequencies(texts)
+    rows.data *= idf[rows.indices]
+    norms = np.sqrt(np.asarray(rows.multiply(rows).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    rows.data /= np.repeat(norms, np.diff(rows.indptr)).astype(np.float32)
+    return rows
+
+
+class TextSegment:
+    """
+    Memory-mapped CSC tf-idf rows of a run of jobs. Only the columns of the
+    terms occurring in the segment are stored, so a small appended segment
+    stays small.
+
+    Args:
+        path: Directory of the segment's .npy files
+    """
+
+    def __init__(self, path):
+        self.name = os.path.basename(path)
+        self.ids = np.load(os.path.join(path, 'ids.npy'), mmap_mode='r')
+        self.terms = np.load(os.path.join(path, 'terms.npy'), mmap_mode='r')
+        self.indptr = np.load(os.path.join(path, 'indptr.npy'), mmap_mode='r')
+        self.indices = np.load(os.path.join(path, 'indices.npy'), mmap_mode='r')
+        self.data = np.load(os.path.join(path, 'data.npy'), mmap_mode='r')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def dot(self, terms, weights):
+        """Dot product of every row with a sparse query vector (only its columns are read)."""
+        columns = np.minimum(np.searchsorted(self.terms, terms), max(len(self.terms) - 1, 0))
+        present = self.terms[columns] == terms if len(self.terms) else np.zeros(len(terms), dtype=bool)
+        columns, weights = columns[present], weights[present]
+        starts = np.asarray(self.indptr[columns], dtype=np.int64)
+        lengths = np.asarray(self.indptr[columns + 1], dtype=np.int64) - starts
+        total = int(lengths.sum())
+        if not total:
+            return np.zeros(len(self), dtype=np.float64)
+        # Positions of every stored entry of the query's columns, column after column
+        positions = np.arange(total, dtype=np.int64) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return np.bincount(
+            self.indices[positions], weights=self.data[positions] * np.repeat(weights, lengths), minlength=len(self),
+        )
+
+    def row(self, position):
+        """
+        Stored entries of one row
+
+        Returns:
+            Tuple of (term indices, weights) NumPy arrays
+        """
+        entries = np.flatnonzero(np.asarray(self.indices) == position)
+        # The stored columns are non-empty, so indptr is strictly increasing
+        columns = np.searchsorted(self.indptr, entries, side='right') - 1
+        return np.asarray(self.terms[columns], dtype=np.int64), np.asarray(self.data[entries], dtype=np.float64)
+
+    @staticmethod
+    def write(path, job_ids, rows):
+        """Write tf-idf rows (CSR, one per job of job_ids) as a segment."""
+        columns = sp.csc_matrix(rows)
+        columns.sort_indices()
+        # Drop the empty columns: terms.npy lists the hashed terms of the stored ones
+        terms = np.flatnonzero(np.diff(columns.indptr))
+        indptr = np.concatenate([[0], np.cumsum(np.diff(columns.indptr)[terms])])
+        os.makedirs(path)
+        np.save(os.path.join(path, 'ids.npy'), np.asarray(job_ids, dtype=np.int64))
+        np.save(os.path.join(path, 'terms.npy'), terms.astype(np.int32))
+        np.save(os.path.join(path, 'indptr.npy'), indptr.astype(np.int64))
+        np.save(os.path.join(path, 'indices.npy'), columns.indices.astype(np.int32))
+        np.save(os.path.join(path, 'data.npy'), columns.data.astype(np.float32))
+
+
+class TextIndex:
+    """
+    An opened text index: its idf weights and segments
+
+    Args:
+        path: Directory of the index
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.name = self.meta['name']
+        self.idf = np.load(os.path.join(path, 'idf.npy'), mmap_mode='r')
+        self.segments = [TextSegment(os.path.join(path, 'segments', name)) for name in self.meta['segments']]
+        # Job IDs of every row; segments hold increasing IDs, so this is sorted
+        self.ids = np.concatenate([np.asarray(segment.ids) for segment in self.segments] or [np.zeros(0, dtype=np.int64)])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def query_vector(self, text):
+        """
+        L2-normalized tf-idf vector of a query text
+
+        Returns:
+            Tuple of (term indices, weights) NumPy arrays (empty for a text without terms)
+        """
+        query = _tfidf_rows([text], self.idf)
+        return query.indices.astype(np.int64), query.data.astype(np.float64)
+
+    def similarities(self, text):
+        """
+        Cosine similarity of a text with every indexed job, in one pass per segment
+
+        Returns:
+            float64 NumPy array aligned with self.ids
+        """
+        terms, weights = self.query_vector(text)
+        if not len(terms) or not self.segments:
+            return np.zeros(len(self), dtype=np.float64)
+        return np.concatenate([segment.dot(terms, weights) for segment in self.segments])
+
+    def job_vector(self, job_id):
+        """
+        Indexed tf-idf vector of a job
+
+        Returns:
+            Tuple of (term indices, weights) NumPy arrays, or None when the
+            job is not in the index
+        """
+        for segment in self.segments:
+            position = int(np.searchsorted(segment.ids, job_id))
+            if position < len(segment) and segment.ids[position] == job_id:
+                return segment.row(position)
+        return None
+
+    def text_similarities(self, texts, terms, weights):
+        """
+        Cosine similarity of many texts with one vector (e.g. job_vector()),
+        in one sparse product
+
+        Returns:
+            float64 NumPy array aligned with texts
+        """
+        if not len(texts) or not len(terms):
+            return np.zeros(len(texts), dtype=np.float64)
+        vector = sp.csr_matrix((weights, (terms, np.zeros(len(terms), dtype=np.int64))), shape=(TEXT_INDEX_FEATURES, 1))
+        return np.asarray(_tfidf_rows(texts, self.idf).astype(np.float64) @ vector.toarray()).ravel()
+
+    def similarity_of(self, similarities, job_ids):
+        """
+        Similarities of given jobs
+
+        Args:
+            similarities: Result of similarities()
+            job_ids: Job IDs
+
+        Returns:
+            float64 NumPy array, 0.0 for jobs not in the index
+        """
+        job_ids = np.asarray(job_ids, dtype=np.int64)
+        if not len(self):
+            return np.zeros(len(job_ids), dtype=np.float64)
+        positions = np.minimum(np.searchsorted(self.ids, job_ids), len(self) - 1)
+        return np.where(self.ids[positions] == job_ids, similarities[positions], 0.0)
+
+
+class TextIndexStore:
+    """
+    Process-wide handle on the text index in use. The CURRENT pointer and the
+    index's meta.json (rewritten by appends) are re-checked at most every
+    RECOMMENDATION_MODEL_CHECK_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self._index = None
+        self._key = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        # gunicorn forks the workers after the master opened the index
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_lock)
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+    def get(self):
+        """The open TextIndex, or None when none was built."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return self._index
+
+        with self._lock:
+            if now < self._next_check:
+                return self._index
+            self._next_check = now + float(getattr(settings, 'RECOMMENDATION_MODEL_CHECK_INTERVAL', 5.0))
+            try:
+                root = text_index_dir()
+                name = current_name(root)
+                if name is None:
+                    self._index, self._key = None, None
+                    return None
+                key = (name, os.stat(os.path.join(root, name, 'meta.json')).st_mtime_ns)
+                if key != self._key:
+                    self._index = TextIndex(os.path.join(root, name))
+                    self._key = key
+                    logger.info("Opened text index %s (%d jobs, %d segments)", name, len(self._index), len(self._index.segments))
+            except Exception as e:
+                # Keep serving the previous index (if any) and retry later
+                logger.warning("Opening text index failed: %s", e)
+            return self._index
+
+    def reload(self):
+        """Re-read the CURRENT pointer and the index's segment list now."""
+        self._next_check = 0.0
+        return self.get()
+
+
+store = TextIndexStore()
+
+
+def _job_documents(min_id=None, batch_size=2000):
+    """(job ID, text) of every job (with a pk above min_id), in pk order."""
+    from core.models import Job
+
+    jobs = Job.objects.order_by('pk')
+    if min_id is not None:
+        jobs = jobs.filter(pk__gt=min_id)
+    for job_id, title, description in jobs.values_list('id', 'title', 'description').iterator(chunk_size=batch_size):
+        yield job_id, job_text(title, description)
+
+def _batches(documents, size):
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _write_segments(segments_path, first, documents, idf, batch_size):
+    """
+    Write documents as segments of at most SEGMENT_ROWS rows
+
+    Returns:
+        Tuple of (segment names, rows written, largest job ID or None)
+    """
+    names, written, max_id = [], 0, None
+    for segment in _batches(documents, SEGMENT_ROWS):
+        name = f'{first + len(names):06d}'
+        rows = [_tfidf_rows([text for _, text in batch], idf) for batch in _batches(segment, batch_size)]
+        TextSegment.write(os.path.join(segments_path, name), [job_id for job_id, _ in segment], sp.vstack(rows, format='csr'))
+        names.append(name)
+        written += len(segment)
+        max_id = segment[-1][0]
+    return names, written, max_id
+
+def _write_meta(path, meta):
+    tmp = os.path.join(path, '.meta.json.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(path, 'meta.json'))
+
+
+class _BuildLock:
+    """Serializes builds and appends of one index directory (cron runs may overlap)."""
+
+    def __init__(self, root):
+        os.makedirs(root, exist_ok=True)
+        self.path = os.path.join(root, '.lock')
+
+    def __enter__(self):
+        self.file = open(self.path, 'w')
+        fcntl.flock(self.file, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+
+def build_text_index(root=None, documents=None, batch_size=2000):
+    """
+    Write a new text index of every job and make it the current one
+
+    Args:
+        root: Index directory (RECOMMENDATION_TEXT_INDEX_DIR by default)
+        documents: Callable returning the (job ID, text) pairs to index in
+            increasing ID order; called twice (document frequencies, then
+            rows). Defaults to the title and description of every job.
+        batch_size: Documents vectorized at a time
+
+    Returns:
+        Dict with the index's name, document and segment counts and size
+    """
+    root = root or text_index_dir()
+    documents = documents or (lambda: _job_documents(batch_size=batch_size))
+    with _BuildLock(root):
+        built_at = timezone.now()
+        name = f"{built_at:%Y%m%d-%H%M%S-%f}"
+        path = os.path.join(root, name)
+        tmp_path = os.path.join(root, f'.{name}.tmp')
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+        # First pass: document frequency of every hashed term (entries of a hashed row are distinct terms)
+        document_frequency = np.zeros(TEXT_INDEX_FEATURES, dtype=np.int64)
+        count = 0
+        for batch in _batches(documents(), batch_size):
+            tf = term_frequencies([text for _, text in batch])
+            document_frequency += np.bincount(tf.indices, minlength=TEXT_INDEX_FEATURES)
+            count += len(batch)
+        # Smoothed idf, as sklearn's TfidfTransformer
+        idf = (np.log((1 + count) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        # Second pass: the weighted rows
+        os.makedirs(os.path.join(tmp_path, 'segments'))
+        np.save(os.path.join(tmp_path, 'idf.npy'), idf)
+        segments, written, max_id = _write_segments(os.path.join(tmp_path, 'segments'), 0, documents(), idf, batch_size)
+        meta = {
+            'name': name,
+            'built_at': built_at.isoformat(),
+            'n_features': TEXT_INDEX_FEATURES,
+            'idf_documents': count,
+            'documents': written,
+            'max_job_id': max_id,
+            'segments': segments,
+        }
+        _write_meta(tmp_path, meta)
+
+        # Publish: rename the complete directory, then swap the pointer atomically
+        os.rename(tmp_path, path)
+        pointer = os.path.join(root, '.CURRENT.tmp')
+        with open(pointer, 'w') as f:
+            f.write(name)
+        os.replace(pointer, os.path.join(root, 'CURRENT'))
+
+        # Workers keep reading a removed index through their open mappings
+        # until they pick up the new one
+        indexes = sorted(entry for entry in os.listdir(root) if not entry.startswith('.') and entry != 'CURRENT')
+        for old in indexes[:-KEEP_INDEXES]:
+            shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return _summary(path)
+
+def append_text_index(root=None, documents=None, batch_size=2000):
+    """
+    Add the jobs posted since the last build or append to the current text
+    index as a new segment, weighted with its stored idf (a full build when
+    there is no index yet)
+
+    Args:
+        root: Index directory (RECOMMENDATION_TEXT_INDEX_DIR by default)
+        documents: Callable of the largest indexed job ID (or None) returning
+            the (job ID, text) pairs of the newer jobs in increasing ID order.
+            Defaults to the title and description of the jobs with a larger pk.
+        batch_size: Documents vectorized at a time
+
+    Returns:
+        Dict with the index's name, document and segment counts and size,
+        and the number of jobs appended
+    """
+    root = root or text_index_dir()
+    documents = documents or (lambda min_id: _job_documents(min_id, batch_size))
+    with _BuildLock(root):
+        name = current_name(root)
+        if name is not None:
+            path = os.path.join(root, name)
+            with open(os.path.join(path, 'meta.json')) as f:
+                meta = json.load(f)
+            idf = np.load(os.path.join(path, 'idf.npy'))
+            segments, written, max_id = _write_segments(
+                os.path.join(path, 'segments'), len(meta['segments']), documents(meta['max_job_id']), idf, batch_size,
+            )
+            if segments:
+                # Workers see the new segments once meta.json lists them
+                meta.update({
+                    'documents': meta['documents'] + written,
+                    'max_job_id': max_id,
+                    'segments': meta['segments'] + segments,
+                })
+                _write_meta(path, meta)
+            return dict(_summary(path), appended=written)
+    built = build_text_index(root, lambda: documents(None), batch_size)
+    return dict(built, appended=built['documents'])
+
+def _summary(path):
+    index = TextIndex(path)
+    return {
+        'name': index.name,
+        'documents': len(index),
+        'segments': len(index.segments),
+        'bytes': sum(
+            array.nbytes for segment in index.segments
+            for array in (segment.ids, segment.terms, segment.indptr, segment.indices, segment.data)
+        ),
+    }
+
+def seeker_text_scorer(seeker, weight=None):
+    """
+    Description similarity term of a seeker's job ranking
+
+    Args:
+        seeker: JobSeekerProfile
+        weight: Weight of the cosine similarity (RECOMMENDATION_TEXT_WEIGHT by default)
+
+    Returns:
+        Callable of job IDs returning `weight` x the cosine similarity of the
+        seeker's experience text with each job's description (0.0 for jobs
+        not indexed yet), or None when the weight is 0, no index was built or
+        the seeker's experience holds no text
+    """
+    weight = float(getattr(settings, 'RECOMMENDATION_TEXT_WEIGHT', 0.0) if weight is None else weight)
+    if not weight:
+        return None
+    index = store.get()
+    text = seeker_experience_text(getattr(seeker, 'experience', None))
+    if index is None or not text.strip():
+        return None
+    # One pass over the experience terms' columns scores every indexed job
+    similarities = index.similarities(text)
+    return lambda job_ids: weight * index.similarity_of(similarities, job_ids)
+
+def job_text_scorer(job_id, weight=None):
+    """
+    seeker_text_scorer's term of one job, for many seekers at once
+
+    Args:
+        job_id: Job ID
+        weight: Weight of the cosine similarity (RECOMMENDATION_TEXT_WEIGHT by default)
+
+    Returns:
+        Callable of seekers returning `weight` x the cosine similarity of
+        each seeker's experience text with the job's indexed description (0.0
+        for seekers without experience text), or None when the weight is 0,
+        no index was built or the job is not indexed yet
+    """
+    weight = float(getattr(settings, 'RECOMMENDATION_TEXT_WEIGHT', 0.0) if weight is None else weight)
+    if not weight:
+        return None
+    index = store.get()
+    vector = index.job_vector(job_id) if index is not None else None
+    if vector is None:
+        return None
+    return lambda seekers: weight * index.text_similarities(
+        [seeker_experience_text(getattr(seeker, 'experience', None)) for seeker in seekers], *vector,
+    )
+
+def search_jobs(query, limit=20):
+    """
+    Open jobs whose description is most similar to a query text
+
+    Args:
+        query: Search text
+        limit: Maximum number of jobs to return
+
+    Returns:
+        List of (Job, cosine similarity) tuples, most similar first, or None
+        when no text index was built
+    """
+    from core.models import Job
+
+    index = store.get()
+    if index is None:
+        return None
+    similarities = index.similarities(query)
+    matching = int(np.count_nonzero(similarities > 0))
+    today = timezone.now().date()
+    results = []
+    # Closed and deleted jobs are still indexed: take the best rows in
+    # growing pages until `limit` open jobs are found
+    seen = 0
+    k = limit * 4
+    while len(results) < limit and seen < matching:
+        rows = top_k_indices(similarities, min(k, matching))[seen:]
+        seen += len(rows)
+        k *= 4
+        job_ids = [int(job_id) for job_id in index.ids[rows]]
+        jobs = Job.objects.filter(pk__in=job_ids, application_deadline__gte=today).in_bulk()
+        results.extend(
+            (jobs[job_id], float(similarities[row])) for row, job_id in zip(rows, job_ids) if job_id in jobs
+        )
+    return results[:limit]
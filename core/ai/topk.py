@@ -0,0 +1,85 @@
+"""
+Partial top-k selection for the recommendation engines.
+Both helpers return exactly what a stable descending sort followed by [:k]
+would: the k highest scores, ties kept in input order.
+- top_k_indices() selects from a whole score array (ML stage).
+- TopK is a bounded heap filled one candidate at a time (rule-based stage);
+  its can_enter() lets a scorer skip candidates whose upper bound cannot
+  enter. Ties are broken by an explicit input position, so candidates may be
+  pushed in any order (e.g. most promising first).
+"""
+import heapq
+
+import numpy as np
+
+# Slack for float rounding between an upper bound and the score summed in another order
+BOUND_EPSILON = 1e-9
+
+
+def top_k_indices(scores, k):
+    """
+    Indices of the k highest scores, best first, ties in index order
+
+    Args:
+        scores: 1-D array of scores
+        k: Number of indices to return
+
+    Returns:
+        NumPy array of at most k indices
+    """
+    scores = np.asarray(scores)
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.zeros(0, dtype=np.intp)
+    if k < n:
+        # Everything tied with the k-th largest score competes for the last places
+        kth = np.partition(scores, n - k)[n - k]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(-scores[candidates], kind='stable')][:k]
+
+
+class TopK:
+    """
+    Bounded min-heap of the k best (score, item) pairs pushed so far.
+    Among equal scores the lower input position wins, as in a stable sort.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []
+
+    def __len__(self):
+        return len(self._heap)
+
+    def floor(self):
+        """Score a new item has to beat to enter (-inf while the heap is not full)."""
+        if len(self._heap) < self.k:
+            return float('-inf')
+        return self._heap[0][0]
+
+    def can_enter(self, upper_bound):
+        """Whether an item whose score is at most `upper_bound` could still enter."""
+        return self.k > 0 and upper_bound + BOUND_EPSILON > self.floor()
+
+    def push(self, score, position, item):
+        """
+        Offer an item
+
+        Args:
+            score: Its score
+            position: Its position in the input (unique), breaking ties
+            item: Anything; never compared
+        """
+        if self.k <= 0:
+            return
+        entry = (score, -position, item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self):
+        """The kept (score, item) pairs, best first."""
+        return [(score, item) for score, _, item in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
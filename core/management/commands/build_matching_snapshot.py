@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from core.ai.snapshot import CATALOGS, build_snapshot, store
+
+class Command(BaseCommand):
+    help = (
+        'Write the memory-mapped matching snapshot of every job and seeker read by the recommendation '
+        'engines of all workers (RECOMMENDATION_SNAPSHOT_DIR).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--if-changed', action='store_true', help='Only rebuild when a job or profile changed since the current snapshot')
+
+    def handle(self, *args, **options):
+        if options['if_changed']:
+            snapshot = store.reload()
+            if snapshot is not None and all(snapshot.is_current(catalog) for catalog in CATALOGS):
+                self.stdout.write(f'Snapshot {snapshot.name} is current.')
+                return
+
+        built = build_snapshot()
+        self.stdout.write(self.style.SUCCESS(
+            f"Built snapshot {built['name']}: {built['jobs']} jobs, {built['seekers']} seekers, "
+            f"{built['skills']} skills, {built['bytes'] / 2**20:.1f} MiB."
+        ))
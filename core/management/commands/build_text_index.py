@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from core.ai.text_index import append_text_index, build_text_index
+
+class Command(BaseCommand):
+    help = (
+        'Write the memory-mapped TF-IDF index of job titles and descriptions used by job search and the '
+        'description similarity of job recommendations (RECOMMENDATION_TEXT_INDEX_DIR).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--append', action='store_true', help='Only add the jobs posted since the last build or append, with the stored idf weights')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Job descriptions vectorized at a time')
+
+    def handle(self, *args, **options):
+        if options['append']:
+            built = append_text_index(batch_size=options['batch_size'])
+            action = f"Appended {built['appended']} jobs to"
+        else:
+            built = build_text_index(batch_size=options['batch_size'])
+            action = 'Built'
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} text index {built['name']}: {built['documents']} jobs in {built['segments']} segments, "
+            f"{built['bytes'] / 2**20:.1f} MiB."
+        ))
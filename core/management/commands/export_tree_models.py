@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.ai.model_registry import MODELS_DIR, MODEL_FILES, load_catboost_model
+from core.ai.oblivious_trees import ObliviousTrees, export_catboost_model
+
+# Training data each model is checked against after export
+TRAINING_DATA = {
+    'job': 'job_recommendation_training.csv',
+    'candidate': 'candidate_recommendation_training.csv',
+}
+
+class Command(BaseCommand):
+    help = 'Export the CatBoost recommendation models to .npz for the NumPy backend and check parity on the training data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-check', action='store_true', help='Skip the parity check against CatBoost')
+        parser.add_argument('--tolerance', type=float, default=1e-9, help='Largest allowed probability difference')
+
+    def handle(self, *args, **options):
+        data_dir = os.path.join(settings.BASE_DIR, 'ml_training', 'data')
+        for name, stem in MODEL_FILES.items():
+            cbm_path = os.path.join(MODELS_DIR, stem + '.cbm')
+            # Write next to the target and rename, so a running registry never reads a partial file
+            tmp_path = os.path.join(MODELS_DIR, stem + '.tmp.npz')
+            export_catboost_model(cbm_path, tmp_path)
+            trees = ObliviousTrees.load(tmp_path)
+
+            if not options['no_check']:
+                X = pd.read_csv(os.path.join(data_dir, TRAINING_DATA[name]))[trees.feature_names].to_numpy()
+                expected = load_catboost_model(cbm_path).predict_proba(X)[:, 1]
+                diff = float(np.abs(trees.predict_proba(X)[:, 1] - expected).max())
+                if diff > options['tolerance']:
+                    os.remove(tmp_path)
+                    raise CommandError(f'{name}: NumPy and CatBoost predictions differ by up to {diff:.3g}')
+                self.stdout.write(f'{name}: {len(X)} training rows match CatBoost (max difference {diff:.3g})')
+
+            os.replace(tmp_path, os.path.join(MODELS_DIR, stem + '.npz'))
+            self.stdout.write(self.style.SUCCESS(
+                f'Exported {name} model: {trees.tree_count} trees of depth {trees.split_borders.shape[1]}'
+            ))
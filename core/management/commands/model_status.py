@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from core.ai.model_registry import registry
+
+class Command(BaseCommand):
+    help = 'Load the recommendation models and report their version, checksum, load time and memory.'
+
+    def handle(self, *args, **options):
+        for loaded in registry.warm():
+            info = loaded.as_dict()
+            memory = f"{info['memory_bytes'] / 2**20:.1f} MiB" if info['memory_bytes'] is not None else 'n/a'
+            self.stdout.write(
+                f"{info['name']:<10} version {info['version']}  sha256 {info['checksum']}\n"
+                f"{'':<10} {info['path']} ({info['file_bytes'] / 2**20:.1f} MiB on disk)\n"
+                f"{'':<10} loaded in {info['load_seconds'] * 1000:.1f} ms, {memory} resident"
+            )
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from core.ai.batch_scoring import run_precompute, start_run
+
+class Command(BaseCommand):
+    help = (
+        'Materialize the job recommendations of every job seeker (SeekerRecommendation): seekers are '
+        'sharded by ID range over worker processes, one model call and one bulk write per shard.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Seekers per shard (one model call and one bulk write each)')
+        parser.add_argument('--workers', type=int, default=1, help='Worker processes (e.g. the number of cores)')
+        parser.add_argument('--stale-only', action='store_true', help='Skip seekers whose stored recommendations are still fresh')
+        parser.add_argument('--resume', action='store_true', help='Continue the last interrupted run instead of starting over')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        run, resumed = start_run(stale_only=options['stale_only'], resume=options['resume'])
+        if resumed:
+            self.stdout.write(f'Resuming run {run.pk} started at {run.started_at:%Y-%m-%d %H:%M:%S} ({run.written} seekers written).')
+
+        def progress(finished, shards, written):
+            self.stdout.write(f'Shard {finished}/{shards} done, {written} seekers written.')
+
+        written = run_precompute(run, workers=options['workers'], chunk_size=options['chunk_size'], progress=progress)
+        self.stdout.write(self.style.SUCCESS(
+            f'Materialized recommendations of {written} seekers in {time.perf_counter() - start:.1f}s '
+            f'with {options["workers"]} worker(s).'
+        ))
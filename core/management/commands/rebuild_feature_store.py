@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from core.ai.feature_store import rebuild_feature_store
+
+class Command(BaseCommand):
+    help = 'Recompute the recommendation feature store (JobFeatures, SeekerFeatures) of every job and seeker.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows written per bulk insert')
+
+    def handle(self, *args, **options):
+        jobs, seekers = rebuild_feature_store(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Stored features of {jobs} jobs and {seekers} seekers.'))
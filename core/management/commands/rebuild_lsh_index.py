@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from core.ai.lsh_index import lsh_banding, rebuild_lsh_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the MinHash LSH buckets of every job and seeker (needed after changing RECOMMENDATION_LSH_BANDS/ROWS).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Buckets written per bulk insert')
+
+    def handle(self, *args, **options):
+        job_buckets, seeker_buckets = rebuild_lsh_index(batch_size=options['batch_size'])
+        bands, rows = lsh_banding()
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {job_buckets} job buckets and {seeker_buckets} seeker buckets '
+            f'({bands} bands x {rows} rows).'
+        ))
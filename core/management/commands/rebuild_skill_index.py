@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from core.ai.skill_index import rebuild_job_skill_index, rebuild_seeker_skill_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the inverted skill -> job and skill -> seeker indexes used for recommendation candidate generation.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Postings written per bulk insert')
+
+    def handle(self, *args, **options):
+        job_postings = rebuild_job_skill_index(batch_size=options['batch_size'])
+        seeker_postings = rebuild_seeker_skill_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {job_postings} job skill postings and {seeker_postings} seeker skill postings.'
+        ))
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.3 on 2026-10-17 01:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from ml_training.enhanced_matching import canonical_skills
+
+
+def build_job_skill_index(apps, schema_editor):
+    Job = apps.get_model('core', 'Job')
+    JobSkill = apps.get_model('core', 'JobSkill')
+    postings = []
+    for job_id, skills, deadline in Job.objects.values_list('id', 'skills', 'application_deadline'):
+        for skill in dict.fromkeys(s[:255] for s in canonical_skills(skills or [])):
+            postings.append(JobSkill(skill=skill, job_id=job_id, application_deadline=deadline))
+    JobSkill.objects.bulk_create(postings, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_feedbackrating'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='application',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('INTERVIEW', 'Interview'), ('HIRED', 'Hired'), ('REJECTED', 'Rejected'), ('INVITED', 'Invited')], default='PENDING', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='JobSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=255)),
+                ('application_deadline', models.DateField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_postings', to='core.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['skill', 'application_deadline'], name='core_jobskill_active_idx')],
+                'unique_together': {('skill', 'job')},
+            },
+        ),
+        migrations.RunPython(build_job_skill_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.3 on 2026-10-17 01:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from ml_training.enhanced_matching import canonical_skills
+
+
+def build_seeker_skill_index(apps, schema_editor):
+    JobSeekerProfile = apps.get_model('authentication', 'JobSeekerProfile')
+    SeekerSkill = apps.get_model('core', 'SeekerSkill')
+    postings = []
+    for seeker_id, skills, is_available in JobSeekerProfile.objects.values_list('id', 'skills', 'is_available'):
+        for skill in dict.fromkeys(s[:255] for s in canonical_skills(skills or [])):
+            postings.append(SeekerSkill(skill=skill, seeker_id=seeker_id, is_available=is_available))
+    SeekerSkill.objects.bulk_create(postings, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0008_delete_seekerfeedback'),
+        ('core', '0006_jobskill'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeekerSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=255)),
+                ('is_available', models.BooleanField(default=True)),
+                ('seeker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_postings', to='authentication.jobseekerprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['skill', 'is_available'], name='core_seekerskill_avail_idx')],
+                'unique_together': {('skill', 'seeker')},
+            },
+        ),
+        migrations.RunPython(build_seeker_skill_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-17 02:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0008_delete_seekerfeedback'),
+        ('core', '0007_seekerskill'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeekerRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_ids', models.JSONField(default=list)),
+                ('scores', models.JSONField(default=list)),
+                ('engine', models.CharField(blank=True, max_length=20)),
+                ('selection', models.CharField(blank=True, max_length=20)),
+                ('model_version', models.CharField(blank=True, max_length=64)),
+                ('computed_at', models.DateTimeField()),
+                ('seeker', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='job_recommendations', to='authentication.jobseekerprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['computed_at'], name='core_seekerrec_computed_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-17 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_seekerrecommendation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seekerrecommendation',
+            name='dirty_since',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-17 02:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_seekerrecommendation_dirty_since'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-17 02:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0008_delete_seekerfeedback'),
+        ('core', '0010_recommendationversion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['application_deadline', 'job_type'], name='core_job_active_type_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2026-10-17 03:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_job_active_type_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrecomputeRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('model_version', models.CharField(max_length=64)),
+                ('stale_only', models.BooleanField(default=False)),
+                ('written', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-17 04:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0008_delete_seekerfeedback'),
+        ('core', '0012_precomputerun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobFeatures',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('education', models.JSONField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='features', to='core.job')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SeekerFeatures',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('experience_years', models.FloatField()),
+                ('experience_year', models.PositiveSmallIntegerField()),
+                ('education', models.JSONField()),
+                ('average_rating', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('seeker', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='features', to='authentication.jobseekerprofile')),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-17 04:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_feature_store'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobfeatures',
+            name='skill_bits',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='seekerfeatures',
+            name='skill_bits',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-17 04:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_skill_bitsets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobfeatures',
+            name='location_place',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='seekerfeatures',
+            name='location_place',
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, null=True),
+        ),
+    ]
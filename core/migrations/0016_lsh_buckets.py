@@ -0,0 +1,41 @@
+# Generated by Django 5.2.3 on 2026-10-17 04:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0008_delete_seekerfeedback'),
+        ('core', '0015_location_places'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+                ('application_deadline', models.DateField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='core.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key', 'application_deadline'], name='core_joblsh_active_idx')],
+                'unique_together': {('key', 'job')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SeekerLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+                ('is_available', models.BooleanField(default=True)),
+                ('seeker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='authentication.jobseekerprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key', 'is_available'], name='core_seekerlsh_avail_idx')],
+                'unique_together': {('key', 'seeker')},
+            },
+        ),
+    ]
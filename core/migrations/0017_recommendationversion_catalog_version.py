@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-17 05:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_lsh_buckets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recommendationversion',
+            name='catalog_version',
+            field=models.PositiveBigIntegerField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -87,6 +87,12 @@ class Job(models.Model):
     next_step = models.CharField(max_length=20, choices=NEXT_STEP_CHOICES, default='INTERVIEW', help_text="Next step for applicants: Direct Hire or Interview")
     skills = models.JSONField(default=list, blank=True, help_text="List of skills required for the job")
 
+    class Meta:
+        indexes = [
+            # Recommendation candidate generation: open jobs of the accepted job types
+            models.Index(fields=['application_deadline', 'job_type'], name='core_job_active_type_idx'),
+        ]
+
 class Application(models.Model):
     job = models.ForeignKey(Job, on_delete=models.CASCADE)
     seeker = models.ForeignKey('authentication.JobSeekerProfile', on_delete=models.CASCADE)
@@ -159,3 +165,200 @@ class FeedbackRating(models.Model):
         if self.rating > 5.0:
             self.rating = 5.0
         super().save(*args, **kwargs)
+
+
+class JobSkill(models.Model):
+    """
+    Inverted skill index posting: one row per (canonical skill, job).
+    Rows are rebuilt by core.signals whenever a Job is saved and cascade away
+    with it, so recommendation candidate generation can fetch the jobs sharing
+    a seeker's skills without scanning the whole jobs table.
+    """
+    skill = models.CharField(max_length=255)
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='skill_postings')
+    # Denormalized from Job so that active postings can be found without a join
+    application_deadline = models.DateField()
+
+    class Meta:
+        unique_together = ('skill', 'job')
+        indexes = [
+            models.Index(fields=['skill', 'application_deadline'], name='core_jobskill_active_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.skill} -> Job {self.job_id}"
+
+
+class SeekerSkill(models.Model):
+    """
+    Inverted skill index posting: one row per (canonical skill, job seeker).
+    Rebuilt by core.signals whenever a JobSeekerProfile is saved, which also
+    covers availability changes (e.g. ToggleAvailabilityView).
+    """
+    skill = models.CharField(max_length=255)
+    seeker = models.ForeignKey('authentication.JobSeekerProfile', on_delete=models.CASCADE, related_name='skill_postings')
+    # Denormalized from JobSeekerProfile so that available seekers can be found without a join
+    is_available = models.BooleanField(default=True)
+
+    class Meta:
+        unique_together = ('skill', 'seeker')
+        indexes = [
+            models.Index(fields=['skill', 'is_available'], name='core_seekerskill_avail_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.skill} -> Seeker {self.seeker_id}"
+
+
+class SeekerRecommendation(models.Model):
+    """
+    Materialized top-N job recommendations of a job seeker.
+    Filled by the precompute_recommendations command (or written through on a
+    live recompute) and served by JobRecommendationView while fresh, see
+    core.ai.recommendation_store. Profile edits mark the row dirty and schedule
+    a debounced recompute of that seeker.
+    """
+    seeker = models.OneToOneField('authentication.JobSeekerProfile', on_delete=models.CASCADE, related_name='job_recommendations')
+    # Recommended job IDs, best first, with their scores at computation time
+    job_ids = models.JSONField(default=list)
+    scores = models.JSONField(default=list)
+    engine = models.CharField(max_length=20, blank=True)
+    # Selection rule of an 'ml' row: 'threshold' (the best jobs scoring at least
+    # 0.5) or 'fallback' (none did: the best 5 scoring at least 0.3)
+    selection = models.CharField(max_length=20, blank=True)
+    # Version (checksum prefix) of the job model the row was computed with
+    model_version = models.CharField(max_length=64, blank=True)
+    computed_at = models.DateTimeField()
+    # Set when the seeker's profile changed after computed_at; dirty rows are never served
+    dirty_since = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['computed_at'], name='core_seekerrec_computed_idx'),
+        ]
+
+    def __str__(self):
+        return f"Recommendations of Seeker {self.seeker_id} ({len(self.job_ids)} jobs)"
+
+
+class RecommendationVersion(models.Model):
+    """
+    Version counter of one input of the recommendation engines: a job
+    ('job:<id>'), a job seeker ('seeker:<id>') or a whole catalog ('jobs',
+    'seekers'). Bumped by core.signals on every change of that input and
+    combined with the model version into the keys of the recommendation
+    result cache (core.ai.result_cache). Kept in the database so every
+    worker process sees every bump.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    # For a job or seeker: version of its catalog counter when it last changed
+    # along with it (lists the rows a matching snapshot holds stale)
+    catalog_version = models.PositiveBigIntegerField(null=True, blank=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
+
+
+class PrecomputeRun(models.Model):
+    """
+    One run of the precompute_recommendations command. Every seeker whose
+    SeekerRecommendation row was written since started_at (with this model
+    version, and not edited since) is done, so a run interrupted before
+    finished_at was set can be resumed without rescoring them.
+    """
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Version of the job model the run scores with; a retrained model starts a new run
+    model_version = models.CharField(max_length=64)
+    stale_only = models.BooleanField(default=False)
+    written = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        state = 'finished' if self.finished_at else 'unfinished'
+        return f"Precompute run {self.pk} of {self.started_at:%Y-%m-%d %H:%M} ({state}, {self.written} seekers)"
+
+
+class SeekerFeatures(models.Model):
+    """
+    Feature store row of a job seeker: the inputs of the recommendation
+    features that depend on the seeker alone, derived once per save of the
+    profile (or of a rating of it) by core.signals instead of once per scored
+    pair. See core.ai.feature_store.
+    """
+    seeker = models.OneToOneField('authentication.JobSeekerProfile', on_delete=models.CASCADE, related_name='features')
+    # Total experience years, and the year 'present' durations were counted up to
+    experience_years = models.FloatField()
+    experience_year = models.PositiveSmallIntegerField()
+    # Parsed education entries (ml_training.enhanced_matching.compile_seeker_education)
+    education = models.JSONField()
+    # JobSeekerProfile.average_rating, null without ratings
+    average_rating = models.FloatField(null=True, blank=True)
+    # Packed bitset of the canonical skills (core.ai.skill_bitset), null when some are outside SKILL_MAPPING
+    skill_bits = models.BinaryField(null=True, blank=True)
+    # Gazetteer place of the location (ml_training.gazetteer), null when unresolved
+    location_place = models.PositiveSmallIntegerField(null=True, blank=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Features of Seeker {self.seeker_id}"
+
+
+class JobFeatures(models.Model):
+    """
+    Feature store row of a job: its parsed education requirements, derived
+    once per save of the job by core.signals. See core.ai.feature_store.
+    """
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, related_name='features')
+    # Parsed requirements (ml_training.enhanced_matching.compile_job_education), null when malformed
+    education = models.JSONField(null=True, blank=True)
+    # Packed bitset of the canonical skills (core.ai.skill_bitset), null when some are outside SKILL_MAPPING
+    skill_bits = models.BinaryField(null=True, blank=True)
+    # Gazetteer place of the location (ml_training.gazetteer), null when unresolved
+    location_place = models.PositiveSmallIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Features of Job {self.job_id}"
+
+
+class JobLSHBucket(models.Model):
+    """
+    LSH bucket of a job: one row per (band key, job) of the MinHash signature
+    of its skills. Rebuilt by core.signals whenever a Job is saved. See
+    core.ai.lsh_index.
+    """
+    key = models.BigIntegerField()
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='lsh_buckets')
+    # Denormalized from Job so that active jobs can be found without a join
+    application_deadline = models.DateField()
+
+    class Meta:
+        unique_together = ('key', 'job')
+        indexes = [
+            models.Index(fields=['key', 'application_deadline'], name='core_joblsh_active_idx'),
+        ]
+
+    def __str__(self):
+        return f"Bucket {self.key} -> Job {self.job_id}"
+
+
+class SeekerLSHBucket(models.Model):
+    """
+    LSH bucket of a job seeker: one row per (band key, seeker) of the MinHash
+    signature of their skills. Rebuilt by core.signals whenever a
+    JobSeekerProfile's skills or availability are saved. See core.ai.lsh_index.
+    """
+    key = models.BigIntegerField()
+    seeker = models.ForeignKey('authentication.JobSeekerProfile', on_delete=models.CASCADE, related_name='lsh_buckets')
+    # Denormalized from JobSeekerProfile so that available seekers can be found without a join
+    is_available = models.BooleanField(default=True)
+
+    class Meta:
+        unique_together = ('key', 'seeker')
+        indexes = [
+            models.Index(fields=['key', 'is_available'], name='core_seekerlsh_avail_idx'),
+        ]
+
+    def __str__(self):
+        return f"Bucket {self.key} -> Seeker {self.seeker_id}"
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Job, Application, FeedbackRating
+from authentication.serializers import JobSeekerProfileSerializer
 from django.utils import timezone
 
 
@@ -22,6 +23,24 @@ class JobSerializer(serializers.ModelSerializer):
         # A job is considered active if its application deadline is in the future
         return obj.application_deadline >= timezone.now().date()
 
+class RecommendationSerializerMixin:
+    """
+    Serializes a core.ai.results.Recommendation as its job or seeker, plus the
+    score, matched skills and engine the recommendation came with
+    """
+    def to_representation(self, recommendation):
+        data = super().to_representation(recommendation.obj)
+        data['score'] = round(recommendation.score, 4)
+        data['matched_skills'] = list(recommendation.matched_skills)
+        data['engine'] = recommendation.engine
+        return data
+
+class RecommendedJobSerializer(RecommendationSerializerMixin, JobSerializer):
+    pass
+
+class RecommendedCandidateSerializer(RecommendationSerializerMixin, JobSeekerProfileSerializer):
+    pass
+
 class ApplicationSerializer(serializers.ModelSerializer):
     seeker_details = serializers.SerializerMethodField()
     feedbacks = serializers.SerializerMethodField()
@@ -0,0 +1,100 @@
+"""
+Signal receivers keeping recommendation indexes (skill postings and LSH
+buckets), the feature store, materialized results and result cache
+versions in sync with the models.
+Connected in CoreConfig.ready().
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from authentication.models import JobSeekerProfile
+from .models import Job, Application, FeedbackRating
+from .ai.skill_index import index_job_skills, index_seeker_skills
+from .ai.lsh_index import index_job_lsh, index_seeker_lsh
+from .ai.feature_store import update_job_features, update_seeker_features, update_seeker_rating
+from .ai.recommendation_store import mark_dirty
+from .ai.result_cache import bump_versions
+
+# JobSeekerProfile fields copied into the skill postings and LSH buckets
+SEEKER_INDEXED_FIELDS = {'skills', 'is_available'}
+
+# JobSeekerProfile fields derived into the feature store
+SEEKER_FEATURE_FIELDS = {'skills', 'experience', 'education', 'location'}
+
+# JobSeekerProfile fields read by the job recommendation features
+SEEKER_RECOMMENDATION_FIELDS = {
+    'skills', 'education', 'experience', 'preferred_job_types',
+    'location', 'willing_to_relocate', 'is_available',
+}
+
+@receiver(post_save, sender=Job, dispatch_uid='core_index_job_skills')
+def update_job_skill_postings(sender, instance, raw=False, **kwargs):
+    # Postings of deleted jobs are removed by the JobSkill.job cascade
+    if raw:
+        return
+    index_job_skills(instance)
+
+@receiver(post_save, sender=JobSeekerProfile, dispatch_uid='core_index_seeker_skills')
+def update_seeker_skill_postings(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Partial saves that leave skills and availability alone (e.g. profile_updated) keep their postings
+    if raw or (update_fields is not None and not SEEKER_INDEXED_FIELDS & set(update_fields)):
+        return
+    index_seeker_skills(instance)
+
+@receiver(post_save, sender=Job, dispatch_uid='core_index_job_lsh')
+def update_job_lsh_buckets(sender, instance, raw=False, **kwargs):
+    # Buckets of deleted jobs are removed by the JobLSHBucket.job cascade
+    if raw:
+        return
+    index_job_lsh(instance)
+
+@receiver(post_save, sender=JobSeekerProfile, dispatch_uid='core_index_seeker_lsh')
+def update_seeker_lsh_buckets(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not SEEKER_INDEXED_FIELDS & set(update_fields)):
+        return
+    index_seeker_lsh(instance)
+
+@receiver(post_save, sender=Job, dispatch_uid='core_update_job_features')
+def update_job_feature_store(sender, instance, raw=False, **kwargs):
+    # Feature store rows of deleted jobs are removed by the JobFeatures.job cascade
+    if raw:
+        return
+    update_job_features(instance)
+
+@receiver(post_save, sender=JobSeekerProfile, dispatch_uid='core_update_seeker_features')
+def update_seeker_feature_store(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not SEEKER_FEATURE_FIELDS & set(update_fields)):
+        return
+    update_seeker_features(instance)
+
+@receiver([post_save, post_delete], sender=FeedbackRating, dispatch_uid='core_update_seeker_rating')
+def update_seeker_rating_feature(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_seeker_rating(instance.profile_id)
+
+@receiver(post_save, sender=JobSeekerProfile, dispatch_uid='core_mark_seeker_recommendations_dirty')
+def mark_seeker_recommendations_dirty(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Bursts of edits collapse into one debounced recompute; reads never serve the dirty row
+    if raw or (update_fields is not None and not SEEKER_RECOMMENDATION_FIELDS & set(update_fields)):
+        return
+    mark_dirty(instance.pk)
+
+# Result cache version counters touched by a change of each model (see core.ai.result_cache)
+
+@receiver([post_save, post_delete], sender=Job, dispatch_uid='core_bump_job_versions')
+def bump_job_versions(sender, instance, **kwargs):
+    bump_versions([f'job:{instance.pk}', 'jobs'])
+
+@receiver([post_save, post_delete], sender=JobSeekerProfile, dispatch_uid='core_bump_seeker_versions')
+def bump_seeker_versions(sender, instance, **kwargs):
+    bump_versions([f'seeker:{instance.pk}', 'seekers'])
+
+@receiver([post_save, post_delete], sender=Application, dispatch_uid='core_bump_application_versions')
+def bump_application_versions(sender, instance, **kwargs):
+    bump_versions([f'seeker:{instance.seeker_id}', f'job:{instance.job_id}'])
+
+@receiver([post_save, post_delete], sender=FeedbackRating, dispatch_uid='core_bump_feedback_versions')
+def bump_feedback_versions(sender, instance, **kwargs):
+    # Ratings feed the candidate scores of the seeker for every job
+    bump_versions([f'seeker:{instance.profile_id}', 'seekers'])
@@ -1,3 +1,1341 @@
-from django.test import TestCase
+import os
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.ai.model_registry import MODELS_DIR, MODEL_FILES, _file_checksum, load_catboost_model
+from core.ai.oblivious_trees import ObliviousTrees
+
+
+class ObliviousTreesParityTests(SimpleTestCase):
+    """The committed .npz exports score like CatBoost on the training data (manage.py export_tree_models)."""
+
+    def test_exports_match_catboost_on_training_data(self):
+        import pandas as pd
+        from core.management.commands.export_tree_models import TRAINING_DATA
+
+        data_dir = os.path.join(settings.BASE_DIR, 'ml_training', 'data')
+        for name, stem in MODEL_FILES.items():
+            with self.subTest(model=name):
+                cbm_path = os.path.join(MODELS_DIR, stem + '.cbm')
+                trees = ObliviousTrees.load(os.path.join(MODELS_DIR, stem + '.npz'))
+                self.assertEqual(trees.source_checksum, _file_checksum(cbm_path), 'stale export, run manage.py export_tree_models')
+
+                X = pd.read_csv(os.path.join(data_dir, TRAINING_DATA[name]))[trees.feature_names].to_numpy()
+                expected = load_catboost_model(cbm_path).predict_proba(X)
+                np.testing.assert_allclose(trees.predict_proba(X), expected, rtol=0, atol=1e-9)
+
+
+def _random_profiles(seed, n, malformed=0.0):
+    """
+    Random seekers and jobs (SimpleNamespace stand-ins for the models) with
+    empty fields; `malformed` is the share of malformed skills and education lists
+    """
+    import random
+    from types import SimpleNamespace
+    from ml_training.enhanced_matching import SKILL_MAPPING
+
+    rnd = random.Random(seed)
+    variations = [v for vs in SKILL_MAPPING.values() for v in vs] + ["custom skill", "Python ", "  sql"]
+    locations = ["Dar es Salaam", "Dar", "Kibaha, Pwani", "Arusha", "Remote", "", None]
+    job_types = ["FULL_TIME", "PART_TIME", "CONTRACT", "INTERNSHIP", "TEMPORARY", "", None]
+    levels = ["Diploma", "Bachelor", "Masters", "PhD", "Certificate", ""]
+    fields = ["Computer Science", "Business", "Accounting", "Engineering", ""]
+    requirements = [
+        lambda: {"type": "education", "level": rnd.choice(levels), "field": rnd.choice(fields)},
+        lambda: "Bachelor degree in computer science",
+        lambda: "Masters in finance",
+        lambda: {"type": "skill", "name": "excel"},
+    ]
+    experiences = [{"duration": "2018-present"}, {"duration": "2 years"}, {"years": 3}, {"title": "Dev"}, {"duration": "garbage"}]
+
+    def skills():
+        if rnd.random() < malformed:
+            return [None, "python"]
+        return rnd.sample(variations, rnd.randint(0, 6))
+
+    def education():
+        if rnd.random() < malformed:
+            return [{"level": None, "field": "Business"}]
+        return [{"level": rnd.choice(levels), "field": rnd.choice(fields), "type": rnd.choice(["degree", ""])}
+                for _ in range(rnd.randint(0, 2))]
+
+    seekers = [
+        SimpleNamespace(
+            skills=skills(), education=education(), experience=rnd.sample(experiences, rnd.randint(0, 2)),
+            preferred_job_types=rnd.sample(job_types[:5], rnd.randint(0, 2)), location=rnd.choice(locations),
+            willing_to_relocate=rnd.random() < 0.3, is_available=rnd.random() < 0.8,
+        )
+        for _ in range(n)
+    ]
+    jobs = [
+        SimpleNamespace(
+            skills=skills(), requirements=[rnd.choice(requirements)() for _ in range(rnd.randint(0, 2))],
+            job_type=rnd.choice(job_types), location=rnd.choice(locations),
+        )
+        for _ in range(n)
+    ]
+    return seekers, jobs
+
+
+class FeatureMatrixEquivalenceTests(SimpleTestCase):
+    """The batched feature matrices equal the per-pair extractors, row for row."""
+
+    def assertSameRows(self, per_pair, batched):
+        try:
+            expected = np.array([per_pair(i) for i in range(self.n)], dtype=np.float32).reshape(self.n, -1)
+        except Exception as e:
+            # Malformed profiles: the batched builder has to fail as well
+            with self.assertRaises(type(e)):
+                batched()
+            return False
+        np.testing.assert_array_equal(batched(), expected)
+        return True
+
+    def test_job_features(self):
+        from core.ai.job_recommendation import extract_job_features, extract_job_feature_matrix
+
+        for seed in range(40):
+            seekers, jobs = _random_profiles(seed, 30)
+            self.n = len(jobs)
+            for seeker in seekers[:5]:
+                with self.subTest(seed=seed):
+                    self.assertSameRows(
+                        lambda i: extract_job_features(seeker, jobs[i]), lambda: extract_job_feature_matrix(seeker, jobs),
+                    )
+
+    def test_candidate_features(self):
+        from core.ai.candidate_recommendation import extract_candidate_features, extract_candidate_feature_matrix
+
+        for seed in range(40):
+            seekers, jobs = _random_profiles(seed, 30)
+            self.n = len(seekers)
+            for job in jobs[:5]:
+                with self.subTest(seed=seed):
+                    self.assertSameRows(
+                        lambda i: extract_candidate_features(seekers[i], job), lambda: extract_candidate_feature_matrix(job, seekers),
+                    )
+
+    def test_empty_profiles(self):
+        from types import SimpleNamespace
+        from core.ai.job_recommendation import extract_job_features, extract_job_feature_matrix
+
+        seeker = SimpleNamespace(skills=[], education=[], experience=[], preferred_job_types=[], location="")
+        jobs = [SimpleNamespace(skills=[], requirements=[], job_type="", location=""), SimpleNamespace()]
+        self.n = len(jobs)
+        self.assertSameRows(lambda i: extract_job_features(seeker, jobs[i]), lambda: extract_job_feature_matrix(seeker, jobs))
+        self.assertEqual(extract_job_feature_matrix(seeker, []).shape[0], 0)
+
+    def test_malformed_profiles(self):
+        from core.ai.job_recommendation import extract_job_features, extract_job_feature_matrix
+
+        scored = failed = 0
+        for seed in range(200):
+            seekers, jobs = _random_profiles(seed, 3, malformed=0.3)
+            self.n = len(jobs)
+            with self.subTest(seed=seed):
+                if self.assertSameRows(lambda i: extract_job_features(seekers[0], jobs[i]), lambda: extract_job_feature_matrix(seekers[0], jobs)):
+                    scored += 1
+                else:
+                    failed += 1
+        # Both outcomes were exercised
+        self.assertTrue(scored and failed)
+
+
+class SkillMatrixEquivalenceTests(SimpleTestCase):
+    """SkillMatrix scores every row like get_matching_skills scores the pair."""
+
+    def test_match_scores_and_matching_skills(self):
+        import random
+        from ml_training.enhanced_matching import SKILL_MAPPING, get_matching_skills
+        from core.ai.skill_matrix import SkillMatrix
+
+        rnd = random.Random(3)
+        variations = [v for vs in SKILL_MAPPING.values() for v in vs] + ["custom skill", "Python ", "  SQL", "rare"]
+        for _ in range(50):
+            seeker_skills = rnd.sample(variations, rnd.randint(0, 8))
+            jobs = [rnd.sample(variations, rnd.randint(0, 8)) for _ in range(40)]
+            matrix = SkillMatrix(jobs, skills_of=lambda skills: skills)
+            scores = matrix.match_scores(seeker_skills)
+            for row, job_skills in enumerate(jobs):
+                matched, score = get_matching_skills(seeker_skills, job_skills)
+                self.assertAlmostEqual(scores.skill_score[row], score, places=12)
+                self.assertEqual(matrix.matching_skills(row, seeker_skills), matched)
+                self.assertEqual(int(scores.overlap[row]), len(matched))
+
+
+class TopKEquivalenceTests(SimpleTestCase):
+    """top_k_indices and TopK return what a stable descending sort followed by [:k] returns."""
+
+    def test_against_stable_sort(self):
+        import random
+        from core.ai.topk import TopK, top_k_indices
+
+        rnd = random.Random(5)
+        for _ in range(300):
+            n = rnd.randint(0, 60)
+            # Few distinct values, so ties are common
+            scores = [rnd.choice([0.1, 0.25, 0.5, 0.5, 0.75, 0.9, rnd.random()]) for _ in range(n)]
+            for k in (0, 1, 3, 10, n, n + 5):
+                expected = sorted(range(n), key=lambda i: -scores[i])[:k]
+                self.assertEqual(list(top_k_indices(np.array(scores), k)), expected)
+
+                # TopK takes the items in any order: ties are broken by position
+                top = TopK(k)
+                order = list(range(n))
+                rnd.shuffle(order)
+                for i in order:
+                    if top.can_enter(scores[i]):
+                        top.push(scores[i], i, i)
+                self.assertEqual([i for _, i in top.items()], expected)
+
+
+class SkillBitsetsEquivalenceTests(SimpleTestCase):
+    """SkillBitsets overlaps and scores equal set intersections of the canonical skills."""
+
+    def test_against_set_overlap(self):
+        import random
+        from types import SimpleNamespace
+        from ml_training.enhanced_matching import SKILL_MAPPING, canonical_skills, skill_ids
+        from core.ai.skill_bitset import SkillBitsets, chunk_skill_matrix, skill_bitset
+        from core.ai.skill_matrix import SkillMatrix
+
+        rnd = random.Random(7)
+        variations = [v for vs in SKILL_MAPPING.values() for v in vs] + ["custom skill", "Python ", "  SQL", "rare"]
+        stale = bytes(8) + bytes(len(skill_bitset([])) - 8)
+        for _ in range(100):
+            # Mostly mapped skills; some rows list unmapped ones or have a missing or stale bitset
+            rows = [SimpleNamespace(skills=rnd.sample(variations, rnd.randint(0, 8))) for _ in range(40)]
+            for row in rows:
+                row.feature_skill_bits = rnd.choice([skill_bitset(row.skills)] * 8 + [None, stale])
+            query = rnd.sample(variations, rnd.randint(0, 8))
+            query_ids = skill_ids(query)
+
+            bitsets = SkillBitsets(rows, [row.feature_skill_bits for row in rows])
+            expected = [len(set(canonical_skills(row.skills)) & set(canonical_skills(query))) for row in rows]
+            self.assertEqual(bitsets.overlap(query_ids).tolist(), expected)
+            self.assertEqual(bitsets.row_sizes.tolist(), [len(canonical_skills(row.skills)) for row in rows])
+            for query_is_job in (False, True):
+                for a, b in zip(bitsets.match_scores(query_ids, query_is_job), SkillMatrix(rows).match_scores(query_ids, query_is_job)):
+                    np.testing.assert_array_equal(a, b)
+            self.assertIsInstance(chunk_skill_matrix(rows), SkillBitsets)
+
+    def test_unmapped_skills_have_no_bitset(self):
+        from core.ai.skill_bitset import skill_bitset
+
+        self.assertIsNotNone(skill_bitset(["Python", "js"]))
+        self.assertIsNone(skill_bitset(["Python", "custom skill"]))
+        self.assertIsNone(skill_bitset([3, "python"]))
+        self.assertEqual(len(skill_bitset([])), len(skill_bitset(["python"])))
+
+
+def _hashed_scores(loaded, X):
+    """Stand-in job model: a deterministic score in [0, 0.6) per feature row, spread over every selection rule."""
+    import zlib
+
+    rows = np.asarray(X, dtype=np.float64).round(6)
+    return np.array([zlib.crc32(row.tobytes()) / 2 ** 32 * 0.6 for row in rows])
+
+
+@override_settings(RECOMMENDATION_RECOMPUTE_DELAY=0)
+class MergeNewJobTests(TestCase):
+    """Merging a new job into the stored rows gives what recomputing the seekers gives."""
+
+    def merge_and_compare(self, on_new_job=lambda job: None):
+        import contextlib
+        import io
+        import random
+        from datetime import date, timedelta
+        from unittest import mock
+        from authentication.models import JobSeekerProfile, RecruiterProfile, User
+        from core.ai.recommendation_store import compute_job_recommendations, merge_new_job, refresh_job_recommendations
+        from core.models import Job, SeekerRecommendation
+
+        rnd = random.Random(11)
+        skills = ["python", "django", "sql", "excel", "accounting", "nursing", "react", "docker"]
+        words = ["backend", "ledger", "clinic", "frontend", "payroll", "patients", "api", "audit", "containers"]
+        recruiter = RecruiterProfile.objects.create(
+            user=User.objects.create_user(username='recruiter', email='recruiter@example.com', password='pw12345!'),
+            company_name='Acme',
+        )
+
+        def new_job(i):
+            job = Job.objects.create(
+                recruiter=recruiter, title=f'Job {i}', description=' '.join(rnd.sample(words, 3)), requirements=[],
+                salary_min=1, salary_max=2,
+                job_type=rnd.choice(['FULL_TIME', 'PART_TIME', 'CONTRACT']), location=rnd.choice(['Dar es Salaam', 'Arusha']),
+                application_deadline=date.today() + timedelta(days=30), experience_level='MID',
+                skills=rnd.sample(skills, rnd.randint(1, 3)),
+            )
+            on_new_job(job)
+            return job
+
+        with mock.patch('core.ai.ml_stage.cached_predict_proba', _hashed_scores), \
+                contextlib.redirect_stdout(io.StringIO()):
+            for i in range(12):
+                new_job(i)
+            seekers = [
+                JobSeekerProfile.objects.create(
+                    user=User.objects.create_user(username=f'seeker{i}', email=f'seeker{i}@example.com', password='pw12345!'),
+                    full_name=f'Seeker {i}', skills=rnd.sample(skills, rnd.randint(1, 3)),
+                    experience=[{'title': 'Dev', 'description': ' '.join(rnd.sample(words, 2)), 'years': rnd.randint(0, 4)}],
+                    location=rnd.choice(['Dar es Salaam', 'Arusha']),
+                )
+                for i in range(40)
+            ]
+            for seeker in seekers:
+                refresh_job_recommendations(seeker)
+
+            selections = set()
+            for i in range(12, 40):
+                merge_new_job(new_job(i), notify=False)
+                for record in SeekerRecommendation.objects.select_related('seeker'):
+                    if record.dirty_since is not None:
+                        refresh_job_recommendations(record.seeker)
+                        continue
+                    _, expected = compute_job_recommendations(record.seeker)
+                    selections.add((record.engine, record.selection))
+                    self.assertEqual(
+                        (record.job_ids, record.scores, record.engine, record.selection),
+                        (expected.job_ids, expected.scores, expected.engine, expected.selection),
+                        f'seeker {record.seeker_id} after job {i}',
+                    )
+        return selections
+
+    def test_merge_equals_recompute(self):
+        selections = self.merge_and_compare()
+        # Every kind of row was merged into
+        self.assertTrue({('ml', 'threshold'), ('ml', 'fallback'), ('rule_based', '')} <= selections, selections)
+
+    @override_settings(RECOMMENDATION_RETRIEVAL='lsh', RECOMMENDATION_LSH_MIN_CANDIDATES=0)
+    def test_merge_follows_lsh_retrieval(self):
+        # Without a postings fallback, a job only reaches the seekers sharing one of its buckets
+        self.merge_and_compare()
+
+    def test_merge_adds_text_term(self):
+        import tempfile
+        from core.ai import text_index
+
+        with tempfile.TemporaryDirectory() as root, self.assertLogs('core.ai.text_index', 'INFO'), \
+                override_settings(RECOMMENDATION_TEXT_INDEX_DIR=root, RECOMMENDATION_TEXT_WEIGHT=0.3):
+            def index_job(job):
+                text_index.append_text_index(root)
+                text_index.store.reload()
+
+            self.merge_and_compare(index_job)
+            self.assertIsNotNone(text_index.job_text_scorer(text_index.store.get().ids[-1]))
+        text_index.store.reload()
+
+
+def _catalog(seed, n_jobs, n_seekers):
+    """
+    A recruiter with random jobs (some closed) and random job seekers, saved
+    through the ORM so the signals fill the indexes and the feature store
+    """
+    import random
+    from datetime import date, timedelta
+    from authentication.models import JobSeekerProfile, RecruiterProfile, User
+    from core.models import Job
+
+    rnd = random.Random(seed)
+    skills = ["python", "django", "sql", "excel", "accounting", "nursing", "react", "docker", "Python ", "custom skill"]
+    locations = ["Dar es Salaam", "Arusha", "Kibaha, Pwani", "Remote"]
+    job_types = ["FULL_TIME", "PART_TIME", "CONTRACT", "INTERNSHIP"]
+    education = [{"level": "Bachelor", "field": "Computer Science"}, {"level": "Diploma", "field": "Accounting"}]
+    recruiter = RecruiterProfile.objects.create(
+        user=User.objects.create_user(username=f'recruiter{seed}', email=f'recruiter{seed}@example.com', password='pw12345!'),
+        company_name='Acme',
+    )
+    jobs = [
+        Job.objects.create(
+            recruiter=recruiter, title=f'Job {i}', description='Build and run things', salary_min=1, salary_max=2,
+            requirements=rnd.sample(["Bachelor degree in computer science", "Diploma in accounting"], rnd.randint(0, 1)),
+            job_type=rnd.choice(job_types), location=rnd.choice(locations), experience_level=rnd.choice(['ENTRY', 'MID', 'SENIOR']),
+            application_deadline=date.today() + timedelta(days=rnd.choice([-3, 30, 60])), skills=rnd.sample(skills, rnd.randint(1, 4)),
+        )
+        for i in range(n_jobs)
+    ]
+    seekers = [
+        JobSeekerProfile.objects.create(
+            user=User.objects.create_user(username=f'seeker{seed}-{i}', email=f'seeker{seed}-{i}@example.com', password='pw12345!'),
+            full_name=f'Seeker {i}', skills=rnd.sample(skills, rnd.randint(1, 4)), location=rnd.choice(locations),
+            education=rnd.sample(education, rnd.randint(0, 1)), experience=[{'title': 'Dev', 'years': rnd.randint(0, 6)}],
+            preferred_job_types=rnd.sample(job_types, rnd.randint(0, 2)), willing_to_relocate=rnd.random() < 0.3,
+            is_available=rnd.random() < 0.8,
+        )
+        for i in range(n_seekers)
+    ]
+    return recruiter, jobs, seekers
+
+
+class MatchingSnapshotTests(TestCase):
+    """Results served from the snapshot, with the rows changed since its build streamed, equal streamed ones."""
+
+    def setUp(self):
+        import shutil
+        import tempfile
+        from core.ai import snapshot
+
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, True)
+        self.enterContext(override_settings(RECOMMENDATION_SNAPSHOT_DIR=root))
+        self.addCleanup(snapshot.store.reload)
+        self.recruiter, self.jobs, self.seekers = _catalog(20, 40, 30)
+
+    def build(self):
+        import contextlib
+        import io
+        from core.ai import snapshot
+
+        with contextlib.redirect_stdout(io.StringIO()), self.assertLogs('core.ai.snapshot', 'INFO'):
+            snapshot.build_snapshot()
+            snapshot.store.reload()
+
+    def results(self, use_snapshot=True):
+        """(records, diagnostics) of every seeker and job, and how many read the snapshot."""
+        import contextlib
+        import io
+        from unittest import mock
+        from authentication.models import JobSeekerProfile
+        from core.ai.candidate_recommendation import get_candidate_recommendations_for_job
+        from core.ai.job_recommendation import get_job_recommendations_for_seeker
+        from core.models import Job
+
+        patches = contextlib.ExitStack()
+        if not use_snapshot:
+            for module in ('job_recommendation', 'candidate_recommendation'):
+                patches.enter_context(mock.patch(f'core.ai.{module}.current_snapshot', return_value=(None, None)))
+        results, used = [], 0
+        with patches, contextlib.redirect_stdout(io.StringIO()):
+            calls = [(get_job_recommendations_for_seeker, seeker) for seeker in JobSeekerProfile.objects.order_by('pk')]
+            calls += [(get_candidate_recommendations_for_job, job) for job in Job.objects.order_by('pk')]
+            for engine, subject in calls:
+                diagnostics = {}
+                records = engine(subject, diagnostics=diagnostics)
+                used += diagnostics.pop('snapshot', None) is not None
+                diagnostics.pop('snapshot_changed', None)
+                results.append(([(r.id, round(r.score, 9), r.matched_skills, r.engine) for r in records], diagnostics))
+        return results, used
+
+    def assert_served_like_streamed(self):
+        served, used = self.results()
+        streamed, _ = self.results(use_snapshot=False)
+        self.assertEqual(served, streamed)
+        return used
+
+    def test_snapshot_results_equal_streamed(self):
+        self.build()
+        self.assertGreater(self.assert_served_like_streamed(), 40)
+
+    def test_changed_rows_are_streamed(self):
+        from datetime import date, timedelta
+        from core.ai.snapshot import current_snapshot
+        from core.models import Job
+
+        self.build()
+        edited, closed, deleted = self.jobs[:3]
+        deleted_id = deleted.pk
+        edited.skills, edited.job_type = ["python", "react", "docker"], "CONTRACT"
+        edited.save()
+        closed.application_deadline = date.today() - timedelta(days=1)
+        closed.save()
+        deleted.delete()
+        posted = Job.objects.create(
+            recruiter=self.recruiter, title='New', description='New job', requirements=[], salary_min=1, salary_max=2,
+            job_type='FULL_TIME', location='Arusha', application_deadline=date.today() + timedelta(days=9),
+            experience_level='ENTRY', skills=["python", "sql"],
+        )
+        seeker = self.seekers[0]
+        seeker.skills, seeker.is_available = ["python", "sql", "react"], True
+        seeker.save()
+
+        snapshot, changed = current_snapshot('jobs')
+        self.assertIsNotNone(snapshot)
+        self.assertEqual(changed, sorted([edited.pk, closed.pk, deleted_id, posted.pk]))
+        self.assertEqual(current_snapshot('seekers')[1], [seeker.pk])
+        self.assertGreater(self.assert_served_like_streamed(), 40)
+
+    @override_settings(RECOMMENDATION_SNAPSHOT_MAX_CHANGED=1)
+    def test_catalog_streams_past_max_changed(self):
+        from core.ai.snapshot import current_snapshot
+
+        self.build()
+        for job in self.jobs[:2]:
+            job.save()
+        self.assertEqual(current_snapshot('jobs'), (None, None))
+        self.assertEqual(current_snapshot('seekers')[1], [])
+
+    def test_snapshot_without_row_versions_needs_current_catalog(self):
+        from core.ai.snapshot import current_snapshot, store
+
+        self.build()
+        store.get().tracks_changes = False
+        self.assertEqual(current_snapshot('jobs')[1], [])
+        self.jobs[0].save()
+        self.assertEqual(current_snapshot('jobs'), (None, None))
+
+
+@override_settings(RECOMMENDATION_MAX_AGE=3600)
+class RecommendationStoreTests(TestCase):
+    """Freshness of the materialized rows, and the dirty marks and timers keeping them fresh."""
+
+    def cancel_timers(self):
+        from core.ai import recommendation_store
+
+        with recommendation_store._pending_lock:
+            for timer in recommendation_store._pending.values():
+                timer.cancel()
+            recommendation_store._pending.clear()
+
+    def test_row_goes_stale(self):
+        from datetime import timedelta
+        from types import SimpleNamespace
+        from django.utils import timezone
+        from core.ai.recommendation_store import is_fresh
+
+        now = timezone.now()
+        row = SimpleNamespace(dirty_since=None, model_version='v1', computed_at=now - timedelta(minutes=59))
+        self.assertTrue(is_fresh(row, 'v1', now))
+        # A new job model
+        self.assertFalse(is_fresh(row, 'v2', now))
+        # Past RECOMMENDATION_MAX_AGE
+        row.computed_at = now - timedelta(minutes=61)
+        self.assertFalse(is_fresh(row, 'v1', now))
+        row.computed_at, row.dirty_since = now, now
+        self.assertFalse(is_fresh(row, 'v1', now))
+
+    def test_save_records_keeps_later_dirty_marks(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from core.ai.recommendation_store import save_records
+        from core.models import SeekerRecommendation
+
+        _, _, seekers = _catalog(10, 0, 2)
+        edited_at = timezone.now()
+        for seeker in seekers:
+            SeekerRecommendation.objects.create(seeker=seeker, model_version='v1', computed_at=edited_at, dirty_since=edited_at)
+
+        def recompute(seeker, started_at):
+            save_records([SeekerRecommendation(
+                seeker=seeker, job_ids=[7], scores=[0.9], engine='ml', selection='threshold',
+                model_version='v1', computed_at=timezone.now(),
+            )], started_at)
+            return SeekerRecommendation.objects.get(seeker=seeker)
+
+        # Profile read before the edit: the row is rewritten but stays dirty
+        row = recompute(seekers[0], edited_at - timedelta(seconds=1))
+        self.assertEqual((row.job_ids, row.dirty_since), ([7], edited_at))
+        # Profile read after it (or at the same time): clean
+        row = recompute(seekers[1], edited_at)
+        self.assertEqual((row.job_ids, row.dirty_since), ([7], None))
+
+    def test_recompute_timer_is_debounced(self):
+        import threading
+        from unittest import mock
+        from core.ai import recommendation_store
+
+        ran = []
+        done = threading.Event()
+
+        def recompute(seeker_id):
+            ran.append(seeker_id)
+            done.set()
+
+        self.addCleanup(self.cancel_timers)
+        with mock.patch.object(recommendation_store, 'recompute_dirty_seeker', recompute):
+            self.assertTrue(recommendation_store.schedule_recompute(5, delay=0.3))
+            first = recommendation_store._pending[('seeker', 5)]
+            self.assertTrue(recommendation_store.schedule_recompute(5, delay=0.3))
+            second = recommendation_store._pending[('seeker', 5)]
+            # The pending timer is cancelled and replaced
+            self.assertIsNot(second, first)
+            self.assertTrue(first.finished.is_set())
+            self.assertTrue(done.wait(5))
+            second.join(5)
+        self.assertEqual(ran, [5])
+        self.assertNotIn(('seeker', 5), recommendation_store._pending)
+        # Scheduling disabled
+        self.assertFalse(recommendation_store.schedule_recompute(5, delay=0))
+
+    def test_merge_timer_is_not_replaced(self):
+        from unittest import mock
+        from core.ai import recommendation_store
+
+        self.addCleanup(self.cancel_timers)
+        with mock.patch.object(recommendation_store, 'merge_job_by_id'):
+            self.assertTrue(recommendation_store.schedule_merge(9, delay=60))
+            first = recommendation_store._pending[('job', 9)]
+            self.assertFalse(recommendation_store.schedule_merge(9, delay=60))
+            self.assertIs(recommendation_store._pending[('job', 9)], first)
+
+
+class JobSkillPostingsTests(TestCase):
+    """Job skill postings follow saves and deletes, and retrieve what a scan of the jobs would."""
+
+    def postings(self):
+        from core.models import JobSkill
+
+        return sorted(JobSkill.objects.values_list('skill', 'job_id', 'application_deadline'))
+
+    def expected_postings(self):
+        from core.ai.skill_index import skill_keys
+        from core.models import Job
+
+        return sorted(
+            (skill, job.pk, job.application_deadline) for job in Job.objects.all() for skill in skill_keys(job.skills)
+        )
+
+    def test_postings_follow_jobs(self):
+        from datetime import date, timedelta
+        from django.utils import timezone
+        from core.ai.skill_index import active_job_ids_for_skills, rebuild_job_skill_index, skill_keys
+        from core.models import Job
+
+        _, jobs, _ = _catalog(30, 12, 0)
+        self.assertEqual(self.postings(), self.expected_postings())
+
+        jobs[0].skills = ["Docker", "kubernetes", "docker"]
+        jobs[0].save()
+        jobs[1].application_deadline = date.today() - timedelta(days=1)
+        jobs[1].save()
+        jobs[2].delete()
+        self.assertEqual(self.postings(), self.expected_postings())
+
+        today = timezone.now().date()
+        for skills in (["python"], ["Docker", "sql"], ["nursing", "custom skill"], []):
+            scanned = {
+                job.pk for job in Job.objects.all()
+                if job.application_deadline >= today and set(skill_keys(job.skills)) & set(skill_keys(skills))
+            }
+            self.assertEqual({row['job_id'] for row in active_job_ids_for_skills(skills)}, scanned, skills)
+
+        before = self.postings()
+        rebuild_job_skill_index(batch_size=5)
+        self.assertEqual(self.postings(), before)
+
+
+class SeekerSkillPostingsTests(TestCase):
+    """Seeker skill postings follow profile saves and availability toggles."""
+
+    def postings(self):
+        from core.models import SeekerSkill
+
+        return sorted(SeekerSkill.objects.values_list('skill', 'seeker_id', 'is_available'))
+
+    def expected_postings(self):
+        from authentication.models import JobSeekerProfile
+        from core.ai.skill_index import skill_keys
+
+        return sorted(
+            (skill, seeker.pk, seeker.is_available)
+            for seeker in JobSeekerProfile.objects.all() for skill in skill_keys(seeker.skills)
+        )
+
+    def assert_available_ids_match_scan(self):
+        from authentication.models import JobSeekerProfile
+        from core.ai.skill_index import available_seeker_ids_for_skills, skill_keys
+
+        for skills in (["python"], ["Docker", "sql"], ["nursing", "custom skill"], []):
+            scanned = {
+                seeker.pk for seeker in JobSeekerProfile.objects.all()
+                if seeker.is_available and set(skill_keys(seeker.skills)) & set(skill_keys(skills))
+            }
+            self.assertEqual({row['seeker_id'] for row in available_seeker_ids_for_skills(skills)}, scanned, skills)
+
+    def test_postings_follow_profiles(self):
+        from core.ai.skill_index import rebuild_seeker_skill_index
+        from core.models import SeekerSkill
+
+        _, _, seekers = _catalog(40, 0, 12)
+        self.assertEqual(self.postings(), self.expected_postings())
+        self.assert_available_ids_match_scan()
+
+        seekers[0].skills = ["React", "python", "react"]
+        seekers[0].save()
+        seekers[1].is_available = not seekers[1].is_available
+        seekers[1].save(update_fields=['is_available'])
+        seekers[2].delete()
+        self.assertEqual(self.postings(), self.expected_postings())
+        self.assert_available_ids_match_scan()
+
+        # Partial saves of other fields keep the postings rows
+        rows = sorted(SeekerSkill.objects.filter(seeker=seekers[3]).values_list('pk', flat=True))
+        seekers[3].profile_updated = True
+        seekers[3].save(update_fields=['profile_updated'])
+        self.assertEqual(sorted(SeekerSkill.objects.filter(seeker=seekers[3]).values_list('pk', flat=True)), rows)
+
+        before = self.postings()
+        rebuild_seeker_skill_index(batch_size=5)
+        self.assertEqual(self.postings(), before)
+
+    def test_toggle_availability_updates_postings(self):
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+        from core.ai.skill_index import candidate_seekers_for_job
+        from core.models import SeekerSkill
+
+        _, jobs, seekers = _catalog(41, 1, 1)
+        seeker, job = seekers[0], jobs[0]
+        seeker.skills, job.skills = ["python", "sql"], ["python"]
+        seeker.save()
+        job.save()
+        client = APIClient()
+        client.force_authenticate(seeker.user)
+
+        for _ in range(2):
+            available = not seeker.is_available
+            response = client.post(reverse('toggle-availability'))
+            seeker.refresh_from_db()
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual((response.data['is_available'], seeker.is_available), (available, available))
+            self.assertEqual(set(SeekerSkill.objects.filter(seeker=seeker).values_list('is_available', flat=True)), {available})
+            self.assertEqual(list(candidate_seekers_for_job(job)), [seeker] if available else [])
+
+
+class ResultCacheTests(TestCase):
+    """Cached results are served until a save or delete bumps one of their inputs."""
+
+    def setUp(self):
+        from core.ai.result_cache import get_result_cache
+
+        get_result_cache().clear()
+        self.addCleanup(get_result_cache().clear)
+
+    def lookup(self, kind, entity_id, params=()):
+        from core.ai.result_cache import cached_recommendations
+
+        diagnostics = {}
+        results = cached_recommendations(kind, entity_id, lambda computed: [entity_id], diagnostics, params)
+        self.assertEqual(results, [entity_id])
+        return diagnostics['result_cache']
+
+    def test_bumps_invalidate_their_results(self):
+        from unittest import mock
+        from core.ai.result_cache import bump_versions
+
+        self.assertEqual([self.lookup('job', 1), self.lookup('job', 1)], ['miss', 'hit'])
+        self.assertEqual(self.lookup('candidate', 1), 'miss')
+        self.assertEqual(self.lookup('job', 1, [('top_n', 3)]), 'miss')
+
+        bump_versions(['seeker:1'])
+        self.assertEqual([self.lookup('job', 1), self.lookup('candidate', 1)], ['miss', 'hit'])
+        # Another seeker, and the job of the same ID, are not inputs of the seeker's jobs
+        bump_versions(['seeker:2', 'job:1'])
+        self.assertEqual([self.lookup('job', 1), self.lookup('candidate', 1)], ['hit', 'miss'])
+        bump_versions(['jobs'])
+        self.assertEqual([self.lookup('job', 1), self.lookup('candidate', 1)], ['miss', 'hit'])
+        bump_versions(['seekers'])
+        self.assertEqual([self.lookup('job', 1), self.lookup('candidate', 1)], ['hit', 'miss'])
+
+        with mock.patch('core.ai.result_cache.registry.version', return_value='retrained'):
+            self.assertEqual(self.lookup('job', 1), 'miss')
+        self.assertEqual(self.lookup('job', 1), 'hit')
+
+    def test_saves_bump_versions(self):
+        from core.models import Application, FeedbackRating
+
+        recruiter, jobs, seekers = _catalog(50, 2, 2)
+        job, seeker, other = jobs[0], seekers[0], seekers[1]
+
+        def lookups():
+            return [self.lookup('job', seeker.pk), self.lookup('job', other.pk), self.lookup('candidate', job.pk)]
+
+        self.assertEqual(lookups(), ['miss', 'miss', 'miss'])
+        self.assertEqual(lookups(), ['hit', 'hit', 'hit'])
+        # Every seeker's jobs read the catalog
+        jobs[1].save()
+        self.assertEqual(lookups(), ['miss', 'miss', 'hit'])
+        # Every job's candidates read the pool
+        other.save()
+        self.assertEqual(lookups(), ['hit', 'miss', 'miss'])
+        application = Application.objects.create(job=job, seeker=seeker)
+        self.assertEqual(lookups(), ['miss', 'hit', 'miss'])
+        FeedbackRating.objects.create(profile=other, recruiter=recruiter, application=None, rating=4)
+        self.assertEqual(lookups(), ['hit', 'miss', 'miss'])
+        application.delete()
+        self.assertEqual(lookups(), ['miss', 'hit', 'miss'])
+        jobs[1].delete()
+        self.assertEqual(lookups(), ['miss', 'miss', 'hit'])
+
+    def test_catalog_version_recorded_with_catalog_bumps(self):
+        from core.ai.result_cache import bump_versions
+        from core.models import RecommendationVersion
+
+        def catalog_versions():
+            return dict(RecommendationVersion.objects.values_list('key', 'catalog_version'))
+
+        bump_versions(['job:3', 'jobs'])
+        bump_versions(['job:4', 'jobs'])
+        bump_versions(['job:3'])
+        self.assertEqual(catalog_versions(), {'job:3': 1, 'job:4': 2, 'jobs': None})
+        bump_versions(['seeker:3', 'job:3', 'seekers'])
+        self.assertEqual(catalog_versions(), {'job:3': 1, 'job:4': 2, 'jobs': None, 'seeker:3': 1, 'seekers': None})
+
+
+class CandidateFilterTests(TestCase):
+    """The SQL filters of candidate generation keep what the engines' Python filters accept."""
+
+    def test_candidate_jobs_for_seeker(self):
+        from django.utils import timezone
+        from authentication.models import JobSeekerProfile
+        from core.ai.ml_stage import accepts_job_type
+        from core.ai.skill_index import candidate_jobs_for_seeker, skill_keys
+        from core.models import JOB_TYPE_CHOICES, Job
+
+        _, jobs, seekers = _catalog(60, 30, 12)
+        # A job type outside JOB_TYPE_CHOICES is left to the Python check
+        jobs[0].job_type = 'Freelance'
+        jobs[0].save()
+        seekers[0].preferred_job_types = ['part_time']
+        seekers[0].save()
+        canonical = {job_type for job_type, _ in JOB_TYPE_CHOICES}
+        today = timezone.now().date()
+
+        for seeker in JobSeekerProfile.objects.all():
+            matching = [
+                job for job in Job.objects.all()
+                if job.application_deadline >= today and set(skill_keys(job.skills)) & set(skill_keys(seeker.skills))
+            ]
+            accepted = {job.pk for job in matching if accepts_job_type(seeker.preferred_job_types, job.job_type)}
+            candidates = list(candidate_jobs_for_seeker(seeker))
+            self.assertEqual(
+                {job.pk for job in candidates},
+                accepted | {job.pk for job in matching if job.job_type not in canonical},
+                seeker.preferred_job_types,
+            )
+            self.assertEqual({job.pk for job in candidates if accepts_job_type(seeker.preferred_job_types, job.job_type)}, accepted)
+
+    def test_candidate_seekers_for_job(self):
+        from authentication.models import JobSeekerProfile
+        from core.ai.skill_index import candidate_seekers_for_job, skill_keys
+        from core.models import Job
+        from ml_training.gazetteer import DISTANCE_KM, resolve_location
+
+        _, jobs, seekers = _catalog(61, 10, 30)
+        # Unavailable on the profile only (queryset updates skip the postings)
+        available = next(seeker for seeker in seekers if seeker.is_available)
+        unavailable = next(seeker for seeker in seekers if not seeker.is_available)
+        JobSeekerProfile.objects.filter(pk=available.pk).update(is_available=False)
+        JobSeekerProfile.objects.filter(pk=unavailable.pk).update(is_available=True)
+
+        def nearby(job, seeker, max_distance_km):
+            job_place, seeker_place = resolve_location(job.location), resolve_location(seeker.location)
+            return bool(job_place and seeker_place and DISTANCE_KM[job_place, seeker_place] <= max_distance_km)
+
+        for job in Job.objects.all():
+            # The postings of `unavailable` still say so
+            matching = [
+                seeker for seeker in JobSeekerProfile.objects.exclude(pk=unavailable.pk)
+                if seeker.is_available and set(skill_keys(seeker.skills)) & set(skill_keys(job.skills))
+            ]
+            self.assertEqual([seeker.pk for seeker in candidate_seekers_for_job(job)], [seeker.pk for seeker in matching])
+            for max_distance_km in (0, 50, 1000):
+                self.assertEqual(
+                    [seeker.pk for seeker in candidate_seekers_for_job(job, max_distance_km=max_distance_km)],
+                    [seeker.pk for seeker in matching if nearby(job, seeker, max_distance_km)],
+                    (job.location, max_distance_km),
+                )
+
+
+class FeatureStoreReaderTests(TestCase):
+    """The stored features read with the candidate streams equal the ones derived from the raw fields."""
+
+    def test_readers_match_raw_fields(self):
+        from authentication.models import JobSeekerProfile
+        from core.ai.feature_store import experience_years_of, job_education_of, location_place_of, seeker_education_of
+        from core.ai.streaming import RowStream, SlimJob, SlimSeeker
+        from core.models import FeedbackRating, Job, JobFeatures, SeekerFeatures
+
+        recruiter, jobs, seekers = _catalog(70, 12, 12)
+        for seeker, rating in zip(seekers, [5, 4, 2.5, 3]):
+            FeedbackRating.objects.create(profile=seeker, recruiter=recruiter, rating=rating)
+        FeedbackRating.objects.create(profile=seekers[0], recruiter=recruiter, rating=3.5)
+        # Averages needing the profile's rounding, stored and derived
+        for seeker in (seekers[1], seekers[3]):
+            FeedbackRating.objects.create(profile=seeker, recruiter=recruiter, rating=4)
+            FeedbackRating.objects.create(profile=seeker, recruiter=recruiter, rating=5)
+        # Rows derived on the fly: no stored features, or a stale experience year
+        SeekerFeatures.objects.filter(seeker__in=[seekers[1], seekers[5]]).delete()
+        SeekerFeatures.objects.filter(seeker=seekers[2]).update(experience_year=1999, experience_years=99)
+        JobFeatures.objects.filter(job=jobs[0]).delete()
+
+        profiles = JobSeekerProfile.objects.in_bulk()
+        rows = [row for chunk in RowStream(JobSeekerProfile.objects.order_by('pk'), SlimSeeker, chunk_size=5) for row in chunk]
+        self.assertEqual(len(rows), len(seekers))
+        for row in rows:
+            profile = profiles[row.id]
+            self.assertEqual(experience_years_of(row, row.experience), experience_years_of(profile, profile.experience))
+            self.assertEqual(seeker_education_of(row, row.education), seeker_education_of(profile, profile.education))
+            self.assertEqual(location_place_of(row, row.location), location_place_of(profile, profile.location))
+            ratings = (row.average_rating, profile.average_rating)
+            self.assertEqual(*[float(rating) if rating is not None else None for rating in ratings])
+
+        postings = Job.objects.in_bulk()
+        rows = [row for chunk in RowStream(Job.objects.order_by('pk'), SlimJob, chunk_size=5) for row in chunk]
+        self.assertEqual(len(rows), len(jobs))
+        for row in rows:
+            job = postings[row.id]
+            self.assertEqual(job_education_of(row, row.requirements), job_education_of(job, job.requirements))
+            self.assertEqual(location_place_of(row, row.location), location_place_of(job, job.location))
+
+
+class GazetteerTests(SimpleTestCase):
+    """Free-text locations resolve to gazetteer places, scored by their haversine distance."""
+
+    def test_resolve_location(self):
+        from ml_training.gazetteer import resolve_location
+
+        cases = {
+            'Dar es Salaam': 1, ' DAR  es salaam ': 1, 'dsm': 1, 'Kariakoo': 3, '(Ilala)': 3,
+            # Most specific part first, regions by their capital
+            'Kibaha, Pwani': 7, 'Pwani': 7, 'Arusha Region': 13, 'Arusha - Tanzania': 13,
+            'Tanzania': None, 'Remote': None, 'Nairobi': None, '': None, None: None, 42: None,
+        }
+        for location, place in cases.items():
+            self.assertEqual(resolve_location(location), place, location)
+
+    def test_proximity_follows_distance(self):
+        import csv
+        from ml_training.gazetteer import (
+            GAZETTEER_PATH, NEARBY_DISTANCE_KM, NEARBY_MAX_SCORE, haversine_km, location_proximity, places_within,
+        )
+
+        with open(GAZETTEER_PATH, newline='', encoding='utf-8') as f:
+            places = {int(row['id']): (float(row['latitude']), float(row['longitude'])) for row in csv.DictReader(f)}
+        for a, (lat_a, lon_a) in places.items():
+            distances = {b: float(haversine_km(lat_a, lon_a, lat_b, lon_b)) for b, (lat_b, lon_b) in places.items()}
+            for b, distance in distances.items():
+                expected = NEARBY_MAX_SCORE * max(0.0, 1.0 - distance / NEARBY_DISTANCE_KM)
+                self.assertAlmostEqual(location_proximity(a, b), expected, places=9)
+            for max_distance_km in (0, 50, 300):
+                self.assertEqual(
+                    sorted(places_within(a, max_distance_km)),
+                    sorted(b for b, distance in distances.items() if distance <= max_distance_km),
+                )
+            self.assertEqual(location_proximity(a, None), 0.0)
+        self.assertEqual(location_proximity(None, None), 0.0)
+        self.assertEqual(places_within(None, 1000), [])
+        # Dar es Salaam and Kibaha are ~32 km apart, Arusha is out of range
+        self.assertAlmostEqual(location_proximity(1, 7), 0.609, places=3)
+        self.assertEqual(location_proximity(1, 13), 0.0)
+
+    def test_location_match_keeps_text_scores(self):
+        from itertools import product
+        from ml_training.enhanced_matching import enhanced_location_match, location_text_score
+        from ml_training.gazetteer import location_proximity, resolve_location
+
+        locations = ['Dar es Salaam', 'Dar', 'Kinondoni', 'Kibaha, Pwani', 'Arusha', 'Usa River', 'Remote', 'Nairobi', '']
+        for seeker_location, job_location, relocate in product(locations, locations, (False, True)):
+            text = location_text_score(seeker_location, job_location, relocate)
+            score = enhanced_location_match(seeker_location, job_location, relocate)
+            if seeker_location and job_location:
+                proximity = location_proximity(resolve_location(seeker_location), resolve_location(job_location))
+                self.assertEqual(score, max(text, proximity), (seeker_location, job_location))
+            else:
+                self.assertEqual(score, text)
+            # Resolved places passed in score the same
+            self.assertEqual(score, enhanced_location_match(
+                seeker_location, job_location, relocate, resolve_location(seeker_location), resolve_location(job_location),
+            ))
+
+
+class LSHRetrievalTests(TestCase):
+    """LSH buckets follow saves, and retrieval_ids falls back to the postings on short lists."""
+
+    def test_buckets_match_signatures(self):
+        from django.utils import timezone
+        from authentication.models import JobSeekerProfile
+        from core.ai.lsh_index import active_job_ids_for_lsh, available_seeker_ids_for_lsh, seeker_ids_for_lsh, skill_band_keys
+        from core.models import Job
+
+        _, jobs, seekers = _catalog(80, 20, 20)
+        jobs[0].skills = list(seekers[0].skills)
+        jobs[0].application_deadline = timezone.now().date()
+        jobs[0].save()
+        seekers[1].is_available = not seekers[1].is_available
+        seekers[1].save(update_fields=['is_available'])
+        jobs[2].delete()
+
+        today = timezone.now().date()
+        for seeker in JobSeekerProfile.objects.all():
+            keys = skill_band_keys(seeker.skills)
+            self.assertEqual(
+                {row['job_id'] for row in active_job_ids_for_lsh(seeker.skills)},
+                {job.pk for job in Job.objects.all() if job.application_deadline >= today and keys & skill_band_keys(job.skills)},
+            )
+        # Identical skill sets share every bucket
+        self.assertIn(jobs[0].pk, {row['job_id'] for row in active_job_ids_for_lsh(seekers[0].skills)})
+
+        for job in Job.objects.all():
+            keys = skill_band_keys(job.skills)
+            neighbors = [seeker for seeker in JobSeekerProfile.objects.all() if keys & skill_band_keys(seeker.skills)]
+            self.assertEqual({row['seeker_id'] for row in seeker_ids_for_lsh(job.skills)}, {seeker.pk for seeker in neighbors})
+            self.assertEqual(
+                {row['seeker_id'] for row in available_seeker_ids_for_lsh(job.skills)},
+                {seeker.pk for seeker in neighbors if seeker.is_available},
+            )
+
+    def test_retrieval_ids_falls_back_to_postings(self):
+        from core.ai.lsh_index import active_job_ids_for_lsh
+        from core.ai.skill_index import active_job_ids_for_skills, retrieval_ids
+
+        _, _, seekers = _catalog(81, 40, 1)
+        skills = seekers[0].skills
+        lsh = {row['job_id'] for row in active_job_ids_for_lsh(skills)}
+        postings = {row['job_id'] for row in active_job_ids_for_skills(skills)}
+        self.assertTrue(lsh)
+        self.assertNotEqual(lsh, postings)
+
+        def retrieved(mode, min_candidates):
+            with self.settings(RECOMMENDATION_RETRIEVAL=mode, RECOMMENDATION_LSH_MIN_CANDIDATES=min_candidates):
+                return {row['job_id'] for row in retrieval_ids(skills, active_job_ids_for_skills, active_job_ids_for_lsh)}
+
+        self.assertEqual(retrieved('postings', 0), postings)
+        self.assertEqual(retrieved('lsh', 0), lsh)
+        self.assertEqual(retrieved('lsh', len(lsh)), lsh)
+        # Short list under RECOMMENDATION_LSH_MIN_CANDIDATES
+        self.assertEqual(retrieved('lsh', len(lsh) + 1), postings)
+
+
+class TextIndexTests(TestCase):
+    """Similarities read from the segments equal a brute-force tf-idf, after builds and appends."""
+
+    def documents(self, seed, n, first_id=1):
+        import random
+
+        rnd = random.Random(seed)
+        words = "python django backend nurse clinic ward accounting ledger audit sales retail driver logistics data".split()
+        return [
+            (first_id + i, f"{rnd.choice(words).title()} role\n" + " ".join(rnd.choice(words) for _ in range(rnd.randint(0, 30))))
+            for i in range(n)
+        ]
+
+    def brute_force(self, fitted, texts):
+        """Dense tf-idf rows of texts with the idf of the `fitted` texts (sklearn's transformer)."""
+        from sklearn.feature_extraction.text import TfidfTransformer
+        from core.ai.text_index import _vectorizer
+
+        transformer = TfidfTransformer(sublinear_tf=True).fit(_vectorizer.transform(fitted))
+        return transformer.transform(_vectorizer.transform(texts)).astype(np.float64)
+
+    def assert_matches(self, index, documents, fitted):
+        from core.ai.text_index import seeker_experience_text
+
+        rows = self.brute_force(fitted, [text for _, text in documents])
+        np.testing.assert_array_equal(index.ids, [job_id for job_id, _ in documents])
+        queries = ["python django", "Nurse at the ward clinic", "the", "", "audit audit ledger retail"]
+        expected = (self.brute_force(fitted, queries) @ rows.T).toarray()
+        for query, similarities in zip(queries, expected):
+            np.testing.assert_allclose(index.similarities(query), similarities, rtol=0, atol=1e-5)
+        # One job's vector against many texts
+        experience = [[{'title': query}] for query in queries]
+        for position in (0, len(documents) - 1):
+            vector = index.job_vector(documents[position][0])
+            np.testing.assert_allclose(
+                index.text_similarities([seeker_experience_text(item) for item in experience], *vector),
+                expected[:, position], rtol=0, atol=1e-5,
+            )
+        self.assertIsNone(index.job_vector(10**6))
+        similarities = index.similarities(queries[0])
+        np.testing.assert_allclose(
+            index.similarity_of(similarities, [documents[1][0], 10**6]), [expected[0, 1], 0.0], rtol=0, atol=1e-5,
+        )
+
+    def test_build_and_append(self):
+        import tempfile
+        from unittest import mock
+        from core.ai import text_index
+
+        documents = self.documents(90, 40)
+        with tempfile.TemporaryDirectory() as root, mock.patch.object(text_index, 'SEGMENT_ROWS', 8):
+            built = text_index.build_text_index(root, lambda: iter(documents[:25]), batch_size=3)
+            self.assertEqual((built['documents'], built['segments']), (25, 4))
+            index = text_index.TextIndex(os.path.join(root, built['name']))
+            self.assert_matches(index, documents[:25], [text for _, text in documents[:25]])
+
+            # Appended rows keep the idf of the build
+            appended = text_index.append_text_index(root, lambda min_id: iter(d for d in documents if d[0] > min_id))
+            self.assertEqual((appended['name'], appended['appended'], appended['segments']), (built['name'], 15, 6))
+            index = text_index.TextIndex(os.path.join(root, built['name']))
+            self.assert_matches(index, documents, [text for _, text in documents[:25]])
+            self.assertEqual(text_index.append_text_index(root, lambda min_id: iter(()))['appended'], 0)
+
+            # A full build recomputes it
+            rebuilt = text_index.build_text_index(root, lambda: iter(documents))
+            self.assertEqual(text_index.current_name(root), rebuilt['name'])
+            self.assert_matches(text_index.TextIndex(os.path.join(root, rebuilt['name'])), documents, [text for _, text in documents])
+
+    def test_build_text_index_command(self):
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+        from core.ai import text_index
+        from core.models import Job
+
+        with tempfile.TemporaryDirectory() as root, override_settings(RECOMMENDATION_TEXT_INDEX_DIR=root):
+            _catalog(91, 6, 0)
+            call_command('build_text_index', stdout=StringIO())
+            for job in Job.objects.all()[:3]:
+                job.pk = None
+                job.save()
+            out = StringIO()
+            call_command('build_text_index', '--append', stdout=out)
+            self.assertIn('Appended 3 jobs', out.getvalue())
+            index = text_index.TextIndex(os.path.join(root, text_index.current_name(root)))
+            self.assertEqual(len(index.segments), 2)
+            documents = list(text_index._job_documents())
+            self.assert_matches(index, documents, [text for _, text in documents[:6]])
+
+
+class PredictionCacheTests(SimpleTestCase):
+    """cached_predict_proba returns what the model's predict_proba does, whatever the cache holds."""
+
+    def rows(self, loaded, seed):
+        """Training rows, duplicates and values on, just below and just above the split borders."""
+        import pandas as pd
+        from core.management.commands.export_tree_models import TRAINING_DATA
+
+        data = pd.read_csv(os.path.join(settings.BASE_DIR, 'ml_training', 'data', TRAINING_DATA[loaded.name]))
+        X = data[loaded.model.feature_names_].to_numpy(dtype=np.float32)[:500]
+        rng = np.random.default_rng(seed)
+        borders = loaded.model.get_borders()
+        edges = X[rng.integers(0, len(X), 300)].copy()
+        for row in edges:
+            feature = int(rng.integers(0, X.shape[1]))
+            if borders.get(feature):
+                border = np.float32(rng.choice(borders[feature]))
+                row[feature] = rng.choice([border, np.nextafter(border, np.float32(-np.inf)), np.nextafter(border, np.float32(np.inf))])
+        return np.concatenate([X, edges, X[:50]])
+
+    def test_cached_equals_uncached(self):
+        from core.ai.model_registry import registry
+        from core.ai.prediction_cache import PredictionCache
+
+        for name in ('job', 'candidate'):
+            loaded = registry.entry(name)
+            X = self.rows(loaded, seed=len(name))
+            expected = loaded.model.predict_proba(X)[:, 1]
+            for max_entries in (0, 7, 100_000):
+                with self.subTest(model=name, max_entries=max_entries):
+                    cache = PredictionCache(max_entries)
+                    # Cold, warm, then row subsets in another order
+                    np.testing.assert_allclose(cache.predict(loaded, X), expected, rtol=0, atol=1e-12)
+                    np.testing.assert_allclose(cache.predict(loaded, X), expected, rtol=0, atol=1e-12)
+                    order = np.random.default_rng(0).permutation(len(X))[:200]
+                    np.testing.assert_allclose(cache.predict(loaded, X[order]), expected[order], rtol=0, atol=1e-12)
+                    if max_entries > len(X):
+                        self.assertEqual(cache.stats()['model_calls'], 1)
+
+            # Bucket vectors too wide for an int64 code are keyed by their bytes
+            cache = PredictionCache(100_000)
+            cache.predict(loaded, X[:10])
+            cache._weights = None
+            cache._entries.clear()
+            np.testing.assert_allclose(cache.predict(loaded, X), expected, rtol=0, atol=1e-12)
+            np.testing.assert_allclose(cache.predict(loaded, X), expected, rtol=0, atol=1e-12)
+
+    def test_new_model_version_clears_entries(self):
+        from types import SimpleNamespace
+        from core.ai.model_registry import registry
+        from core.ai.prediction_cache import PredictionCache
+
+        loaded = registry.entry('job')
+        X = self.rows(loaded, seed=1)
+        cache = PredictionCache(100_000)
+        cache.predict(loaded, X)
+        # Another version of the model: every cached probability is stale
+        retrained = SimpleNamespace(
+            name='job', checksum='retrained', model=SimpleNamespace(
+                get_borders=loaded.model.get_borders, predict_proba=lambda X: np.column_stack([np.zeros(len(X)), np.full(len(X), 0.25)]),
+            ),
+        )
+        np.testing.assert_array_equal(cache.predict(retrained, X), np.full(len(X), 0.25))
+        self.assertEqual(cache.stats()['invalidations'], 2)
+
+
+class ExplainTests(TestCase):
+    """Explanations carry the returned items' scores, feature rows and SHAP values adding up to the model score."""
+
+    def assert_explained(self, name, explained, plain, features_of, model_scores=True):
+        from scipy.special import expit
+        from core.ai.explain import catboost_model
+
+        item_key = 'job' if name == 'job' else 'seeker'
+        records = [item[item_key] for item in explained]
+        self.assertEqual([(r.id, r.score, r.engine) for r in records], [(r.id, r.score, r.engine) for r in plain])
+        if not records:
+            return
+        X = features_of([record.obj for record in records])
+        probabilities = catboost_model(name).predict_proba(X)[:, 1]
+        for item, row, probability in zip(explained, X, probabilities):
+            record = item[item_key]
+            self.assertEqual(item['score'], record.score)
+            np.testing.assert_allclose(list(item['features'].values()), row, rtol=0, atol=1e-5)
+            # The contributions add up to the model's log-odds
+            self.assertAlmostEqual(float(expit(sum(item['shap'].values()) + item['expected_value'])), probability, places=4)
+            if record.engine == 'ml' and model_scores:
+                self.assertAlmostEqual(record.score, probability, places=4)
+
+    def test_explain_matches_recommendations(self):
+        import contextlib
+        import io
+        from unittest import mock
+        from core.ai.candidate_recommendation import extract_candidate_feature_matrix, get_candidate_recommendations_for_job
+        from core.ai.job_recommendation import extract_job_feature_matrix, get_job_recommendations_for_seeker
+
+        _, jobs, seekers = _catalog(100, 25, 25)
+        engines = set()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for seeker in seekers[:8]:
+                explained = get_job_recommendations_for_seeker(seeker, explain=True)
+                plain = get_job_recommendations_for_seeker(seeker)
+                engines.update(record.engine for record in plain)
+                self.assert_explained('job', explained, plain, lambda objs: extract_job_feature_matrix(seeker, objs))
+            # ML results reuse the rows they were scored with
+            with mock.patch('core.ai.ml_stage.cached_predict_proba', lambda loaded, X: 0.4 + _hashed_scores(loaded, X)):
+                for seeker in seekers:
+                    plain = get_job_recommendations_for_seeker(seeker)
+                    if len(plain) > 1 and plain[0].engine == 'ml':
+                        break
+                explained = get_job_recommendations_for_seeker(seeker, explain=True)
+            self.assertEqual((len(plain) > 1, {record.engine for record in plain}), (True, {'ml'}))
+            self.assert_explained('job', explained, plain, lambda objs: extract_job_feature_matrix(seeker, objs), False)
+            # Rule-based results get their rows built for the explanation
+            with mock.patch('core.ai.ml_stage.cached_predict_proba', lambda loaded, X: np.zeros(len(X))):
+                explained = get_job_recommendations_for_seeker(seekers[0], explain=True)
+                plain = get_job_recommendations_for_seeker(seekers[0])
+            self.assertTrue(plain)
+            self.assertEqual({record.engine for record in plain}, {'rule_based'})
+            self.assert_explained('job', explained, plain, lambda objs: extract_job_feature_matrix(seekers[0], objs))
+            for job in jobs[:8]:
+                explained = get_candidate_recommendations_for_job(job, explain=True)
+                plain = get_candidate_recommendations_for_job(job)
+                engines.update(record.engine for record in plain)
+                self.assert_explained('candidate', explained, plain, lambda objs: extract_candidate_feature_matrix(job, objs))
+        self.assertIn('ml', engines)
+
+    def test_explain_endpoints(self):
+        import contextlib
+        import io
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+        from core.ai.candidate_recommendation import get_candidate_recommendations_for_job
+        from core.ai.job_recommendation import get_job_recommendations_for_seeker
+
+        recruiter, jobs, seekers = _catalog(101, 10, 10)
+        client = APIClient()
+        requests = [
+            (recruiter.user, reverse('candidate-recommendation', args=[jobs[0].pk]),
+             lambda: get_candidate_recommendations_for_job(jobs[0], explain=True)),
+            (seekers[0].user, reverse('job-recommendation'), lambda: get_job_recommendations_for_seeker(seekers[0], explain=True)),
+        ]
+        with contextlib.redirect_stdout(io.StringIO()):
+            for user, url, explain in requests:
+                client.force_authenticate(user)
+                response = client.get(url, {'explain': '1'})
+                self.assertEqual((response.status_code, bool(response.data)), (200, True))
+                explained = explain()
+                self.assertEqual([item['id'] for item in response.data], [item.get('job', item.get('seeker')).id for item in explained])
+                for item, explanation in zip(response.data, explained):
+                    self.assertEqual(set(item['explanation']), {'features', 'shap', 'expected_value'})
+                    self.assertEqual(item['explanation']['shap'], explanation['shap'])
+                    self.assertEqual(item['score'], round(explanation['score'], 4))
+                self.assertNotIn('explanation', client.get(url).data[0])
+
+
+class RecommendationRecordTests(TestCase):
+    """Engines return score-carrying records, served as such from storage and by the endpoints."""
+
+    def setUp(self):
+        from core.ai.result_cache import get_result_cache
+
+        # Version counters restart with each test's database
+        get_result_cache().clear()
+        self.addCleanup(get_result_cache().clear)
+
+    def assert_records(self, records, seeker_of, job_of):
+        from core.ai.results import ENGINES
+        from ml_training.enhanced_matching import get_matching_skills
+
+        for record in records:
+            self.assertEqual(record.id, record.obj.pk)
+            self.assertIn(record.engine, ENGINES)
+            seeker, job = seeker_of(record), job_of(record)
+            self.assertEqual(record.matched_skills, tuple(sorted(get_matching_skills(seeker.skills, job.skills)[0])))
+
+    def test_engine_and_stored_records(self):
+        import contextlib
+        import io
+        from unittest import mock
+        from core.ai.candidate_recommendation import get_candidate_recommendations_for_job
+        from core.ai.recommendation_store import materialized_job_recommendations, refresh_job_recommendations
+
+        _, jobs, seekers = _catalog(110, 20, 20)
+        engines = set()
+        # Job model scores reaching the threshold, then none (rule-based results)
+        job_scores = [lambda loaded, X: 0.4 + _hashed_scores(loaded, X), lambda loaded, X: np.zeros(len(X))]
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i, seeker in enumerate(seekers[:10]):
+                with mock.patch('core.ai.ml_stage.cached_predict_proba', job_scores[i % 2]):
+                    live = refresh_job_recommendations(seeker)
+                engines.update(record.engine for record in live)
+                self.assert_records(live, lambda record: seeker, lambda record: record.obj)
+                # Stored rows give back the records (scores rounded to 4 digits)
+                stored = materialized_job_recommendations(seeker)
+                self.assertEqual(
+                    [(r.id, r.matched_skills, r.engine) for r in stored], [(r.id, r.matched_skills, r.engine) for r in live],
+                )
+                for stored_record, record in zip(stored, live):
+                    self.assertAlmostEqual(stored_record.score, record.score, places=4)
+            for job in jobs[:10]:
+                recommended = get_candidate_recommendations_for_job(job)
+                engines.update(record.engine for record in recommended)
+                self.assert_records(recommended, lambda record: record.obj, lambda record: job)
+        self.assertTrue({'ml', 'rule_based'} <= engines, engines)
+
+    def test_serialized_recommendations(self):
+        import contextlib
+        import io
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+        from authentication.serializers import JobSeekerProfileSerializer
+        from core.ai.candidate_recommendation import get_candidate_recommendations_for_job
+        from core.ai.results import Recommendation
+        from core.serializers import JobSerializer, RecommendedJobSerializer
+
+        recruiter, jobs, seekers = _catalog(111, 10, 10)
+        records = [Recommendation(job, 0.123456, ['sql', 'python'], 'rule_based') for job in jobs[:3]]
+        for item, job in zip(RecommendedJobSerializer(records, many=True).data, jobs):
+            self.assertEqual(item, dict(JobSerializer(job).data, score=0.1235, matched_skills=['python', 'sql'], engine='rule_based'))
+
+        client = APIClient()
+        client.force_authenticate(recruiter.user)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for job in jobs[:5]:
+                expected = get_candidate_recommendations_for_job(job)
+                data = client.get(reverse('candidate-recommendation', args=[job.pk])).data
+                self.assertEqual(len(data), len(expected))
+                for item, record in zip(data, expected):
+                    self.assertEqual({key: item[key] for key in JobSeekerProfileSerializer(record.obj).data}, JobSeekerProfileSerializer(record.obj).data)
+                    self.assertEqual(
+                        (item['score'], item['matched_skills'], item['engine'], item['match_score']),
+                        (round(record.score, 4), list(record.matched_skills), record.engine, round(round(record.score, 4) * 100, 1)),
+                    )
+
+
+class RejectedJobTypesTests(SimpleTestCase):
+    """rejected_job_types rules out what job_type_match scores 0, and nothing on malformed preferences."""
+
+    def test_rejected_job_types(self):
+        from core.models import JOB_TYPE_CHOICES
+        from core.ai.skill_index import rejected_job_types
+        from ml_training.enhanced_matching import job_type_match
+
+        for preferences in (['FULL_TIME'], ['internship', 'Temporary'], ['CONTRACT', 'PART_TIME']):
+            expected = [job_type for job_type, _ in JOB_TYPE_CHOICES if job_type_match(preferences, job_type) == 0]
+            self.assertEqual(rejected_job_types(preferences), expected)
+        self.assertEqual(rejected_job_types([]), [])
+        self.assertEqual(rejected_job_types(None), [])
+        for junk in ([None, 3], 5, [{'type': 'FULL_TIME'}]):
+            self.assertEqual(rejected_job_types(junk), [])
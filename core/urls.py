@@ -3,6 +3,7 @@ from .views import (
     JobCreateView,
     JobListView,
     JobDetailView,
+    JobSearchView,
     ApplicationCreateView,
     ApplicationListView,
     JobRecommendationView,
@@ -25,6 +26,7 @@ from .views import (
 urlpatterns = [
     path('jobs/', JobListView.as_view(), name='job-list'),
     path('jobs/create/', JobCreateView.as_view(), name='job-create'),
+    path('jobs/search/', JobSearchView.as_view(), name='job-search'),
     path('jobs/<int:pk>/', JobDetailView.as_view(), name='job-detail'),
     path('jobs/<int:pk>/update-next-step/', JobUpdateNextStepView.as_view(), name='job-update-next-step'),
     path('jobs/employer/', EmployerJobsView.as_view(), name='employer-jobs'),
@@ -6,19 +6,35 @@ from .models import Job, Application, FeedbackRating
 from .serializers import (
     JobSerializer,
     ApplicationSerializer,
-    FeedbackRatingSerializer
+    FeedbackRatingSerializer,
+    RecommendedJobSerializer,
+    RecommendedCandidateSerializer
 )
-from authentication.serializers import JobSeekerProfileSerializer
-from .ai.job_recommendation import get_job_recommendations_for_seeker
 from .ai.candidate_recommendation import get_candidate_recommendations_for_job
+from .ai.job_recommendation import get_job_recommendations_for_seeker
+from .ai.prediction_cache import prediction_cache_stats
+from .ai.recommendation_store import job_recommendations, schedule_merge
+from .ai.result_cache import cached_candidate_recommendations_for_job, result_cache_stats
+from .ai.text_index import search_jobs
+from ml_training.gazetteer import resolve_location
 from rest_framework.views import APIView
 from django.utils import timezone
 from datetime import timedelta
 from rest_framework.exceptions import PermissionDenied
 from django.http import JsonResponse
+from django.db import transaction
+from django.db.models import Q
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Create your views here.
 
+def _attach_explanations(data, explained):
+    """Add the features and SHAP values of each recommendation to its serialized item."""
+    for item, explanation in zip(data, explained):
+        item['explanation'] = {key: value for key, value in explanation.items() if key not in ('job', 'seeker', 'score')}
+
 class JobInviteApplicantView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -63,7 +79,10 @@ class JobCreateView(generics.CreateAPIView):
         user = self.request.user
         if not hasattr(user, 'recruiter_profile'):
             raise permissions.exceptions.PermissionDenied('Only recruiters can post jobs.')
-        serializer.save(recruiter=user.recruiter_profile)
+        job = serializer.save(recruiter=user.recruiter_profile)
+        # Push the job into the stored recommendations of the seekers it matches,
+        # on a timer thread once the job is committed
+        transaction.on_commit(lambda: schedule_merge(job.pk))
 
 class JobListView(generics.ListAPIView):
     queryset = Job.objects.all()
@@ -71,6 +90,44 @@ class JobListView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
 
 
+class JobSearchView(generics.GenericAPIView):
+    """
+    GET /api/jobs/search/?q=<text>[&limit=<n>]
+    Open jobs ranked by the cosine similarity of their title and description
+    with the query, read from the TF-IDF text index (core.ai.text_index).
+    Each job carries its similarity as search_score. Until the index is
+    built, jobs whose title or description contains the query are returned
+    newest first, without a score.
+    """
+    serializer_class = JobSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'detail': 'The q parameter is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            return Response({'detail': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(max(limit, 1), 100)
+
+        results = search_jobs(query, limit)
+        if results is None:
+            logger.debug("No text index built, searching job titles and descriptions")
+            jobs = (
+                Job.objects
+                .filter(Q(title__icontains=query) | Q(description__icontains=query), application_deadline__gte=timezone.now().date())
+                .order_by('-posted_at')[:limit]
+            )
+            results = [(job, None) for job in jobs]
+        logger.debug("Job search %r: %d results", query, len(results))
+
+        data = self.get_serializer([job for job, _ in results], many=True).data
+        for item, (_, score) in zip(data, results):
+            item['search_score'] = None if score is None else round(score, 4)
+        return Response(data)
+
 class JobDetailView(generics.RetrieveAPIView):
     """View to retrieve job details by ID, accessible by anyone"""
     queryset = Job.objects.all()
@@ -138,35 +195,56 @@ class ApplicationListView(generics.ListAPIView):
         return Application.objects.none()
 
 class JobRecommendationView(generics.GenericAPIView):
-    serializer_class = JobSerializer
+    """
+    GET /api/jobs/recommended/
+    Served from the versioned result cache while none of its inputs changed,
+    else from the seeker's materialized recommendations (SeekerRecommendation)
+    while they are fresh, else scored live and stored.
+    Staff users can add ?diagnostics=1 to also receive the engine used, the
+    top model scores of the request and the worker's cache counters.
+    Every job carries the score, matched skills and engine it was recommended with;
+    ?explain=1 scores live and adds each job's features and SHAP values.
+    """
+    serializer_class = RecommendedJobSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
         user = request.user
         if not hasattr(user, 'seeker_profile'):
             return Response({'detail': 'Only job seekers can get recommendations.'}, status=403)
-        jobs = Job.objects.all()
-        recommended = get_job_recommendations_for_seeker(user.seeker_profile, jobs)
+        # Score diagnostics are opt-in and reuse the scores computed for ranking
+        want_diagnostics = user.is_staff and request.query_params.get('diagnostics') in ('1', 'true')
+        want_explain = request.query_params.get('explain') in ('1', 'true')
+        diagnostics = {}
+        if want_explain:
+            # Stored and cached results keep no feature rows, so explanations are scored live
+            explained = get_job_recommendations_for_seeker(user.seeker_profile, explain=True, diagnostics=diagnostics)
+            recommended = [item['job'] for item in explained]
+        else:
+            # Cached result while no input changed, else the materialized row while fresh, else live scoring
+            recommended = job_recommendations(user.seeker_profile, diagnostics=diagnostics)
         print(f"[DEBUG] Recommended jobs count: {len(recommended)}")
         print(f"[DEBUG] Recommended job IDs: {[job.id for job in recommended]}")
-        # Check if model is being used: print top scores
-        import numpy as np
-        from core.ai.job_recommendation import extract_job_features
-        features = [extract_job_features(user.seeker_profile, job) for job in jobs]
-        if features:
-            X = np.stack(features)
-            from catboost import CatBoostClassifier
-            import os
-            model_path = os.path.join(os.path.dirname(__file__), 'ai/models/job_recommendation_model.cbm')
-            catboost_model = CatBoostClassifier()
-            catboost_model.load_model(model_path)
-            scores = catboost_model.predict_proba(X)[:, 1]
-            print(f"[DEBUG] Top 10 CatBoost scores: {sorted(scores, reverse=True)[:10]}")
+        if diagnostics.get('top_scores'):
+            print(f"[DEBUG] Top 10 CatBoost scores: {diagnostics['top_scores']}")
         serializer = self.get_serializer(recommended, many=True)
-        return Response(serializer.data)
+        data = serializer.data
+        if want_explain:
+            _attach_explanations(data, explained)
+        if want_diagnostics:
+            diagnostics['prediction_cache'] = prediction_cache_stats()
+            diagnostics['result_cache_stats'] = result_cache_stats()
+            return Response({'results': data, 'diagnostics': diagnostics})
+        return Response(data)
 
 class CandidateRecommendationView(generics.GenericAPIView):
-    serializer_class = JobSeekerProfileSerializer
+    """
+    GET /api/jobs/<job_id>/candidates/
+    Every candidate carries the score, matched skills and engine it was recommended
+    with; ?explain=1 scores live and adds each candidate's features and SHAP values.
+    ?max_distance_km=<km> keeps the candidates located within that distance of the job.
+    """
+    serializer_class = RecommendedCandidateSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request, job_id):
@@ -178,39 +256,47 @@ class CandidateRecommendationView(generics.GenericAPIView):
         except Job.DoesNotExist:
             return Response({'detail': 'Job not found or not owned by recruiter.'}, status=404)
             
-        from authentication.models import JobSeekerProfile
-        
-        # Get all job seekers but filter out those without key profile data
-        seekers = JobSeekerProfile.objects.filter(is_available=True)
-        print(f"[DEBUG] Total available job seekers: {seekers.count()}")
-        
         # Get job details for debugging
         print(f"[DEBUG] Job ID: {job.id}, Title: {job.title}")
         print(f"[DEBUG] Job Skills: {job.skills}")
         print(f"[DEBUG] Job Description Length: {len(job.description) if job.description else 0}")
         
-        # Get recommendations
-        recommended = get_candidate_recommendations_for_job(job, seekers)
+        # Optional distance filter, applied by the database to the candidate set
+        filters = {}
+        if 'max_distance_km' in request.query_params:
+            try:
+                filters['max_distance_km'] = float(request.query_params['max_distance_km'])
+            except ValueError:
+                filters['max_distance_km'] = float('nan')
+            if not filters['max_distance_km'] >= 0:
+                return Response({'detail': 'max_distance_km must be a non-negative number.'}, status=status.HTTP_400_BAD_REQUEST)
+            if resolve_location(job.location) is None:
+                return Response({'detail': 'Job location is not a known place, max_distance_km cannot be applied.'}, status=status.HTTP_400_BAD_REQUEST)
+            
+        # Get recommendations; candidates are the available seekers found
+        # through the skill index, cached until the job or the seekers change
+        if request.query_params.get('explain') in ('1', 'true'):
+            explained = get_candidate_recommendations_for_job(job, explain=True, **filters)
+            recommended = [item['seeker'] for item in explained]
+        else:
+            explained = None
+            recommended = cached_candidate_recommendations_for_job(job, **filters)
         print(f"[DEBUG] Recommended candidates count: {len(recommended)}")
         print(f"[DEBUG] Recommended candidate IDs: {[seeker.id for seeker in recommended]}")
         
-        # Enhance response with match scores and application status
+        # Serialized with the engine's own scores; enhance response with application status
         serializer = self.get_serializer(recommended, many=True)
         data = serializer.data
+        if explained is not None:
+            _attach_explanations(data, explained)
 
         # Preload all applications for this job in one query
         applications = Application.objects.filter(job=job)
         seeker_to_app = {app.seeker_id: app for app in applications}
 
-        for i, candidate in enumerate(data):
-            # Calculate a simple match score based on skills overlap
-            job_skills = set(skill.lower() for skill in job.skills) if job.skills else set()
-            candidate_skills = set(skill.lower() for skill in candidate.get('skills', []))
-            if job_skills and candidate_skills:
-                match_score = len(job_skills.intersection(candidate_skills)) / len(job_skills) * 100
-                candidate['match_score'] = round(match_score, 1)
-            else:
-                candidate['match_score'] = 50.0  # Default score
+        for candidate in data:
+            # Percentage form of the engine score, kept for existing clients
+            candidate['match_score'] = round(candidate['score'] * 100, 1)
 
             # Attach application info if exists
             seeker_id = candidate.get('id') or candidate.get('profile_id')
@@ -33,3 +33,17 @@ preload_app = True
 
 # Clean up worker processes when they die
 worker_tmp_dir = "/dev/shm"
+
+def when_ready(server):
+    # Load the recommendation models once in the master so the forked workers
+    # share their pages instead of each loading its own copy on first request
+    from core.ai.model_registry import registry
+    registry.warm()
+
+    # Map the matching snapshot once as well: its pages stay shared by every worker
+    from core.ai.snapshot import store
+    store.get()
+
+    # And the text index of job descriptions
+    from core.ai.text_index import store as text_index_store
+    text_index_store.get()
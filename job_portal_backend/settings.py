@@ -134,3 +134,55 @@ CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_HEADERS = ['*']
 CORS_ALLOW_METHODS = ['*']
+
+# Recommendation models
+# Seconds between checks of the .cbm files for a retrained model to hot-swap in
+RECOMMENDATION_MODEL_CHECK_INTERVAL = float(os.environ.get('RECOMMENDATION_MODEL_CHECK_INTERVAL', 5))
+# 'catboost' scores with the .cbm files, 'numpy' with their .npz export (manage.py export_tree_models)
+RECOMMENDATION_MODEL_BACKEND = os.environ.get('RECOMMENDATION_MODEL_BACKEND', 'catboost')
+# Seconds a seeker's materialized recommendations are served before being recomputed
+RECOMMENDATION_MAX_AGE = int(os.environ.get('RECOMMENDATION_MAX_AGE', 6 * 60 * 60))
+# Seconds between a profile edit and the recompute of that seeker's recommendations; edits
+# within the window collapse into one recompute (0 leaves dirty seekers to the next read).
+# New jobs are merged into the stored recommendations after the same delay (0 merges in the request)
+RECOMMENDATION_RECOMPUTE_DELAY = float(os.environ.get('RECOMMENDATION_RECOMPUTE_DELAY', 10))
+# Candidate rows read and scored per chunk; bounds a request's memory whatever the table sizes
+RECOMMENDATION_STREAM_CHUNK_SIZE = int(os.environ.get('RECOMMENDATION_STREAM_CHUNK_SIZE', 2000))
+# Directory of the memory-mapped matching snapshots (manage.py build_matching_snapshot)
+RECOMMENDATION_SNAPSHOT_DIR = os.environ.get('RECOMMENDATION_SNAPSHOT_DIR', os.path.join(BASE_DIR, 'snapshots'))
+# Jobs (or seekers) changed since the snapshot's build that are streamed from the database
+# next to it; past this many the catalog is streamed whole until the next build
+RECOMMENDATION_SNAPSHOT_MAX_CHANGED = int(os.environ.get('RECOMMENDATION_SNAPSHOT_MAX_CHANGED', 1000))
+# Directory of the memory-mapped TF-IDF index of job descriptions (manage.py build_text_index)
+RECOMMENDATION_TEXT_INDEX_DIR = os.environ.get('RECOMMENDATION_TEXT_INDEX_DIR', os.path.join(BASE_DIR, 'text_index'))
+# Weight of the seeker experience / job description cosine similarity added to the ML job
+# scores (0 ranks on the model alone)
+RECOMMENDATION_TEXT_WEIGHT = float(os.environ.get('RECOMMENDATION_TEXT_WEIGHT', 0))
+# Candidate retrieval in front of both engines: 'postings' (every entity sharing a skill) or
+# 'lsh' (approximate high-Jaccard neighbors from the MinHash buckets, see core/ai/lsh_index.py)
+RECOMMENDATION_RETRIEVAL = os.environ.get('RECOMMENDATION_RETRIEVAL', 'postings')
+# MinHash bands x rows per band; changing them needs `manage.py rebuild_lsh_index`
+RECOMMENDATION_LSH_BANDS = int(os.environ.get('RECOMMENDATION_LSH_BANDS', 32))
+RECOMMENDATION_LSH_ROWS = int(os.environ.get('RECOMMENDATION_LSH_ROWS', 4))
+# LSH short lists smaller than this fall back to the skill postings
+RECOMMENDATION_LSH_MIN_CANDIDATES = int(os.environ.get('RECOMMENDATION_LSH_MIN_CANDIDATES', 20))
+# Recommendation results kept per worker, invalidated through version counters (0 disables the cache)
+RECOMMENDATION_RESULT_CACHE_SIZE = int(os.environ.get('RECOMMENDATION_RESULT_CACHE_SIZE', 10000))
+# Feature-bucket vectors whose predictions are memoized per model and worker (0 disables the cache).
+# Off by default for the NumPy backend, which scores a batch faster than the cache can look it up.
+RECOMMENDATION_PREDICTION_CACHE_SIZE = int(os.environ.get(
+    'RECOMMENDATION_PREDICTION_CACHE_SIZE', 100000 if RECOMMENDATION_MODEL_BACKEND == 'catboost' else 0
+))
+
+# Operational messages of the recommendation engines (model loads, index swaps, background
+# merges and recomputes) go to the console at RECOMMENDATION_LOG_LEVEL
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core': {'handlers': ['console'], 'level': os.environ.get('RECOMMENDATION_LOG_LEVEL', 'INFO')},
+    },
+}
@@ -0,0 +1,6 @@
+"""
+Training data generation, model training and the matching helpers shared
+with the recommendation engines (enhanced_matching, feature_extraction,
+gazetteer). The training scripts run from this directory and import their
+siblings flat; the engines import them as ml_training.<module>.
+"""
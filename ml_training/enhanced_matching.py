@@ -3,160 +3,257 @@ Enhanced matching functions for recommendation system
 These functions improve matching quality by handling real-world data variations
 """
 from datetime import datetime
-from typing import List, Dict, Any, Union, Set, Tuple
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Union, Set, Tuple, FrozenSet, AbstractSet, Iterable
 import re
+import threading
 
-def normalize_skills(skills_list: List[str]) -> List[str]:
+from ml_training.gazetteer import NEARBY_MAX_SCORE, location_proximity, resolve_location
+
+# Canonical skill -> known variations
+SKILL_MAPPING: Dict[str, List[str]] = {
+    # Programming Languages
+    "javascript": ["javascript", "js", "java script", "ecmascript"],
+    "python": ["python", "py", "python3", "python programming"],
+    "java": ["java", "java programming", "core java", "java se", "java ee"],
+    "c#": ["c#", "csharp", "c sharp", ".net c#"],
+    "c++": ["c++", "cpp", "c plus plus"],
+    "php": ["php", "php development", "php programming"],
+    "ruby": ["ruby", "ruby programming", "ruby on rails", "rails"],
+    "swift": ["swift", "swift programming", "ios development"],
+    "kotlin": ["kotlin", "kotlin programming", "android kotlin"],
+    "go": ["go", "golang", "go programming"],
+    "rust": ["rust", "rust programming"],
+    "typescript": ["typescript", "ts", "type script"],
+    
+    # Frontend Frameworks
+    "react": ["react", "reactjs", "react.js", "react js", "react native"],
+    "angular": ["angular", "angularjs", "angular js", "angular 2+"],
+    "vue": ["vue", "vuejs", "vue.js", "vue js"],
+    "svelte": ["svelte", "sveltejs", "svelte framework"],
+    "jquery": ["jquery", "jquery library"],
+    
+    # Backend Frameworks
+    "node.js": ["node.js", "nodejs", "node js", "node", "express.js", "expressjs"],
+    "django": ["django", "django framework", "python django"],
+    "flask": ["flask", "flask framework", "python flask"],
+    "spring": ["spring", "spring boot", "spring framework", "java spring"],
+    "laravel": ["laravel", "php laravel", "laravel framework"],
+    "asp.net": ["asp.net", "asp net", "asp.net mvc", "asp.net core"],
+    
+    # Mobile Development
+    "flutter": ["flutter", "flutter framework", "flutter development", "dart flutter"],
+    "react native": ["react native", "react-native", "reactnative"],
+    "android": ["android", "android development", "android studio"],
+    "ios": ["ios", "ios development", "swift ios", "objective-c"],
+    "xamarin": ["xamarin", "xamarin forms", "xamarin.forms"],
+    
+    # Database
+    "sql": ["sql", "structured query language", "sql queries"],
+    "mysql": ["mysql", "my sql", "mysql database"],
+    "postgresql": ["postgresql", "postgres", "postgres sql", "postgre"],
+    "mongodb": ["mongodb", "mongo", "mongo db", "nosql"],
+    "sqlite": ["sqlite", "sqlite3", "sql lite"],
+    "oracle": ["oracle", "oracle database", "oracle db", "pl/sql"],
+    "redis": ["redis", "redis cache", "redis database"],
+    "firebase": ["firebase", "firebase database", "firestore"],
+    
+    # DevOps & Cloud
+    "aws": ["aws", "amazon web services", "amazon aws", "ec2", "s3", "lambda"],
+    "azure": ["azure", "microsoft azure", "azure cloud"],
+    "gcp": ["gcp", "google cloud", "google cloud platform"],
+    "docker": ["docker", "docker container", "containerization"],
+    "kubernetes": ["kubernetes", "k8s", "k-8-s"],
+    "jenkins": ["jenkins", "jenkins ci", "jenkins pipeline"],
+    "git": ["git", "github", "gitlab", "git version control"],
+    "terraform": ["terraform", "terraform iac", "hashicorp terraform"],
+    
+    # Web Development
+    "html": ["html", "html5", "hypertext markup language"],
+    "css": ["css", "css3", "cascading style sheets", "scss", "sass"],
+    "bootstrap": ["bootstrap", "bootstrap framework", "bootstrap css"],
+    "tailwind": ["tailwind", "tailwindcss", "tailwind css"],
+    "web development": ["web development", "web dev", "website development", "frontend development", "backend development"],
+    "responsive design": ["responsive design", "responsive web design", "mobile-first design"],
+    "pwa": ["pwa", "progressive web app", "progressive web application"],
+    
+    # Data Science & AI
+    "machine learning": ["machine learning", "ml", "machine learning algorithms"],
+    "deep learning": ["deep learning", "dl", "neural networks", "cnn", "rnn", "lstm"],
+    "data science": ["data science", "data scientist", "data analytics"],
+    "data analysis": ["data analysis", "data analytics", "data analyst", "data visualization"],
+    "tensorflow": ["tensorflow", "tf", "tensor flow"],
+    "pytorch": ["pytorch", "torch", "py torch"],
+    "scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
+    "nlp": ["nlp", "natural language processing", "text analytics"],
+    "computer vision": ["computer vision", "cv", "image processing", "image recognition"],
+    
+    # Project Management
+    "project management": ["project management", "project mgmt", "project manager", "project lead"],
+    "agile": ["agile", "agile methodology", "scrum", "kanban", "sprint planning"],
+    "jira": ["jira", "jira software", "atlassian jira"],
+    "trello": ["trello", "trello board", "trello management"],
+    "scrum master": ["scrum master", "scrum methodology", "agile scrum"],
+    "product owner": ["product owner", "product management", "product backlog"],
+    
+    # Business & Marketing
+    "seo": ["seo", "search engine optimization", "search optimization"],
+    "digital marketing": ["digital marketing", "online marketing", "internet marketing"],
+    "content marketing": ["content marketing", "content strategy", "content creation"],
+    "social media marketing": ["social media marketing", "social media management", "smm"],
+    "email marketing": ["email marketing", "email campaigns", "newsletter management"],
+    "crm": ["crm", "customer relationship management", "salesforce", "hubspot"],
+    
+    # Design
+    "ui design": ["ui design", "user interface design", "interface design"],
+    "ux design": ["ux design", "user experience design", "usability"],
+    "graphic design": ["graphic design", "visual design", "graphics"],
+    "adobe photoshop": ["adobe photoshop", "photoshop", "ps"],
+    "adobe illustrator": ["adobe illustrator", "illustrator", "ai"],
+    "figma": ["figma", "figma design", "figma prototyping"],
+    "sketch": ["sketch", "sketch app", "sketch design"],
+    
+    # Soft Skills
+    "communication": ["communication", "communication skills", "verbal communication", "written communication"],
+    "teamwork": ["teamwork", "team collaboration", "team player", "collaborative"],
+    "leadership": ["leadership", "team leadership", "people management", "team management"],
+    "problem solving": ["problem solving", "critical thinking", "analytical thinking", "analytical skills"],
+    "time management": ["time management", "prioritization", "organizational skills"],
+    
+    # Education
+    "bachelor degree": ["bachelor degree", "bachelors", "bachelor degree", "undergraduate degree", "bs", "ba"],
+    "master degree": ["master degree", "masters", "master degree", "graduate degree", "ms", "ma", "mba"],
+    "phd": ["phd", "doctorate", "doctoral degree", "ph.d", "doctor of philosophy"],
+    "certification": ["certification", "professional certification", "industry certification", "certified"],
+}
+
+# Reverse mapping (variation -> canonical skill), built once at import.
+# When a variation is listed under several skills (e.g. "data analytics"),
+# the later canonical skill wins.
+REVERSE_SKILL_MAPPING: Dict[str, str] = {}
+for _canonical, _variations in SKILL_MAPPING.items():
+    for _variation in _variations:
+        REVERSE_SKILL_MAPPING[_variation] = _canonical
+del _canonical, _variations, _variation
+
+# Size of the LRU caches memoizing normalized skill lists
+SKILL_CACHE_SIZE = 4096
+
+# Interned canonical skills: canonical name <-> small integer ID.
+# Known canonical skills get stable IDs in SKILL_MAPPING order; unknown skills
+# are interned on first sight, so their IDs are only valid within this process.
+_SKILL_IDS: Dict[str, int] = {}
+_SKILL_NAMES: List[str] = []
+_SKILL_ID_LOCK = threading.Lock()
+
+def skill_id(canonical_skill: str) -> int:
     """
-    Normalize skills by converting to lowercase and handling common variations
+    Get the interned integer ID of a canonical skill, assigning one if needed
     
     Args:
-        skills_list: List of skills to normalize
+        canonical_skill: Normalized skill name
         
     Returns:
-        List of normalized skills
+        Integer ID of the skill
     """
-    if not skills_list:
-        return []
-        
+    sid = _SKILL_IDS.get(canonical_skill)
+    if sid is None:
+        with _SKILL_ID_LOCK:
+            sid = _SKILL_IDS.get(canonical_skill)
+            if sid is None:
+                sid = len(_SKILL_NAMES)
+                _SKILL_NAMES.append(canonical_skill)
+                _SKILL_IDS[canonical_skill] = sid
+    return sid
+
+def skill_name(sid: int) -> str:
+    """Get the canonical skill name for an interned skill ID"""
+    return _SKILL_NAMES[sid]
+
+for _canonical in SKILL_MAPPING:
+    skill_id(_canonical)
+del _canonical
+
+def _canonicalize(skills: Iterable[str]) -> Tuple[str, ...]:
     normalized = []
-    skill_mapping = {
-        # Programming Languages
-        "javascript": ["javascript", "js", "java script", "ecmascript"],
-        "python": ["python", "py", "python3", "python programming"],
-        "java": ["java", "java programming", "core java", "java se", "java ee"],
-        "c#": ["c#", "csharp", "c sharp", ".net c#"],
-        "c++": ["c++", "cpp", "c plus plus"],
-        "php": ["php", "php development", "php programming"],
-        "ruby": ["ruby", "ruby programming", "ruby on rails", "rails"],
-        "swift": ["swift", "swift programming", "ios development"],
-        "kotlin": ["kotlin", "kotlin programming", "android kotlin"],
-        "go": ["go", "golang", "go programming"],
-        "rust": ["rust", "rust programming"],
-        "typescript": ["typescript", "ts", "type script"],
-        
-        # Frontend Frameworks
-        "react": ["react", "reactjs", "react.js", "react js", "react native"],
-        "angular": ["angular", "angularjs", "angular js", "angular 2+"],
-        "vue": ["vue", "vuejs", "vue.js", "vue js"],
-        "svelte": ["svelte", "sveltejs", "svelte framework"],
-        "jquery": ["jquery", "jquery library"],
-        
-        # Backend Frameworks
-        "node.js": ["node.js", "nodejs", "node js", "node", "express.js", "expressjs"],
-        "django": ["django", "django framework", "python django"],
-        "flask": ["flask", "flask framework", "python flask"],
-        "spring": ["spring", "spring boot", "spring framework", "java spring"],
-        "laravel": ["laravel", "php laravel", "laravel framework"],
-        "asp.net": ["asp.net", "asp net", "asp.net mvc", "asp.net core"],
-        
-        # Mobile Development
-        "flutter": ["flutter", "flutter framework", "flutter development", "dart flutter"],
-        "react native": ["react native", "react-native", "reactnative"],
-        "android": ["android", "android development", "android studio"],
-        "ios": ["ios", "ios development", "swift ios", "objective-c"],
-        "xamarin": ["xamarin", "xamarin forms", "xamarin.forms"],
-        
-        # Database
-        "sql": ["sql", "structured query language", "sql queries"],
-        "mysql": ["mysql", "my sql", "mysql database"],
-        "postgresql": ["postgresql", "postgres", "postgres sql", "postgre"],
-        "mongodb": ["mongodb", "mongo", "mongo db", "nosql"],
-        "sqlite": ["sqlite", "sqlite3", "sql lite"],
-        "oracle": ["oracle", "oracle database", "oracle db", "pl/sql"],
-        "redis": ["redis", "redis cache", "redis database"],
-        "firebase": ["firebase", "firebase database", "firestore"],
-        
-        # DevOps & Cloud
-        "aws": ["aws", "amazon web services", "amazon aws", "ec2", "s3", "lambda"],
-        "azure": ["azure", "microsoft azure", "azure cloud"],
-        "gcp": ["gcp", "google cloud", "google cloud platform"],
-        "docker": ["docker", "docker container", "containerization"],
-        "kubernetes": ["kubernetes", "k8s", "k-8-s"],
-        "jenkins": ["jenkins", "jenkins ci", "jenkins pipeline"],
-        "git": ["git", "github", "gitlab", "git version control"],
-        "terraform": ["terraform", "terraform iac", "hashicorp terraform"],
-        
-        # Web Development
-        "html": ["html", "html5", "hypertext markup language"],
-        "css": ["css", "css3", "cascading style sheets", "scss", "sass"],
-        "bootstrap": ["bootstrap", "bootstrap framework", "bootstrap css"],
-        "tailwind": ["tailwind", "tailwindcss", "tailwind css"],
-        "web development": ["web development", "web dev", "website development", "frontend development", "backend development"],
-        "responsive design": ["responsive design", "responsive web design", "mobile-first design"],
-        "pwa": ["pwa", "progressive web app", "progressive web application"],
-        
-        # Data Science & AI
-        "machine learning": ["machine learning", "ml", "machine learning algorithms"],
-        "deep learning": ["deep learning", "dl", "neural networks", "cnn", "rnn", "lstm"],
-        "data science": ["data science", "data scientist", "data analytics"],
-        "data analysis": ["data analysis", "data analytics", "data analyst", "data visualization"],
-        "tensorflow": ["tensorflow", "tf", "tensor flow"],
-        "pytorch": ["pytorch", "torch", "py torch"],
-        "scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
-        "nlp": ["nlp", "natural language processing", "text analytics"],
-        "computer vision": ["computer vision", "cv", "image processing", "image recognition"],
-        
-        # Project Management
-        "project management": ["project management", "project mgmt", "project manager", "project lead"],
-        "agile": ["agile", "agile methodology", "scrum", "kanban", "sprint planning"],
-        "jira": ["jira", "jira software", "atlassian jira"],
-        "trello": ["trello", "trello board", "trello management"],
-        "scrum master": ["scrum master", "scrum methodology", "agile scrum"],
-        "product owner": ["product owner", "product management", "product backlog"],
-        
-        # Business & Marketing
-        "seo": ["seo", "search engine optimization", "search optimization"],
-        "digital marketing": ["digital marketing", "online marketing", "internet marketing"],
-        "content marketing": ["content marketing", "content strategy", "content creation"],
-        "social media marketing": ["social media marketing", "social media management", "smm"],
-        "email marketing": ["email marketing", "email campaigns", "newsletter management"],
-        "crm": ["crm", "customer relationship management", "salesforce", "hubspot"],
-        
-        # Design
-        "ui design": ["ui design", "user interface design", "interface design"],
-        "ux design": ["ux design", "user experience design", "usability"],
-        "graphic design": ["graphic design", "visual design", "graphics"],
-        "adobe photoshop": ["adobe photoshop", "photoshop", "ps"],
-        "adobe illustrator": ["adobe illustrator", "illustrator", "ai"],
-        "figma": ["figma", "figma design", "figma prototyping"],
-        "sketch": ["sketch", "sketch app", "sketch design"],
-        
-        # Soft Skills
-        "communication": ["communication", "communication skills", "verbal communication", "written communication"],
-        "teamwork": ["teamwork", "team collaboration", "team player", "collaborative"],
-        "leadership": ["leadership", "team leadership", "people management", "team management"],
-        "problem solving": ["problem solving", "critical thinking", "analytical thinking", "analytical skills"],
-        "time management": ["time management", "prioritization", "organizational skills"],
-        
-        # Education
-        "bachelor degree": ["bachelor degree", "bachelors", "bachelor degree", "undergraduate degree", "bs", "ba"],
-        "master degree": ["master degree", "masters", "master degree", "graduate degree", "ms", "ma", "mba"],
-        "phd": ["phd", "doctorate", "doctoral degree", "ph.d", "doctor of philosophy"],
-        "certification": ["certification", "professional certification", "industry certification", "certified"],
-    }
-    
-    # Create reverse mapping for easy lookup
-    reverse_mapping = {}
-    for canonical, variations in skill_mapping.items():
-        for var in variations:
-            reverse_mapping[var] = canonical
-    
-    for skill in skills_list:
+    seen = set()
+    for skill in skills:
         if not skill:
             continue
             
         skill_lower = skill.lower().strip()
         
         # Check if this is a known variation
-        if skill_lower in reverse_mapping:
-            normalized.append(reverse_mapping[skill_lower])
-        else:
-            normalized.append(skill_lower)
+        canonical = REVERSE_SKILL_MAPPING.get(skill_lower, skill_lower)
+        
+        # Remove duplicates while preserving order
+        if canonical not in seen:
+            seen.add(canonical)
+            normalized.append(canonical)
+    return tuple(normalized)
+
+@lru_cache(maxsize=SKILL_CACHE_SIZE)
+def _cached_canonicalize(skills: Tuple[str, ...]) -> Tuple[str, ...]:
+    return _canonicalize(skills)
+
+@lru_cache(maxsize=SKILL_CACHE_SIZE)
+def _cached_skill_ids(skills: Tuple[str, ...]) -> FrozenSet[int]:
+    return frozenset(skill_id(skill) for skill in _cached_canonicalize(skills))
+
+def canonical_skills(skills_list: List[str]) -> Tuple[str, ...]:
+    """
+    Normalize skills and return them as an immutable, memoized tuple
     
-    # Remove duplicates while preserving order
-    seen = set()
-    return [x for x in normalized if not (x in seen or seen.add(x))]
+    Args:
+        skills_list: List of skills to normalize
+        
+    Returns:
+        Tuple of normalized skills, without duplicates, in input order
+    """
+    if not skills_list:
+        return ()
+    try:
+        return _cached_canonicalize(tuple(skills_list))
+    except TypeError:
+        # Unhashable entries (malformed JSON data) bypass the cache
+        return _canonicalize(skills_list)
+
+def normalize_skills(skills_list: List[str]) -> List[str]:
+    """
+    Normalize skills by converting to lowercase and handling common variations
+    
+    Args:
+        skills_list: List of skills to normalize
+        
+    Returns:
+        List of normalized skills
+    """
+    return list(canonical_skills(skills_list))
+
+def skill_ids(skills_list: List[str]) -> FrozenSet[int]:
+    """
+    Normalize skills and intern them as a set of integer skill IDs
+    
+    Args:
+        skills_list: List of raw or normalized skills
+        
+    Returns:
+        Frozen set of canonical skill IDs
+    """
+    if not skills_list:
+        return frozenset()
+    try:
+        return _cached_skill_ids(tuple(skills_list))
+    except TypeError:
+        return frozenset(skill_id(skill) for skill in _canonicalize(skills_list))
+
+def skill_cache_info() -> Dict[str, Any]:
+    """Get hit/miss statistics of the skill normalization caches"""
+    return {
+        "normalize": _cached_canonicalize.cache_info()._asdict(),
+        "skill_ids": _cached_skill_ids.cache_info()._asdict(),
+        "vocabulary_size": len(_SKILL_NAMES),
+    }
 
 def extract_experience_years(experience_list: List[Dict[str, Any]]) -> float:
     """
@@ -217,50 +314,85 @@ def extract_experience_years(experience_list: List[Dict[str, Any]]) -> float:
     
     return round(total_years, 1)
 
+# Education level rankings (first matching key wins for structured entries)
+EDUCATION_RANK: Dict[str, int] = {
+    'no education': 0,
+    'ordinary levels': 1,
+    'certificate': 2,
+    'diploma': 3,
+    'bachelor': 4,
+    'degree': 4,
+    'masters': 5,
+    'phd': 6,
+    'doctorate': 6
+}
+
+# Fields recognized in legacy free-text education requirements
+LEGACY_EDUCATION_FIELDS = ['engineering', 'computer science', 'it', 'software',
+                           'business', 'marketing', 'finance', 'accounting',
+                           'medicine', 'healthcare', 'data science']
+
 def education_level_score(seeker_education: List[Dict[str, Any]], job_requirements: List[Dict[str, Any]]) -> float:
     """
     Calculate education match score based on structured job requirements
     
+    Both sides are parsed by compile_seeker_education / compile_job_education
+    and scored by compiled_education_score, the single implementation of the
+    rules shared with the feature store.
+    
     Args:
         seeker_education: List of education dictionaries from seeker profile
         job_requirements: List of requirement dictionaries from job posting
         
     Returns:
         Education match score between 0.0 and 1.0
+        
+    Raises:
+        TypeError: When a side the score needs is malformed
     """
-    if not job_requirements:
-        return 1.0  # No specific requirements
-    
-    # Define education level rankings
-    education_rank = {
-        'no education': 0,
-        'ordinary levels': 1,
-        'certificate': 2,
-        'diploma': 3,
-        'bachelor': 4, 
-        'degree': 4,
-        'masters': 5,
-        'phd': 6,
-        'doctorate': 6
-    }
-    
-    # Extract education requirements that are specifically of type 'education'
-    education_requirements = []
-    for req in job_requirements:
-        if isinstance(req, dict) and req.get('type') == 'education':
-            education_requirements.append(req)
+    score = compiled_education_score(compile_seeker_education(seeker_education), compile_job_education(job_requirements))
+    if score is None:
+        raise TypeError("Malformed education entries or requirements")
+    return score
+
+def _first_education_rank(level: str) -> int:
+    """Rank of the first EDUCATION_RANK key found in a structured entry's level"""
+    for key, rank in EDUCATION_RANK.items():
+        if key in level:
+            return rank
+    return 0
+
+def compile_job_education(job_requirements: List[Any]) -> Optional[Dict[str, Any]]:
+    """
+    Parse the job side of an education score once, for compiled_education_score
     
-    # If no specific education requirements found, check legacy format
-    if not education_requirements:
-        # Legacy format handling
+    Args:
+        job_requirements: List of requirement dictionaries (or legacy strings) from a job posting
+        
+    Returns:
+        JSON-serializable dict, or None when the requirements are malformed
+    """
+    try:
+        if not job_requirements:
+            return {"kind": "none"}
+        
+        education_requirements = [req for req in job_requirements if isinstance(req, dict) and req.get('type') == 'education']
+        if education_requirements:
+            # Structured requirements with both a level and a field
+            requirements = []
+            for job_edu in education_requirements:
+                job_level = job_edu.get('level', '').lower()
+                job_field = job_edu.get('field', '').lower()
+                if job_level and job_field:
+                    requirements.append([_first_education_rank(job_level), job_field.replace(' ', '').lower()])
+            return {"kind": "structured", "requirements": requirements}
+        
+        # Legacy free-text requirements
         required_education = []
         required_fields = []
-        
         for req in job_requirements:
             if isinstance(req, str):
                 req_lower = req.lower()
-                
-                # Check for education level requirements
                 if 'bachelor' in req_lower or 'degree' in req_lower:
                     required_education.append('bachelor')
                 elif 'master' in req_lower:
@@ -269,34 +401,47 @@ def education_level_score(seeker_education: List[Dict[str, Any]], job_requiremen
                     required_education.append('phd')
                 elif 'diploma' in req_lower:
                     required_education.append('diploma')
-                
-                # Check for field requirements
-                fields = ['engineering', 'computer science', 'it', 'software', 
-                         'business', 'marketing', 'finance', 'accounting', 
-                         'medicine', 'healthcare', 'data science']
-                
-                for field in fields:
-                    if field in req_lower:
-                        required_fields.append(field)
-        
-        # Legacy scoring
+                required_fields.extend(field for field in LEGACY_EDUCATION_FIELDS if field in req_lower)
         if not required_education and not required_fields:
-            return 1.0
-            
-        # Extract seeker education levels for legacy format
+            return {"kind": "none"}
+        required_rank = max([EDUCATION_RANK.get(level, 0) for level in required_education], default=0)
+        return {"kind": "legacy", "required_rank": required_rank, "fields": required_fields}
+    except (AttributeError, TypeError):
+        return None
+
+def compile_seeker_education(seeker_education: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Parse the seeker side of an education score once, for compiled_education_score
+    
+    Args:
+        seeker_education: List of education dictionaries from a seeker profile
+        
+    Returns:
+        JSON-serializable dict: "entries" holds the (rank, field) of the
+        structured entries and "highest"/"fields" the legacy highest rank and
+        fields; each part is None when the entries are malformed for it
+    """
+    try:
+        entries = []
+        for seeker_edu in seeker_education:
+            seeker_level = seeker_edu.get('level', '').lower()
+            seeker_field = seeker_edu.get('field', '').lower()
+            if seeker_level and seeker_field:
+                entries.append([_first_education_rank(seeker_level), seeker_field.replace(' ', '').lower()])
+    except (AttributeError, TypeError):
+        entries = None
+    
+    try:
         seeker_levels = []
         seeker_fields = []
         for edu in seeker_education:
             level = edu.get('level', '').lower()
             field = edu.get('field', '').lower()
             type_val = edu.get('type', '').lower()
-            
             if level:
                 seeker_levels.append(level)
             if field:
                 seeker_fields.append(field)
-                
-            # Map education types to standard levels
             if 'bachelor' in type_val or 'degree' in type_val:
                 seeker_levels.append('bachelor')
             elif 'master' in type_val:
@@ -305,120 +450,73 @@ def education_level_score(seeker_education: List[Dict[str, Any]], job_requiremen
                 seeker_levels.append('phd')
             elif 'diploma' in type_val:
                 seeker_levels.append('diploma')
-        
-        # Find seeker's highest education level
-        seeker_highest = 0
+        highest = 0
         for level in seeker_levels:
-            for key, rank in education_rank.items():
+            for key, rank in EDUCATION_RANK.items():
                 if key in level:
-                    seeker_highest = max(seeker_highest, rank)
-        
-        # Find job's required education level
-        required_highest = 0
-        for level in required_education:
-            required_highest = max(required_highest, education_rank.get(level, 0))
-        
-        # Calculate level match score
-        if required_highest == 0:
-            level_score = 1.0  # No specific level requirement
-        elif seeker_highest >= required_highest:
-            level_score = 1.0  # Meets or exceeds requirements
-        elif seeker_highest > 0:
-            level_score = seeker_highest / required_highest  # Partial match
-        else:
-            level_score = 0.0  # No match
-        
-        # Check field match if required
-        field_score = 1.0
-        if required_fields:
-            has_field_match = False
-            for field in seeker_fields:
-                for req_field in required_fields:
-                    if req_field in field:
-                        has_field_match = True
-                        break
-                if has_field_match:
-                    break
-            
-            field_score = 1.0 if has_field_match else 0.0  # Stricter field matching
-        
-        # Combine scores (field is now equally important)
-        return level_score * 0.5 + field_score * 0.5
+                    highest = max(highest, rank)
+    except (AttributeError, TypeError):
+        highest, seeker_fields = None, None
     
-    # New structured education matching
-    # For each job education requirement, find if the seeker has a matching education
-    requirement_scores = []
+    return {"entries": entries, "highest": highest, "fields": seeker_fields}
+
+def compiled_education_score(seeker: Optional[Dict[str, Any]], job: Optional[Dict[str, Any]]) -> Optional[float]:
+    """
+    Education match score of compiled sides, with arithmetic only
     
-    for job_edu in education_requirements:
-        job_level = job_edu.get('level', '').lower()
-        job_field = job_edu.get('field', '').lower()
-        
-        # Skip if no level or field specified
-        if not job_level or not job_field:
-            continue
-            
-        # Get the required education rank
-        required_rank = 0
-        for key, rank in education_rank.items():
-            if key in job_level:
-                required_rank = rank
-                break
-        
-        # Check each of seeker's education entries
-        best_match_score = 0.0
-        
-        for seeker_edu in seeker_education:
-            seeker_level = seeker_edu.get('level', '').lower()
-            seeker_field = seeker_edu.get('field', '').lower()
-            
-            # Skip if no level or field specified
-            if not seeker_level or not seeker_field:
-                continue
-                
-            # Get seeker education rank
-            seeker_rank = 0
-            for key, rank in education_rank.items():
-                if key in seeker_level:
-                    seeker_rank = rank
-                    break
-            
-            # Calculate level match
-            if seeker_rank >= required_rank:
-                level_score = 1.0  # Meets or exceeds requirements
-            elif seeker_rank > 0 and required_rank > 0:
-                level_score = seeker_rank / required_rank  # Partial match
-            else:
-                level_score = 0.0  # No match
-            
-            # Calculate field match - exact match required
-            # Normalize fields by removing spaces and converting to lowercase
-            norm_seeker_field = seeker_field.replace(' ', '').lower()
-            norm_job_field = job_field.replace(' ', '').lower()
-            
-            # Check for exact match or if one contains the other
-            if norm_seeker_field == norm_job_field:
-                field_score = 1.0  # Exact match
-            elif norm_seeker_field in norm_job_field or norm_job_field in norm_seeker_field:
-                field_score = 0.8  # Partial match
-            else:
-                field_score = 0.0  # No match
-            
-            # Calculate combined score for this education entry
-            # Field matching is now MORE important (60%) than level (40%)
-            match_score = level_score * 0.4 + field_score * 0.6
-            
-            # Keep track of best match
-            best_match_score = max(best_match_score, match_score)
+    Args:
+        seeker: compile_seeker_education result
+        job: compile_job_education result
         
-        requirement_scores.append(best_match_score)
+    Returns:
+        Education match score between 0.0 and 1.0, or None when a side it
+        needs could not be compiled
+    """
+    if job is None:
+        return None
+    if job["kind"] == "none":
+        return 1.0
     
-    # If no valid requirements were processed, return neutral score
-    if not requirement_scores:
-        return 0.5
+    if job["kind"] == "structured":
+        if not job["requirements"]:
+            return 0.5
+        if seeker is None or seeker["entries"] is None:
+            return None
+        requirement_scores = []
+        for required_rank, job_field in job["requirements"]:
+            best_match_score = 0.0
+            for seeker_rank, seeker_field in seeker["entries"]:
+                if seeker_rank >= required_rank:
+                    level_score = 1.0
+                elif seeker_rank > 0 and required_rank > 0:
+                    level_score = seeker_rank / required_rank
+                else:
+                    level_score = 0.0
+                if seeker_field == job_field:
+                    field_score = 1.0
+                elif seeker_field in job_field or job_field in seeker_field:
+                    field_score = 0.8
+                else:
+                    field_score = 0.0
+                best_match_score = max(best_match_score, level_score * 0.4 + field_score * 0.6)
+            requirement_scores.append(best_match_score)
+        return sum(requirement_scores) / len(requirement_scores)
     
-    # Return average score across all requirements
-    # This ensures ALL education requirements must be satisfied for a high score
-    return sum(requirement_scores) / len(requirement_scores)
+    if seeker is None or seeker["highest"] is None:
+        return None
+    required_rank, seeker_highest = job["required_rank"], seeker["highest"]
+    if required_rank == 0:
+        level_score = 1.0
+    elif seeker_highest >= required_rank:
+        level_score = 1.0
+    elif seeker_highest > 0:
+        level_score = seeker_highest / required_rank
+    else:
+        level_score = 0.0
+    field_score = 1.0
+    if job["fields"]:
+        field_score = 1.0 if any(req_field in field for field in seeker["fields"] for req_field in job["fields"]) else 0.0
+    return level_score * 0.5 + field_score * 0.5
 
 def job_type_match(seeker_preferences: List[str], job_type: str) -> float:
     """
@@ -463,9 +561,9 @@ def job_type_match(seeker_preferences: List[str], job_type: str) -> float:
     
     return max_score
 
-def enhanced_location_match(seeker_location: str, job_location: str, willing_to_relocate: bool) -> float:
+def location_text_score(seeker_location: str, job_location: str, willing_to_relocate: bool) -> float:
     """
-    Enhanced location matching with relocation consideration
+    Location match of the raw strings alone (equality, substrings, relocation)
     
     Args:
         seeker_location: Location string from seeker profile
@@ -497,38 +595,78 @@ def enhanced_location_match(seeker_location: str, job_location: str, willing_to_
     # No match and not willing to relocate
     return 0.0
 
-def get_matching_skills(seeker_skills: List[str], job_skills: List[str]) -> Tuple[Set[str], float]:
+def enhanced_location_match(seeker_location: str, job_location: str, willing_to_relocate: bool,
+                            seeker_place: Optional[int] = None, job_place: Optional[int] = None) -> float:
     """
-    Get matching skills and calculate skill overlap score
+    Enhanced location matching with relocation consideration and distances
+    between the places of the gazetteer (ml_training.gazetteer)
     
     Args:
-        seeker_skills: List of skills from seeker profile
-        job_skills: List of skills from job posting
+        seeker_location: Location string from seeker profile
+        job_location: Location string from job posting
+        willing_to_relocate: Whether seeker is willing to relocate
+        seeker_place: Gazetteer place ID of seeker_location, when already resolved
+        job_place: Gazetteer place ID of job_location, when already resolved
         
     Returns:
-        Tuple of (matching skills set, skill overlap score)
+        Location match score between 0.0 and 1.0
     """
-    if not seeker_skills or not job_skills:
-        return set(), 0.0
+    score = location_text_score(seeker_location, job_location, willing_to_relocate)
+    if score >= NEARBY_MAX_SCORE or not seeker_location or not job_location:
+        return score
+    
+    # Nearby places (e.g. Dar es Salaam and Kibaha) match partially
+    if seeker_place is None:
+        seeker_place = resolve_location(seeker_location)
+    if job_place is None:
+        job_place = resolve_location(job_location)
+    return max(score, location_proximity(seeker_place, job_place))
+
+def get_matching_skill_ids(seeker_skill_ids: AbstractSet[int], job_skill_ids: AbstractSet[int]) -> Tuple[FrozenSet[int], float]:
+    """
+    Get matching skill IDs and calculate skill overlap score
+    
+    Args:
+        seeker_skill_ids: Canonical skill IDs of the seeker (see skill_ids)
+        job_skill_ids: Canonical skill IDs of the job (see skill_ids)
         
-    # Normalize skills
-    norm_seeker_skills = normalize_skills(seeker_skills)
-    norm_job_skills = normalize_skills(job_skills)
+    Returns:
+        Tuple of (matching skill IDs, skill overlap score)
+    """
+    if not seeker_skill_ids or not job_skill_ids:
+        return frozenset(), 0.0
     
     # Find matching skills
-    matching_skills = set(norm_seeker_skills) & set(norm_job_skills)
+    matching = seeker_skill_ids & job_skill_ids
+    if not matching:
+        return frozenset(), 0.0
     
     # Calculate Jaccard similarity
-    if not matching_skills:
-        return set(), 0.0
-        
-    union_size = len(set(norm_seeker_skills) | set(norm_job_skills))
-    jaccard = len(matching_skills) / union_size if union_size > 0 else 0
+    union_size = len(seeker_skill_ids) + len(job_skill_ids) - len(matching)
+    jaccard = len(matching) / union_size if union_size > 0 else 0
     
     # Calculate percentage of job skills matched
-    job_skills_matched = len(matching_skills) / len(norm_job_skills) if norm_job_skills else 0
+    job_skills_matched = len(matching) / len(job_skill_ids)
     
     # Combine scores (emphasize matching job requirements)
     skill_score = jaccard * 0.4 + job_skills_matched * 0.6
     
-    return matching_skills, skill_score
+    return frozenset(matching), skill_score
+
+def get_matching_skills(seeker_skills: List[str], job_skills: List[str]) -> Tuple[Set[str], float]:
+    """
+    Get matching skills and calculate skill overlap score
+    
+    Args:
+        seeker_skills: List of skills from seeker profile
+        job_skills: List of skills from job posting
+        
+    Returns:
+        Tuple of (matching skills set, skill overlap score)
+    """
+    if not seeker_skills or not job_skills:
+        return set(), 0.0
+    
+    matching_ids, skill_score = get_matching_skill_ids(skill_ids(seeker_skills), skill_ids(job_skills))
+    
+    return {skill_name(sid) for sid in matching_ids}, skill_score
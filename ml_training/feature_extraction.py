@@ -3,7 +3,7 @@ Feature extraction for job recommendation and candidate recommendation.
 - Handles both model and cold-start logic.
 - PEP8, type hints, modular, robust.
 """
-from typing import Dict, Any, List, Optional, Set
+from typing import Dict, Any, List, Optional, Set, AbstractSet
 import numpy as np
 
 def jaccard_similarity(list1: List[str], list2: List[str]) -> float:
@@ -15,6 +15,17 @@ def jaccard_similarity(list1: List[str], list2: List[str]) -> float:
 def skills_overlap(list1: List[str], list2: List[str]) -> int:
     return len(set(list1) & set(list2))
 
+def jaccard_similarity_ids(ids1: AbstractSet[int], ids2: AbstractSet[int]) -> float:
+    """jaccard_similarity over interned skill ID sets (see enhanced_matching.skill_ids)."""
+    if not ids1 or not ids2:
+        return 0.0
+    overlap = len(ids1 & ids2)
+    return overlap / (len(ids1) + len(ids2) - overlap)
+
+def skills_overlap_ids(ids1: AbstractSet[int], ids2: AbstractSet[int]) -> int:
+    """skills_overlap over interned skill ID sets."""
+    return len(ids1 & ids2)
+
 def education_match(edu1: List[Dict[str, Any]], edu2: List[Dict[str, Any]]) -> float:
     # Match on level and field for any entry
     for e1 in edu1:
@@ -0,0 +1,128 @@
+"""
+Offline gazetteer of Tanzanian regions and towns
+Free-text locations ("Dar", "Kibaha, Pwani", "Arusha, Tanzania") resolve to
+the stable place IDs of data/tanzania_gazetteer.csv, and the great-circle
+distances between all places are computed once at import, so scoring two
+resolved locations is a matrix lookup.
+"""
+import csv
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "tanzania_gazetteer.csv")
+
+# Mean Earth radius
+EARTH_RADIUS_KM = 6371.0088
+
+# Places further apart than this do not match at all; closer ones score up to
+# the 0.9 of a partial location match, decaying linearly with the distance
+NEARBY_DISTANCE_KM = 100.0
+NEARBY_MAX_SCORE = 0.9
+
+# Place ID standing for an unresolved location in the matrices below
+UNRESOLVED = 0
+
+# Location parts carrying no place information
+_COUNTRY_NAMES = {"tanzania", "tz", "united republic of tanzania"}
+_PART_SEPARATORS = re.compile(r"\s*(?:[,;/()]|\s-\s)\s*")
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in kilometres (NumPy arrays broadcast)
+
+    Args:
+        lat1, lon1: Coordinates of the first point(s), in degrees
+        lat2, lon2: Coordinates of the second point(s), in degrees
+
+    Returns:
+        Distance(s) in kilometres
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+def _load(path: str):
+    places = []
+    names: Dict[str, int] = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            place_id = int(row["id"])
+            places.append((place_id, row["name"], row["region"], float(row["latitude"]), float(row["longitude"])))
+            keys = [row["name"]] + [alias for alias in row["aliases"].split("|") if alias]
+            for key in map(_normalize, keys):
+                if names.get(key, place_id) != place_id:
+                    raise ValueError(f"Gazetteer name {key!r} is listed for places {names[key]} and {place_id}")
+                names[key] = place_id
+    return places, names
+
+_PLACES, _NAMES = _load(GAZETTEER_PATH)
+
+# Place ID -> (name, region)
+PLACES = {place_id: (name, region) for place_id, name, region, _, _ in _PLACES}
+
+def _distance_matrix():
+    size = max(PLACES) + 1
+    latitude = np.full(size, np.nan)
+    longitude = np.full(size, np.nan)
+    for place_id, _, _, lat, lon in _PLACES:
+        latitude[place_id], longitude[place_id] = lat, lon
+    distances = haversine_km(latitude[:, None], longitude[:, None], latitude[None, :], longitude[None, :])
+    # Unresolved locations (and unused IDs) are infinitely far from everything
+    return np.where(np.isnan(distances), np.inf, distances)
+
+# Place x place distances in km, indexed by place ID
+DISTANCE_KM = _distance_matrix()
+DISTANCE_KM.setflags(write=False)
+
+# Place x place proximity scores, indexed by place ID
+PROXIMITY = NEARBY_MAX_SCORE * np.clip(1.0 - DISTANCE_KM / NEARBY_DISTANCE_KM, 0.0, None)
+PROXIMITY.setflags(write=False)
+
+@lru_cache(maxsize=4096)
+def _resolve(location: str) -> Optional[int]:
+    key = _normalize(location)
+    if key in _NAMES:
+        return _NAMES[key]
+    # Most specific part first: "Kibaha, Pwani" is Kibaha
+    for part in _PART_SEPARATORS.split(key):
+        if part in _NAMES:
+            return _NAMES[part]
+        if part.endswith(" region") and part[:-len(" region")] in _NAMES:
+            return _NAMES[part[:-len(" region")]]
+    return None
+
+def resolve_location(location: str) -> Optional[int]:
+    """
+    Resolve a free-text location to a gazetteer place ID
+
+    Args:
+        location: Location string from a profile or job posting
+
+    Returns:
+        Place ID, or None when no place of the gazetteer matches
+    """
+    if not location or not isinstance(location, str) or _normalize(location) in _COUNTRY_NAMES:
+        return None
+    return _resolve(location)
+
+def location_proximity(place_a: Optional[int], place_b: Optional[int]) -> float:
+    """Proximity score (0.0 to NEARBY_MAX_SCORE) of two place IDs; 0.0 when either is unresolved."""
+    return float(PROXIMITY[place_a or UNRESOLVED, place_b or UNRESOLVED])
+
+def places_within(place_id: Optional[int], max_distance_km: float) -> List[int]:
+    """
+    Places at most `max_distance_km` away from a place, the place included
+
+    Returns:
+        List of place IDs (empty for an unresolved place)
+    """
+    if not place_id:
+        return []
+    return [int(other) for other in np.flatnonzero(DISTANCE_KM[place_id] <= max_distance_km)]
@@ -81,6 +81,9 @@ def create_application_status_notification(application):
         'application'
     )
 
+def job_match_message(job):
+    return f'We found a new job that matches your profile: {job.title} at {job.recruiter.company_name}'
+
 def create_job_match_notification(seeker, job):
     """
     Create notification for job seeker when a new job match is found
@@ -89,11 +92,28 @@ def create_job_match_notification(seeker, job):
         seeker,
         'job_match',
         'New Job Match Found',
-        f'We found a new job that matches your profile: {job.title} at {job.company_name}',
+        job_match_message(job),
         job.id,
         'job'
     )
 
+def create_job_match_notifications(seekers, job):
+    """
+    Create job match notifications for many job seekers with a single bulk insert
+    """
+    message = job_match_message(job)
+    return Notification.objects.bulk_create([
+        Notification(
+            user_id=seeker.user_id,
+            notification_type='job_match',
+            title='New Job Match Found',
+            message=message,
+            related_object_id=job.id,
+            related_object_type='job'
+        )
+        for seeker in seekers
+    ])
+
 def create_candidate_match_notification(recruiter, job, seeker):
     """
     Create notification for recruiter when a new candidate match is found